@@ -0,0 +1,120 @@
+import os
+import argparse
+
+from bs4 import BeautifulSoup
+
+import content_catalog
+import image_variants
+from image_dimensions import image_dimensions
+from image_variants import LOCAL_SRC, LOCAL_PREFIX, IMAGES_DIR, format_size
+from output_writer import write_if_changed
+
+# One pass over the local images of articles/*.html, so the article files are
+# parsed and recorded in the catalog once however many of these are on:
+#   variants    <picture> sources for the WebP/AVIF variants (image_variants.py)
+#   dimensions  width/height from the image headers (image_dimensions.py), so the
+#               browser reserves the space before the image arrives, and
+#               loading="lazy" decoding="async" on every image but the first of
+#               the article, which is likely above the fold and stays eager
+# An article is only parsed again when what it would get changes.
+
+def set_dimensions(img, size, eager):
+    """
+    Sizes img from the image's (width, height). A width already in the markup is
+    the size it is shown at and is kept: a pixel width gets the height that goes
+    with the real aspect ratio, any other width (e.g. "100%") is left alone.
+    Without a width, both are set.
+    """
+    if size:
+        width, height = size
+        shown = img.get('width')
+        if shown is None:
+            img['width'], img['height'] = str(width), str(height)
+        elif shown.isdigit() and int(shown) > 0:
+            img['height'] = str(max(1, round(int(shown) * height / width)))
+    if eager:
+        if img.get('loading') == 'lazy':
+            del img['loading']
+    else:
+        img['loading'] = 'lazy'
+        img['decoding'] = 'async'
+
+def rewrite_articles(conn, variants=None, formats=(), dimensions=True, images_dir=IMAGES_DIR, force=False):
+    """
+    Applies the enabled image passes to every article that shows a local image.
+    variants: {image name: entry} from image_variants.build_variants (None for no variants).
+    Returns how many articles were rewritten.
+    """
+    sizes = {}
+    rewritten = 0
+    for path in content_catalog.list_source_files('article', 'public'):
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        shown = LOCAL_SRC.findall(html)
+        if not shown:
+            continue
+        if dimensions:
+            for name in shown:
+                if name not in sizes:
+                    image_path = os.path.join(images_dir, name)
+                    sizes[name] = image_dimensions(conn, image_path) if os.path.exists(image_path) else None
+        # An image without variants (e.g. it failed to decode) keeps a plain <img>
+        sig = content_catalog.signature('images', formats if variants is not None else None, dimensions,
+                                        [(name, variants.get(name) if variants is not None else None,
+                                          sizes.get(name)) for name in shown])
+        if not force and content_catalog.output_is_current(conn, path, sig):
+            continue
+
+        soup = BeautifulSoup(html, 'html.parser')
+        body = soup.find(class_='article-body') or soup
+        for i, img in enumerate(body.find_all('img', src=True)):
+            if not img['src'].startswith(LOCAL_PREFIX):
+                continue
+            name = img['src'][len(LOCAL_PREFIX):]
+            if variants is not None:
+                image_variants.set_picture_sources(soup, img, variants.get(name), formats)
+            if dimensions:
+                set_dimensions(img, sizes.get(name), eager=(i == 0))
+        output = str(soup)
+        if write_if_changed(path, output):
+            rewritten += 1
+        content_catalog.record_output(conn, path, sig, output)
+    conn.commit()
+    return rewritten
+
+def main(jobs=1, variants=False, avif=False, dimensions=True, force=False):
+    images, formats = None, []
+    if variants:
+        formats = image_variants.available_formats(avif)
+        if not formats:
+            print("Image variants skipped: Pillow is not installed (pip install Pillow)")
+        else:
+            if avif and 'avif' not in formats:
+                print("  (this Pillow can't write AVIF - only WebP variants; pip install pillow-avif-plugin)")
+            images, report = image_variants.build_variants(formats, jobs=jobs, force=force)
+            print(f"Image variants ({', '.join(formats)}): {report['images']} image(s), {report['encoded']} encoded, "
+                  f"{report['images'] - report['encoded']} up to date, {report['removed']} stale variant(s) removed; "
+                  f"{format_size(report['source_bytes'])} of originals -> {format_size(report['variant_bytes'])} of variants")
+            for name, error in report['failed']:
+                print(f"  failed: {name}: {error}")
+    if images is None and not dimensions:
+        return
+
+    conn = content_catalog.connect()
+    try:
+        rewritten = rewrite_articles(conn, images, formats, dimensions=dimensions, force=force)
+    finally:
+        conn.close()
+    done = (['variants'] if images is not None else []) + (['dimensions, lazy loading'] if dimensions else [])
+    print(f"Article images ({'; '.join(done)}): {rewritten} article(s) rewritten")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rewrite the local images of the articles: sizes and lazy loading, and optionally responsive variants.")
+    parser.add_argument('--variants', action='store_true', help="Also write WebP variants of the images and use them via <picture> (needs Pillow)")
+    parser.add_argument('--avif', action='store_true', help="With --variants, also write AVIF variants")
+    parser.add_argument('--no-dimensions', action='store_true', help="Leave width/height and loading attributes alone")
+    parser.add_argument('--jobs', '-j', type=int, default=0, help="Encode variants in N worker processes (0 = one per CPU core)")
+    parser.add_argument('--force', action='store_true', help="Re-check every image and article, ignoring the manifest and catalog")
+    args = parser.parse_args()
+    main(jobs=args.jobs or os.cpu_count() or 1, variants=args.variants, avif=args.avif,
+         dimensions=not args.no_dimensions, force=args.force)
@@ -0,0 +1,313 @@
+import html.parser
+
+# Streaming metadata extractor for article pages.
+#
+# generate_search_index.parse_article builds a full BeautifulSoup tree just to read
+# a handful of fields. This walks the html.parser events instead, mirroring the
+# BeautifulSoup lookups one for one, and stops as soon as every field is settled
+# (for unlisted pages that is the <meta name="visibility"> tag in <head>).
+
+# Elements html.parser (and BeautifulSoup) never push onto the open-element stack
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link',
+    'menuitem', 'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound',
+    'command', 'frame', 'image', 'isindex', 'nextid', 'spacer'
+}
+# BeautifulSoup keeps the text of these out of get_text()
+HIDDEN_TEXT_TAGS = {'script', 'style', 'template', 'rt', 'rp'}
+
+# Same priority as: find('article', 'article-body') or find('div', 'article-body') or find('div', 'entry-content')
+BODY_SELECTORS = [('article', 'article-body'), ('div', 'article-body'), ('div', 'entry-content')]
+
+
+class _StopParsing(Exception):
+    pass
+
+
+class _Element:
+    def __init__(self, tag):
+        self.tag = tag
+        self.open = True
+        self.collectors = []  # TextCollectors finished when this element closes
+
+
+class _TextCollector:
+    """Accumulates get_text() of one element."""
+    def __init__(self):
+        self.parts = []
+        self.done = False
+
+    def text(self):
+        return ''.join(self.parts)
+
+
+class _BodyCandidate:
+    """Tracks the fields parse_article reads from one possible article body."""
+    def __init__(self, element):
+        self.element = element
+        self.text = None          # _TextCollector for the whole body (search indexing)
+        self.first_p = None       # _TextCollector
+        self.next_p = None        # first <p> after first_p starts (BeautifulSoup find_next)
+        self.image = None         # first usable <img src>
+        self.figure = None        # first <figure> inside the body
+        self.figure_img = None    # ('src', value) or ('missing', None)
+
+
+def _has_class(attrs, name):
+    return name in (attrs.get('class') or '').split()
+
+
+class ArticleMetaParser(html.parser.HTMLParser):
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []
+        self.active = []          # collectors currently receiving text
+        self.hidden_depth = 0
+
+        self.visibility = None    # content of the first <meta name="visibility">, '' if absent
+        self.vis_seen = False
+        self.description = None   # content of the first <meta name="description">
+        self.desc_seen = False
+
+        self.title_root = None    # mini tree of the first <title>: {'children': [...]}
+        self.title_path = []
+        self.title_done = False
+
+        self.bodies = [None, None, None]  # _BodyCandidate per BODY_SELECTORS entry
+        self.date_span = None     # _TextCollector for span.article-meta-small
+        self.date_div = None      # _TextCollector for div.article-meta-small
+
+    # --- tree bookkeeping ---
+
+    def _collect(self, element):
+        collector = _TextCollector()
+        element.collectors.append(collector)
+        self.active.append(collector)
+        return collector
+
+    def _close(self, element):
+        element.open = False
+        if element.tag in HIDDEN_TEXT_TAGS:
+            self.hidden_depth -= 1
+        for collector in element.collectors:
+            collector.done = True
+            self.active.remove(collector)
+        if self.title_path and self.title_path[-1] is element:
+            self.title_path.pop()
+            if not self.title_path:
+                self.title_done = True
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {k: (v if v is not None else '') for k, v in attrs}
+
+        if tag == 'meta':
+            name = attrs.get('name')
+            if name == 'visibility' and not self.vis_seen:
+                self.vis_seen = True
+                self.visibility = attrs.get('content')
+                if self.visibility == 'unlisted':
+                    raise _StopParsing()
+            elif name == 'description' and not self.desc_seen:
+                self.desc_seen = True
+                if 'content' not in attrs:
+                    # parse_article indexes meta_desc['content'] directly
+                    raise KeyError('content')
+                self.description = attrs['content']
+            return
+
+        if tag == 'img':
+            self._handle_img(attrs)
+            return
+
+        if tag in VOID_TAGS:
+            return
+
+        element = _Element(tag)
+
+        if self.title_path:
+            node = {'children': []}
+            self.title_path[-1].node['children'].append(node)
+            element.node = node
+            self.title_path.append(element)
+        elif tag == 'title' and self.title_root is None:
+            self.title_root = {'children': []}
+            element.node = self.title_root
+            self.title_path.append(element)
+
+        if tag in HIDDEN_TEXT_TAGS:
+            self.hidden_depth += 1
+
+        for i, (sel_tag, sel_class) in enumerate(BODY_SELECTORS):
+            if self.bodies[i] is None and tag == sel_tag and _has_class(attrs, sel_class):
+                self.bodies[i] = _BodyCandidate(element)
+                self.bodies[i].text = self._collect(element)
+
+        if tag == 'p':
+            for body in self.bodies:
+                if body is None:
+                    continue
+                if body.first_p is None:
+                    if body.element.open:
+                        body.first_p = self._collect(element)
+                elif body.next_p is None:
+                    body.next_p = self._collect(element)
+
+        if tag == 'figure':
+            for body in self.bodies:
+                if body is not None and body.figure is None and body.element.open:
+                    body.figure = element
+
+        if _has_class(attrs, 'article-meta-small'):
+            if tag == 'span' and self.date_span is None:
+                self.date_span = self._collect(element)
+            elif tag == 'div' and self.date_div is None:
+                self.date_div = self._collect(element)
+
+        self.stack.append(element)
+
+    def _handle_img(self, attrs):
+        src = attrs.get('src')
+        for body in self.bodies:
+            if body is None or not body.element.open:
+                continue
+            if body.image is None and src and 'icon' not in src.lower():
+                body.image = src
+            if body.figure is not None and body.figure.open and body.figure_img is None:
+                body.figure_img = ('src', src) if 'src' in attrs else ('missing', None)
+
+    def handle_endtag(self, tag):
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i].tag == tag:
+                for element in reversed(self.stack[i:]):
+                    self._close(element)
+                del self.stack[i:]
+                break
+        else:
+            return  # stray end tag, ignored like BeautifulSoup does
+
+        if self._settled():
+            raise _StopParsing()
+
+    def handle_data(self, data):
+        if self.title_path:
+            children = self.title_path[-1].node['children']
+            if children and isinstance(children[-1], str):
+                children[-1] += data
+            else:
+                children.append(data)
+        if self.hidden_depth:
+            return
+        for collector in self.active:
+            collector.parts.append(data)
+
+    def handle_comment(self, data):
+        # Comments are separate children for soup.title.string, but not text
+        if self.title_path:
+            self.title_path[-1].node['children'].append(None)
+
+    def unknown_decl(self, data):
+        # <![CDATA[...]]> counts as text for BeautifulSoup
+        if data.startswith('CDATA['):
+            self.handle_data(data[len('CDATA['):])
+
+    # --- results ---
+
+    def _settled(self):
+        """True once no later markup can change any extracted field."""
+        if not (self.vis_seen and self.desc_seen and self.title_done):
+            return False
+        # A later span.article-meta-small would win over a div
+        if self.date_span is None or not self.date_span.done:
+            return False
+        # A later <article class="article-body"> would win over the div variants
+        body = self.bodies[0]
+        if body is None or body.element.open:
+            return False
+        if self._needs_paragraph() and body.first_p is not None:
+            if not body.first_p.done:
+                return False
+            if len(body.first_p.text().strip()) < 20 and (body.next_p is None or not body.next_p.done):
+                return False
+        return True
+
+    def _needs_paragraph(self):
+        return not self.description or self.description == "Article Description"
+
+    def finish(self):
+        for element in reversed(self.stack):
+            self._close(element)
+        self.stack = []
+
+    def title_string(self):
+        # Equivalent of soup.title.string: follow single-child chains down to a string
+        node = self.title_root
+        while True:
+            children = node['children']
+            if len(children) != 1 or children[0] is None:
+                return None
+            if isinstance(children[0], str):
+                return children[0]
+            node = children[0]
+
+
+def extract_article_meta(html_text):
+    """
+    Returns None for unlisted articles, otherwise a dict with title, description,
+    date_str, image and body_text extracted with exactly the rules of parse_article.
+    """
+    parser = ArticleMetaParser()
+    try:
+        parser.feed(html_text)
+        parser.close()
+    except _StopParsing:
+        pass
+    parser.finish()
+
+    if parser.visibility == 'unlisted':
+        return None
+
+    if parser.title_root is not None:
+        title_string = parser.title_string()
+        if title_string is None:
+            raise ValueError("<title> has no plain text content")
+        title = title_string.split('|')[0].strip()
+    else:
+        title = "Untitled Article"
+
+    description = ""
+    if parser.desc_seen and parser.description != "Article Description":
+        description = parser.description
+
+    body = next((b for b in parser.bodies if b is not None), None)
+
+    if not description and body and body.first_p:
+        text = body.first_p.text().strip()
+        if len(text) < 20 and body.next_p:
+            text = body.next_p.text().strip()
+        description = text[:150] + "..." if len(text) > 150 else text
+
+    image_url = ""
+    if body:
+        image_url = body.image or ""
+        if not image_url and body.figure_img:
+            kind, src = body.figure_img
+            if kind == 'missing':
+                raise KeyError('src')
+            image_url = src
+        if image_url and image_url.startswith('../'):
+            image_url = image_url[3:]
+
+    date_str = ""
+    date_el = parser.date_span or parser.date_div
+    if date_el:
+        date_str = date_el.text().strip().split('•')[0].strip()
+
+    return {
+        "title": title,
+        "description": description,
+        "date_str": date_str,
+        "image": image_url,
+        # Same as article_body.get_text(' '): text nodes joined with single spaces
+        "body_text": ' '.join(body.text.parts) if body else ""
+    }
@@ -0,0 +1,109 @@
+import copy
+import json
+import time
+
+from bs4 import BeautifulSoup
+
+# Article transforms shared by migrate_articles.py and the dashboard's
+# create_article. A stage is a function stage(soup, ctx) that edits one parsed
+# tree in place; ctx is a dict the stages use to pass values along (e.g.
+# fill_article_template stores the article body as ctx['content']). Stages run
+# in order over the same tree, so an article is parsed once however many
+# transforms it goes through.
+
+TITLE_PLACEHOLDER = 'Article Title Goes Here'
+
+def run_stages(soup, stages, ctx, timings=None):
+    """
+    Runs each (name, stage) over soup in order. A stage returning False stops the
+    run (e.g. nothing to work on); returns False then, True otherwise. Seconds per
+    stage are added to timings ({name: seconds}) when given.
+    """
+    for name, stage in stages:
+        start = time.perf_counter()
+        result = stage(soup, ctx)
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+        if result is False:
+            return False
+    return True
+
+def format_stage_timings(timings, count):
+    """One line: total and per-article milliseconds of each stage, in run order."""
+    parts = [f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings.items()]
+    per_article = sum(timings.values()) / count * 1000 if count else 0
+    return f"{', '.join(parts)} ({per_article:.1f} ms per article)"
+
+def clone_document(soup):
+    # Deep-copies the tree; copy.copy() of a BeautifulSoup object would re-parse it
+    clone = BeautifulSoup('', 'html.parser')
+    clone.extend([copy.copy(node) for node in soup.contents])
+    return clone
+
+# --- STAGES ---
+
+def fill_article_template(soup, ctx):
+    """
+    soup is a copy of articles/template.html. Sets title, description and date
+    (ctx['title'], ctx['description'], ctx['date']) and replaces the placeholder
+    content after the date line with ctx['body_html'].
+    """
+    title = ctx['title']
+    if soup.title:
+        soup.title.string = f"{title} | Kishna Kushwaha"
+    h1 = soup.find('h1')
+    if h1:
+        text = h1.get_text()
+        # Keep the template's formatting around the placeholder
+        h1.string = text.replace(TITLE_PLACEHOLDER, title) if TITLE_PLACEHOLDER in text else title
+
+    meta_desc = soup.find('meta', attrs={'name': 'description'})
+    if meta_desc: meta_desc['content'] = ctx['description']
+
+    meta_date = soup.find(class_='article-meta-small')
+    if meta_date: meta_date.string = f"{ctx['date']} • 5 min read"
+
+    article_body = soup.find(class_='article-body')
+    if not article_body:
+        return False
+    # Drop the template's sample paragraphs, keep the title and date line
+    anchor = meta_date if meta_date and meta_date.parent is article_body else article_body.find('h1')
+    for node in list(anchor.next_siblings if anchor else article_body.contents):
+        node.extract()
+    fragment = BeautifulSoup(ctx['body_html'], 'html.parser')
+    article_body.extend(list(fragment.contents))
+    ctx['content'] = article_body
+
+def convert_code_blocks(soup, ctx):
+    # CodeMirror blocks -> <pre><code class="language-...">
+    code_blocks = ctx['content'].find_all(class_='wp-block-codemirror-blocks-code-block')
+    for block in code_blocks:
+        pre_tag = block.find('pre')
+        if pre_tag:
+            code_text = pre_tag.get_text()
+            lang = 'python'
+            if pre_tag.get('data-setting'):
+                try:
+                    settings = json.loads(pre_tag['data-setting'])
+                    mode = settings.get('mode', 'python')
+                    if 'python' in mode: lang = 'python'
+                    elif 'javascript' in mode or 'js' in mode: lang = 'javascript'
+                    elif 'html' in mode: lang = 'html'
+                    elif 'css' in mode: lang = 'css'
+                    elif 'sql' in mode: lang = 'sql'
+                    else: lang = 'python'
+                except: pass
+            new_pre = soup.new_tag("pre")
+            new_code = soup.new_tag("code", **{'class': f'language-{lang}'})
+            new_code.string = code_text
+            new_pre.append(new_code)
+            block.replace_with(new_pre)
+
+def remove_unwanted(soup, ctx):
+    content = ctx['content']
+    for unwanted in content.select('.st-post-share, .jp-relatedposts, .widget-area, script, iframe'):
+        unwanted.decompose()
+    # Remove specific promotional text
+    for p in content.find_all('p'):
+        if "follow me on Instagram" in p.get_text() or "Hands-On GenAI" in p.get_text():
+            p.decompose()
@@ -0,0 +1,192 @@
+import os
+import time
+import threading
+import hashlib
+import tempfile
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fetch_scheduler import TokenBucket, backoff_delay, retry_after, RETRY_STATUSES, RETRIES, RATE_LIMIT
+
+# Downloads the images and data files migrate_articles.py links to into
+# assets/datasets. All downloads share one requests.Session and run on a small
+# thread pool, rate-limited and retried like the crawl (fetch_scheduler.py); bodies
+# are streamed to temp files and hashed, and files with identical content are
+# stored once, under one canonical name.
+
+ASSETS_SUBDIR = 'assets/datasets' # Keeping simple, can be assets/images if preferred but user path structure is flexible
+ASSET_WORKERS = 8
+ASSET_TIMEOUT = 10
+CHUNK_SIZE = 64 * 1024
+DATA_EXTENSIONS = ['.csv', '.zip', '.json']
+
+def is_asset(url, config):
+    # Check if it is an asset we want to host locally
+    # 1. Files (.csv, .zip, etc)
+    # 2. Images (<source domain>/wp-content/uploads/...)
+    is_source_asset = config['source_domain'] in url and config['assets_path'] in url
+    is_ext_file = any(url.lower().endswith(ext) for ext in DATA_EXTENSIONS) and 'http' in url
+    # Skip some specific bad links
+    return (is_source_asset or is_ext_file) and 'food-delivery-dataset' not in url
+
+def asset_filename(url):
+    # Remove query params, decode if necessary (e.g. %20)
+    return urllib.parse.unquote(url.split('?')[0].split('/')[-1])
+
+def hash_file(path):
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+class AssetDownloader:
+    """
+    submit(urls) starts the downloads a page needs; resolve(urls) waits for them
+    and returns {url: file name in assets_dir}. Files that already exist are not
+    downloaded again. Of several files with the same content, the first by name
+    among those already on disk (else the first resolved) is canonical; a
+    duplicate download is deleted and its URLs map to that file.
+    """
+
+    def __init__(self, assets_dir, source_domain, workers=ASSET_WORKERS, archive=None, timeout=ASSET_TIMEOUT,
+                 rate=RATE_LIMIT, retries=RETRIES):
+        self.assets_dir = assets_dir
+        self.workers = workers
+        self.archive = archive
+        self.timeout = timeout
+        self.retries = retries
+        # Assets all come from the source host: one bucket for the whole pool
+        self.bucket = TokenBucket(0 if archive and archive.offline else rate, workers)
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Referer': f"https://{source_domain}/",
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8'
+        }
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.pending = {}    # file name -> future of its temp path
+        self.renamed = {}    # file name -> canonical file name
+        self.canonical = None  # sha1 -> file name, filled on first submit
+        self.digests = {}    # file name already on disk -> sha1
+        self.stats = {'downloaded': 0, 'existing': 0, 'failed': 0, 'duplicates': 0, 'bytes': 0,
+                      'retries': 0, 'throttled': 0.0}
+        self.stats_lock = threading.Lock()
+
+    def _count(self, key, amount):
+        # Called from the download workers
+        with self.stats_lock:
+            self.stats[key] += amount
+
+    def _request(self, url, extra_headers, path):
+        # Streams the body into path in chunks instead of holding it in memory
+        with self.session.get(url, headers={**self.headers, **extra_headers}, allow_redirects=True,
+                              timeout=self.timeout, stream=True) as r:
+            with open(path, 'wb') as f:
+                for chunk in r.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+            return r.status_code, dict(r.headers)
+
+    def _download(self, url, filename):
+        """Downloads url into a temp file next to the assets. Returns its path, or None on failure."""
+        print(f"Downloading asset: {filename}")
+        fd, tmp_path = tempfile.mkstemp(dir=self.assets_dir, prefix='.download-', suffix='.part')
+        os.close(fd)
+        # Clean URL for request (handle existing query params in original)
+        fetch_url = url.replace('&amp;', '&')
+        for attempt in range(self.retries + 1):
+            headers, retryable = {}, False
+            try:
+                self._count('throttled', self.bucket.take_blocking())
+                if self.archive is None:
+                    status, headers = self._request(fetch_url, {}, tmp_path)
+                else:
+                    status, headers = self.archive.get_to_file(fetch_url, self._request, tmp_path)
+                if status == 200:
+                    return tmp_path
+                print(f"Failed to download asset: Status {status}")
+                retryable = status in RETRY_STATUSES
+            except Exception as e:
+                print(f"Error downloading asset: {e}")
+                retryable = isinstance(e, (requests.ConnectionError, requests.Timeout))
+            if not retryable or attempt == self.retries:
+                break
+            delay = backoff_delay(attempt, headers)
+            if retry_after(headers) is not None:
+                self.bucket.pause(delay)
+            self._count('retries', 1)
+            self._count('throttled', delay)
+            time.sleep(delay)
+        os.remove(tmp_path)
+        return None
+
+    def _index(self):
+        # Content already on disk, first name wins
+        os.makedirs(self.assets_dir, exist_ok=True)
+        self.canonical = {}
+        for name in sorted(os.listdir(self.assets_dir)):
+            path = os.path.join(self.assets_dir, name)
+            if not name.startswith('.') and os.path.isfile(path):
+                self.digests[name] = hash_file(path)
+                self.canonical.setdefault(self.digests[name], name)
+
+    def submit(self, urls):
+        """Starts downloading the files urls need that aren't on disk or under way yet."""
+        if self.canonical is None:
+            self._index()
+        for url in urls:
+            name = asset_filename(url)
+            if name in self.renamed or name in self.pending:
+                continue
+            if name in self.digests:
+                self.renamed[name] = self.canonical[self.digests[name]]
+                self.stats['existing'] += 1
+            else:
+                # One download per file name
+                self.pending[name] = self.pool.submit(self._download, url, name)
+
+    def resolve(self, urls):
+        """{url: file name in assets_dir} for urls submitted earlier, once their downloads are done."""
+        local_names = {}
+        for url in urls:
+            name = asset_filename(url)
+            if name in self.pending:
+                self._finish(name, self.pending.pop(name).result())
+            # A failed download keeps its file name, as the old per-file loop did
+            local_names[url] = self.renamed.get(name, name)
+        return local_names
+
+    def _finish(self, name, path):
+        if path is None:
+            self.renamed[name] = name
+            self.stats['failed'] += 1
+            return
+        digest = hash_file(path)
+        if digest in self.canonical:
+            # Same bytes as a file we already have: keep one copy
+            os.remove(path)
+            self.renamed[name] = self.canonical[digest]
+            self.stats['duplicates'] += 1
+        else:
+            self.stats['bytes'] += os.path.getsize(path)
+            os.replace(path, os.path.join(self.assets_dir, name))
+            self.canonical[digest] = name
+            self.renamed[name] = name
+            self.stats['downloaded'] += 1
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+        # Downloads nobody resolved (the run was interrupted) leave no temp files
+        for future in self.pending.values():
+            path = future.result()
+            if path:
+                os.remove(path)
+        self.pending = {}
+        self.session.close()
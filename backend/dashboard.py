@@ -30,12 +30,33 @@ PATHS = {
 os.makedirs(PATHS["draft_articles"], exist_ok=True)
 os.makedirs(PATHS["draft_projects"], exist_ok=True)
 
+# Shared content catalog (same SQLite file generate_search_index.py maintains)
+sys.path.insert(0, ROOT_DIR)
+import content_catalog
+from generate_search_index import refresh_catalog
+from output_writer import write_if_changed
+from build_profile import load_report
+from article_pipeline import run_stages, fill_article_template, convert_code_blocks
+
+ARTICLE_STAGES = [("template", fill_article_template), ("code_blocks", convert_code_blocks)]
+
+STATUS_ICONS = {"public": "🟢", "unlisted": "🟡", "private": "🔴"}
+
 # --- HELPER FUNCTIONS ---
 
 def get_files(directory, extension="*.html"):
     files = glob.glob(os.path.join(directory, extension))
     return sorted(files)
 
+def get_catalog():
+    """
+    Opens the content catalog and re-parses only files changed since the last sync
+    (moves between articles/ and drafts/ show up as a delete + add).
+    """
+    conn = content_catalog.connect()
+    refresh_catalog(conn, parser='stream')
+    return conn
+
 def move_file(src, dst_dir):
     filename = os.path.basename(src)
     dst = os.path.join(dst_dir, filename)
@@ -90,26 +111,10 @@ def create_article(title, description, date, content_html, category="Article"):
 
     slug = re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-') + ".html"
     soup = BeautifulSoup(template, 'html.parser')
-    
-    soup.title.string = f"{title} | Kishna Kushwaha"
-    h1 = soup.find('h1')
-    if h1: h1.string = title
-    
-    meta_desc = soup.find('meta', attrs={'name': 'description'})
-    if meta_desc: meta_desc['content'] = description
-
-    meta_date = soup.find(class_='article-meta-small')
-    if meta_date: meta_date.string = f"{date} • 5 min read"
-
-    article_body = soup.find(class_='article-body')
-    if article_body:
-        h1_tag = article_body.find('h1')
-        meta_tag = article_body.find(class_='article-meta-small')
-        article_body.clear()
-        if h1_tag: article_body.append(h1_tag)
-        if meta_tag: article_body.append(meta_tag)
-        content_soup = BeautifulSoup(content_html, 'html.parser')
-        article_body.append(content_soup)
+
+    # Same template filling and code block cleanup as migrate_articles.py
+    ctx = {"title": title, "description": description, "date": date, "body_html": content_html}
+    run_stages(soup, ARTICLE_STAGES, ctx)
 
     save_path = os.path.join(PATHS["draft_articles"], slug)
     with open(save_path, 'w', encoding='utf-8') as f:
@@ -234,7 +239,7 @@ def run_search_index():
         # Now this script rebuilds articles.html and search.json
         # Use sys.executable to ensure we use the same python env
         result = subprocess.run(
-            [sys.executable, "generate_search_index.py"], 
+            [sys.executable, "generate_search_index.py", "--profile"], 
             cwd=ROOT_DIR, 
             capture_output=True, 
             text=True, 
@@ -246,6 +251,34 @@ def run_search_index():
     except Exception as e:
         return False, str(e)
 
+def render_build_profile():
+    # Written by run_search_index (generate_search_index.py --profile)
+    report = load_report()
+    if not report:
+        st.caption("No build profile yet. Run 'Generate Search Index' first.")
+        return
+
+    total = report['total']
+    peak = report.get('peak_rss_mb') or {}
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Wall time", f"{total['wall_s']:.2f} s")
+    c2.metric("CPU time", f"{total['cpu_s']:.2f} s")
+    c3.metric("Peak memory", f"{peak['main']} MB" if peak else "n/a")
+    st.caption(f"Last build: {report['started']}")
+
+    st.dataframe(
+        [{"Phase": p['name'], "Wall (s)": p['wall_s'], "CPU (s)": p['cpu_s']} for p in report['phases']],
+        use_container_width=True, hide_index=True)
+
+    if report['files']:
+        st.markdown(f"**Slowest parsed files** ({len(report['files'])} parsed)")
+        st.dataframe(
+            [{"File": f['path'], "Wall (ms)": round(f['wall_s'] * 1000, 1), "CPU (ms)": round(f['cpu_s'] * 1000, 1),
+              "Error": f['error'] or ""} for f in report['files'][:10]],
+            use_container_width=True, hide_index=True)
+    else:
+        st.caption("All articles were reused from the content catalog; no files were parsed.")
+
 def backup_drafts():
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     backup_dir = os.path.join(BACKEND_DIR, "backups")
@@ -331,50 +364,18 @@ def update_homepage_listings():
     """
     Refreshes the 'Latest Articles' list in index.html
     """
-    import random
-    
-    # 1. Gather Articles
-    files = get_files(PATHS["public_articles"])
-    articles = []
-    
-    for p in files:
-        if "template.html" in p: continue
-        
-        with open(p, 'r', errors='ignore') as f:
-            soup = BeautifulSoup(f, 'html.parser')
-            
-        # Skip Unlisted
-        meta_vis = soup.find('meta', attrs={'name': 'visibility'})
-        if meta_vis and meta_vis.get('content') == 'unlisted':
-            continue
-            
-        title = soup.title.string.split('|')[0].strip() if soup.title else "Untitled"
-        
-        # Date
-        date_str = ""
-        date_obj = datetime.datetime.min
-        meta_date = soup.find(class_='article-meta-small')
-        if meta_date:
-            txt = meta_date.get_text().strip().split('•')[0].strip()
-            date_str = txt
-            try:
-                date_obj = datetime.datetime.strptime(txt, "%b %d, %Y")
-            except:
-                pass
-                
-        # Link
-        link = f"articles/{os.path.basename(p)}"
-        
-        articles.append({
-            "title": title,
-            "date": date_str,
-            "dt": date_obj,
-            "link": link
-        })
-        
-    # 2. Sort & Pick Top 3
-    articles.sort(key=lambda x: x['dt'], reverse=True)
-    top_3 = articles[:3]
+    # 1. Top 3 listed articles, newest first (indexed catalog query)
+    conn = get_catalog()
+    top_3 = [
+        {"title": a['title'], "date": a['date_str'], "link": a['link']}
+        for a in content_catalog.listed_articles(conn, order='date', limit=3)
+    ]
+
+    # 2. Nothing to do if the same 3 cards are already in an unedited index.html
+    home_sig = content_catalog.signature(top_3)
+    if content_catalog.output_is_current(conn, PATHS["index"], home_sig):
+        conn.close()
+        return True
     
     # 3. Generate HTML
     new_cards_html = ""
@@ -415,9 +416,10 @@ def update_homepage_listings():
         frag = BeautifulSoup(new_cards_html, 'html.parser')
         grid.append(frag)
         
-        with open(PATHS["index"], 'w', encoding='utf-8') as f:
-            f.write(str(main_soup))
-            
+        write_if_changed(PATHS["index"], str(main_soup))
+        content_catalog.record_output(conn, PATHS["index"], home_sig, str(main_soup))
+
+    conn.close()
     return True
 
 def render_bulk_actions(selection_key, item_type="files", custom_handler=None, key_suffix=""):
@@ -470,6 +472,7 @@ def render_file_list(files, selection_key, all_items=None, key_suffix=""):
     """
     Renders file list with persistent selection state.
     all_items: Optional, list of all available items (unfiltered) to allow global selection.
+    Status icons come from the module-level `catalog` connection.
     Returns: None (Uses st.session_state[selection_key])
     """
     # Initialize session state for this selection group if not exists
@@ -549,13 +552,7 @@ def render_file_list(files, selection_key, all_items=None, key_suffix=""):
         if isinstance(p, str):
             value = p
             name = os.path.basename(p)
-            status_icon = "🟢"
-            if "drafts" in p: 
-                status_icon = "🔴"
-            else:
-                with open(p, 'r', errors='ignore') as f:
-                    if 'content="unlisted"' in f.read():
-                        status_icon = "🟡"
+            status_icon = STATUS_ICONS.get(content_catalog.visibility_of(catalog, p), "🟢")
         else:
             # Complex object (e.g., from project cards)
             value = p['title']
@@ -565,10 +562,8 @@ def render_file_list(files, selection_key, all_items=None, key_suffix=""):
             is_hidden = p.get('hidden', False)
             status_icon = "🔴" if is_hidden else "🟢"
             target = p.get('target')
-            if target and os.path.exists(target):
-                 with open(target, 'r', errors='ignore') as f:
-                    if 'content="unlisted"' in f.read():
-                        status_icon = "🟡"
+            if target and content_catalog.visibility_of(catalog, target) == 'unlisted':
+                status_icon = "🟡"
 
         # Check interaction
         is_selected = value in st.session_state[selection_key]
@@ -586,6 +581,9 @@ def render_file_list(files, selection_key, all_items=None, key_suffix=""):
 
 st.title("⚡ AI Portfolio Dashboard")
 
+# One catalog sync per rerun; every tab below queries it instead of re-reading files
+catalog = get_catalog()
+
 # DEBUG INFO (Collapsed)
 with st.expander("Debug: Check Paths"):
     st.write(f"**Root Dir:** `{ROOT_DIR}`")
@@ -600,23 +598,8 @@ with tabs[0]:
     # Left: List | Right: Controls
     
     # 1. Split Public vs Unlisted
-    all_public_raw = get_files(PATHS["public_articles"])
-    real_public = []
-    unlisted_articles = []
-    
-    for p in all_public_raw:
-        is_unlisted = False
-        try:
-            with open(p, 'r', errors='ignore') as f:
-                if 'content="unlisted"' in f.read():
-                    is_unlisted = True
-        except:
-            pass
-            
-        if is_unlisted:
-            unlisted_articles.append(p)
-        else:
-            real_public.append(p)
+    real_public = content_catalog.documents(catalog, 'article', 'public', visibility='public')
+    unlisted_articles = content_catalog.documents(catalog, 'article', 'public', visibility='unlisted')
 
     # --- Section 1: Public Articles ---
     c_head, c_search = st.columns([2, 1])
@@ -659,7 +642,7 @@ with tabs[0]:
     c3, c4 = st.columns([3, 1])
     
     with c3:
-        draft_all = get_files(PATHS["draft_articles"])
+        draft_all = content_catalog.documents(catalog, 'article', 'draft')
         draft_files = draft_all
         
         if search_draft:
@@ -675,22 +658,8 @@ with tabs[1]:
     st.header("Manage Projects")
     
     # 1. Project Pages (Split Public vs Unlisted)
-    all_proj_raw = get_files(PATHS["public_projects"])
-    real_proj = []
-    unlisted_proj = []
-    
-    for p in all_proj_raw:
-        is_unlisted = False
-        try:
-             with open(p, 'r', errors='ignore') as f:
-                    if 'content="unlisted"' in f.read():
-                        is_unlisted = True
-        except: pass
-        
-        if is_unlisted:
-            unlisted_proj.append(p)
-        else:
-            real_proj.append(p)
+    real_proj = content_catalog.documents(catalog, 'project', 'public', visibility='public')
+    unlisted_proj = content_catalog.documents(catalog, 'project', 'public', visibility='unlisted')
 
     # Public Projects
     st.subheader("📂 Public Project Pages")
@@ -720,7 +689,7 @@ with tabs[1]:
     c3, c4 = st.columns([3, 1])
     
     with c3:
-        draft_proj_files = get_files(PATHS["draft_projects"])
+        draft_proj_files = content_catalog.documents(catalog, 'project', 'draft')
         with st.container(height=300, border=True):
             render_file_list(draft_proj_files, "selected_draft_projects", key_suffix="proj_draft")
     with c4:
@@ -940,4 +909,7 @@ with tabs[4]:
                 else: st.error(msg)
 
     st.divider()
+    with st.expander("⏱️ Last Build Profile"):
+        render_build_profile()
+
     st.info("Run this dashboard locally with: `streamlit run backend/dashboard.py`")
@@ -0,0 +1,167 @@
+"""
+Times migrate_articles.py against the local fixture server.
+
+    python benchmarks/bench_crawl.py [--pages 60] [--latency 0.05] [--per-host 4] [--concurrency 16]
+                                     [--rate 0] [--throttle 0.1]
+
+Runs the whole migration (crawl, rewrite, assets, listings) into temp site dirs:
+
+    serial        one request at a time, no response archive (the old behaviour)
+    concurrent    the given concurrency, filling an empty response archive
+    revalidate    again with that archive (conditional requests, 304s)
+    offline       again with --offline (no requests at all)
+    resume        crashed after --crash-after crawl steps, then run with --resume
+    throttled     the server refuses --throttle of all requests (429/503); retried
+
+Every run must write byte-identical files; the script exits 1 if they don't.
+"""
+import io
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import contextlib
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import migrate_articles
+import migration_journal
+from fixture_server import start_server, migration_config
+
+def make_site(root, config):
+    os.makedirs(os.path.join(root, 'articles'))
+    shutil.copy(os.path.join(ROOT_DIR, 'articles', 'template.html'), os.path.join(root, 'articles', 'template.html'))
+    shutil.copy(os.path.join(ROOT_DIR, 'articles.html'), os.path.join(root, 'articles.html'))
+    config_path = os.path.join(root, 'migration_sources.json')
+    with open(config_path, 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2)
+    return config_path
+
+def tree_digests(root):
+    digests = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            with open(path, 'rb') as f:
+                digests[os.path.relpath(path, root)] = hashlib.sha1(f.read()).hexdigest()
+    return digests
+
+class SimulatedCrash(Exception):
+    pass
+
+@contextlib.contextmanager
+def crash_after(steps):
+    """Makes the migration die right after journaling its steps-th crawl step."""
+    record = migration_journal.MigrationJournal.record
+    recorded = []
+
+    def crashing_record(journal, step):
+        record(journal, step)
+        recorded.append(step['url'])
+        if len(recorded) >= steps:
+            raise SimulatedCrash()
+
+    migration_journal.MigrationJournal.record = crashing_record
+    try:
+        yield
+    finally:
+        migration_journal.MigrationJournal.record = record
+
+def run_migration(config, per_host, total, max_articles, archive_path=None, offline=False, crash_steps=None, rate=0):
+    root = tempfile.mkdtemp(prefix='bench_crawl_')
+    config_path = make_site(root, config)
+    journal_path = os.path.join(root, 'journal.jsonl')
+    staging_dir = os.path.join(root, 'staging')
+    run = lambda resume: migrate_articles.main(
+        config_path=config_path, site_dir=root, max_articles=max_articles, per_host=per_host, total=total,
+        archive_path=archive_path, offline=offline, journal_path=journal_path, resume=resume, staging_dir=staging_dir,
+        rate=rate)
+
+    log = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        if crash_steps:
+            try:
+                with crash_after(crash_steps):
+                    run(False)
+            except SimulatedCrash:
+                pass
+        run(bool(crash_steps))
+    seconds = time.perf_counter() - start
+    os.remove(config_path)
+    return root, seconds, log.getvalue()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=60, help="Fixture articles on the stand-in server")
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds the server waits before every response")
+    parser.add_argument('--per-host', type=int, default=migrate_articles.PER_HOST_LIMIT)
+    parser.add_argument('--concurrency', type=int, default=migrate_articles.TOTAL_LIMIT)
+    parser.add_argument('--max-articles', type=int, default=migrate_articles.MAX_ARTICLES)
+    parser.add_argument('--crash-after', type=int, default=25, help="Crawl steps before the simulated crash of the resume run")
+    parser.add_argument('--rate', type=float, default=0, help="Requests per second per host (0: no limit, the server is local)")
+    parser.add_argument('--throttle', type=float, default=0.1, help="Fraction of requests refused in the throttled run")
+    args = parser.parse_args()
+
+    # Retry-After: 0 so the throttled run measures the backoff, not the server's wait
+    server, base_url = start_server(args.pages, args.latency, retry_after=0)
+    config = migration_config(base_url)
+    print(f"Fixture site: {args.pages} articles at {base_url}, {args.latency * 1000:.0f} ms latency")
+
+    work_dir = tempfile.mkdtemp(prefix='bench_crawl_archive_')
+    archive_path = os.path.join(work_dir, 'archive.sqlite3')
+    runs = [
+        ('serial', 1, 1, None, False),
+        ('concurrent', args.per_host, args.concurrency, archive_path, False),
+        ('revalidate', args.per_host, args.concurrency, archive_path, False),
+        ('offline', args.per_host, args.concurrency, archive_path, True),
+        ('resume', args.per_host, args.concurrency, None, False),
+        ('throttled', args.per_host, args.concurrency, None, False),
+    ]
+    roots = []
+    try:
+        print(f"  {'run':<12} {'seconds':>8} {'speedup':>8} {'200s':>6} {'304s':>6} {'429/503':>8}  retries")
+        digests = {}
+        serial_s = None
+        for name, per_host, total, archive, offline in runs:
+            before = dict(server.responses)
+            crash_steps = args.crash_after if name == 'resume' else None
+            server.throttle = args.throttle if name == 'throttled' else 0.0
+            root, seconds, log = run_migration(config, per_host, total, args.max_articles, archive, offline, crash_steps, args.rate)
+            roots.append(root)
+            digests[name] = tree_digests(root)
+            serial_s = serial_s or seconds
+            sent = {status: count - before.get(status, 0) for status, count in server.responses.items()}
+            refused = sent.get(429, 0) + sent.get(503, 0)
+            retries = sum(int(m) for m in re.findall(r'(\d+) retries', log))
+            print(f"  {name:<12} {seconds:>8.2f} {serial_s / seconds:>7.1f}x {sent.get(200, 0):>6} {sent.get(304, 0):>6} "
+                  f"{refused:>8} {retries:>8}")
+
+        serial = digests['serial']
+        articles = sum(1 for p in serial if p.startswith('articles' + os.sep) and p != os.path.join('articles', 'template.html'))
+        print(f"  {articles} article(s), {len(serial)} file(s) written per run")
+
+        failed = False
+        for name, tree in digests.items():
+            differing = sorted(p for p in serial.keys() | tree.keys() if serial.get(p) != tree.get(p))
+            if differing:
+                failed = True
+                print(f"\n{name} differs from serial in {len(differing)} file(s):")
+                for path in differing[:20]:
+                    print(f"  {path}")
+        if failed:
+            sys.exit(1)
+        print("Outputs identical.")
+    finally:
+        server.shutdown()
+        for root in roots + [work_dir]:
+            shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
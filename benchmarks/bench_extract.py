@@ -0,0 +1,76 @@
+"""
+Compares the BeautifulSoup and streaming article extractors on the real articles/ corpus.
+
+    python benchmarks/bench_extract.py [--repeat 3]
+
+Runs twice: on the corpus as-is (most articles are unlisted, so the streaming
+parser can stop at <head>) and on a temp copy with the visibility meta removed,
+which forces both parsers through every page. Fails if any record differs.
+"""
+import os
+import sys
+import glob
+import time
+import shutil
+import argparse
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import generate_search_index as gsi
+
+def time_parser(parse_fn, files, repeat):
+    best = None
+    results = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [gsi.parse_article_safe(p, parse_fn=parse_fn) for p in files]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+def compare(label, files, repeat):
+    t_bs4, ref = time_parser(gsi.parse_article, files, repeat)
+    t_stream, out = time_parser(gsi.parse_article_fast, files, repeat)
+
+    mismatches = []
+    for path, a, b in zip(files, ref, out):
+        # Errors only need to agree on failing, not on the message text
+        if (a[1] is None) != (b[1] is None) or (a[1] is None and a[0] != b[0]):
+            mismatches.append(os.path.basename(path))
+
+    print(f"{label}: {len(files)} files")
+    print(f"  bs4     {t_bs4 * 1000:8.1f} ms  ({t_bs4 / len(files) * 1000:.2f} ms/file)")
+    print(f"  stream  {t_stream * 1000:8.1f} ms  ({t_stream / len(files) * 1000:.2f} ms/file)")
+    print(f"  speedup {t_bs4 / t_stream:.1f}x, mismatches: {len(mismatches)}")
+    for name in mismatches[:10]:
+        print(f"    differs: {name}")
+    return not mismatches
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3, help="Best-of-N timing runs")
+    args = parser.parse_args()
+
+    files = sorted(p for p in glob.glob(os.path.join(gsi.ARTICLES_DIR, '*.html')) if not p.endswith('template.html'))
+    ok = compare("articles/ as-is", files, args.repeat)
+
+    tmp_dir = tempfile.mkdtemp(prefix='bench_extract_')
+    try:
+        public_files = []
+        for p in files:
+            with open(p, 'r', encoding='utf-8') as f:
+                html = f.read().replace('<meta content="unlisted" name="visibility"/>', '')
+            dst = os.path.join(tmp_dir, os.path.basename(p))
+            with open(dst, 'w', encoding='utf-8') as f:
+                f.write(html)
+            public_files.append(dst)
+        ok = compare("articles/ forced public", public_files, args.repeat) and ok
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
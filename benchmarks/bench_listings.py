@@ -0,0 +1,68 @@
+"""
+Compares the BeautifulSoup listing renderer with the compiled-template one.
+
+    python benchmarks/bench_listings.py [--articles 315] [--repeat 3]
+
+Renders every listing page for a synthetic set of --articles cards (the default is
+the size of the full articles/ corpus, 35 pages) against the real articles.html
+template, with both renderers. Fails if any page differs by a single byte.
+"""
+import os
+import sys
+import time
+import argparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import generate_search_index as gsi
+
+def synthetic_articles(n):
+    articles = []
+    for i in range(n):
+        articles.append({
+            "title": f"Synthetic Article {i}: Notes on Transformers & Tokenizers",
+            "date_str": f"Oct {i % 28 + 1:02d}, 2025",
+            "color": gsi.COLORS[i % len(gsi.COLORS)],
+            "icon": gsi.ICONS[i % len(gsi.ICONS)],
+            "link": f"articles/synthetic-article-{i}.html"
+        })
+    return articles
+
+def time_renderer(render_fn, template_html, articles, repeat):
+    best = None
+    pages = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pages = render_fn(template_html, articles)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, pages
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=315, help="Number of cards to paginate")
+    parser.add_argument('--repeat', type=int, default=3, help="Best-of-N timing runs")
+    args = parser.parse_args()
+
+    with open(gsi.TEMPLATE_FILE, 'r', encoding='utf-8') as f:
+        template_html = f.read()
+    articles = synthetic_articles(args.articles)
+
+    t_soup, ref = time_renderer(gsi.render_listings_soup, template_html, articles, args.repeat)
+    t_compiled, out = time_renderer(gsi.render_listings, template_html, articles, args.repeat)
+
+    mismatches = [a[0] for a, b in zip(ref, out) if a != b]
+    if len(ref) != len(out):
+        mismatches.append(f"page count {len(ref)} != {len(out)}")
+
+    print(f"{len(articles)} articles, {len(ref)} listing pages")
+    print(f"  soup      {t_soup * 1000:8.1f} ms  ({t_soup / len(ref) * 1000:.2f} ms/page)")
+    print(f"  compiled  {t_compiled * 1000:8.1f} ms  ({t_compiled / len(ref) * 1000:.2f} ms/page)")
+    print(f"  speedup {t_soup / t_compiled:.1f}x, mismatches: {len(mismatches)}")
+    for name in mismatches[:10]:
+        print(f"    differs: {name}")
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == "__main__":
+    main()
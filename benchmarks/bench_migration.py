@@ -0,0 +1,171 @@
+"""
+End-to-end benchmark and regression check of migrate_articles.py on a recorded corpus.
+
+    python benchmarks/bench_migration.py [--repeat 5] [--update-golden]
+
+The source pages, images and data files in benchmarks/migration_corpus/ (CodeMirror
+blocks in every mode, share/related/promo blocks, scripts, iframes, srcset and
+data-* attributes, links in every form the crawl has to dedupe, a 404, a special
+group index...) are served by the local fixture server. One migration fills a
+response archive from it; then the migration runs --repeat times with --offline
+into fresh site dirs, so the times are the migrator's own work:
+
+    pages/s       articles written per second
+    bytes/s       source bytes (pages) processed per second
+    stages        ms per cleaning stage (pass 1) and per article stage (pass 2)
+
+Every run's output (articles, listings, assets), with the server's address put
+back to the recorded origin, must match benchmarks/migration_golden/ byte for
+byte; the script prints a diff and exits 1 if it doesn't. After an intended
+change to the output, --update-golden rewrites the golden files.
+"""
+import io
+import os
+import sys
+import time
+import shutil
+import difflib
+import argparse
+import tempfile
+import contextlib
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import migrate_articles
+from fixture_server import start_server, load_corpus, corpus_config
+from bench_crawl import make_site
+
+CORPUS_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'migration_corpus')
+GOLDEN_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'migration_golden')
+TEXT_EXTENSIONS = ('.html', '.csv', '.json')
+
+def run_migration(config, archive_path, offline):
+    root = tempfile.mkdtemp(prefix='bench_migration_')
+    config_path = make_site(root, config)
+    report = {}
+    log = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        migrate_articles.main(
+            config_path=config_path, site_dir=root, archive_path=archive_path, offline=offline,
+            journal_path=os.path.join(root, 'journal.jsonl'), staging_dir=os.path.join(root, 'staging'),
+            rate=0, report=report)
+    report['seconds'] = time.perf_counter() - start
+    os.remove(config_path)
+    # The template is an input, not an output
+    os.remove(os.path.join(root, 'articles', 'template.html'))
+    return root, report, log.getvalue()
+
+def read_tree(root, replacements=()):
+    """{relative path: bytes} of every file under root, with the replacements applied to text files."""
+    tree = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            if name.endswith(TEXT_EXTENSIONS):
+                for old, new in replacements:
+                    data = data.replace(old.encode('utf-8'), new.encode('utf-8'))
+            tree[os.path.relpath(path, root).replace(os.sep, '/')] = data
+    return tree
+
+def diff_trees(golden, tree, context=3, limit=60):
+    """Lines describing how tree differs from golden (empty if identical)."""
+    lines = []
+    for path in sorted(golden.keys() | tree.keys()):
+        if golden.get(path) == tree.get(path):
+            continue
+        if path not in tree:
+            lines.append(f"missing: {path}")
+        elif path not in golden:
+            lines.append(f"unexpected: {path}")
+        elif not path.endswith(TEXT_EXTENSIONS):
+            lines.append(f"differs: {path} ({len(golden[path])} -> {len(tree[path])} bytes)")
+        else:
+            diff = difflib.unified_diff(golden[path].decode('utf-8').splitlines(), tree[path].decode('utf-8').splitlines(),
+                                        f"golden/{path}", f"output/{path}", n=context, lineterm='')
+            lines.extend(list(diff)[:limit])
+    return lines
+
+def write_golden(tree):
+    shutil.rmtree(GOLDEN_DIR, ignore_errors=True)
+    for path, data in tree.items():
+        out = os.path.join(GOLDEN_DIR, path)
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        with open(out, 'wb') as f:
+            f.write(data)
+
+def format_stages(timings, runs):
+    return ', '.join(f"{name} {seconds / runs * 1000:.2f}" for name, seconds in timings.items())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help="Offline runs to time")
+    parser.add_argument('--update-golden', action='store_true', help="Rewrite the golden files from this run's output")
+    args = parser.parse_args()
+
+    corpus = load_corpus(CORPUS_DIR)
+    server, base_url = start_server(corpus=corpus)
+    config = corpus_config(corpus, base_url)
+    # The server's address is in the output wherever the origin was (e.g. disabled links)
+    netloc = base_url.split('://', 1)[1]
+    source_domain = corpus['config']['source_domain']
+    replacements = [(base_url, corpus['origin']), (base_url.replace('http://', 'https://'), corpus['origin']),
+                    (netloc, source_domain)]
+    print(f"Corpus: {len(corpus['responses'])} recorded responses at {base_url}")
+
+    work_dir = tempfile.mkdtemp(prefix='bench_migration_archive_')
+    archive_path = os.path.join(work_dir, 'archive.sqlite3')
+    roots = []
+    try:
+        # 1. Record the corpus into a response archive (through the local server)
+        root, report, log = run_migration(config, archive_path, offline=False)
+        roots.append(root)
+        trees = [read_tree(root, replacements)]
+        print(f"  online:  {report['seconds']:.2f} s, {report['articles']} article(s), "
+              f"{server.bytes_sent / 1024:.0f} KB served")
+
+        # 2. Time the offline replays
+        page_stages, article_stages = {}, {}
+        seconds, source_bytes = [], 0
+        for _ in range(args.repeat):
+            root, report, log = run_migration(config, archive_path, offline=True)
+            roots.append(root)
+            trees.append(read_tree(root, replacements))
+            seconds.append(report['seconds'])
+            source_bytes = report['fetch']['bytes']
+            for totals, timings in ((page_stages, report['page_stages']), (article_stages, report['article_stages'])):
+                for name, value in timings.items():
+                    totals[name] = totals.get(name, 0.0) + value
+        best = min(seconds)
+        print(f"  offline: best {best * 1000:.1f} ms of {args.repeat}, {report['articles'] / best:.1f} pages/s, "
+              f"{source_bytes / best / 1024:.0f} KB/s of source pages")
+        print(f"  page stages (ms per run):    {format_stages(page_stages, args.repeat)}")
+        print(f"  article stages (ms per run): {format_stages(article_stages, args.repeat)}")
+
+        # 3. Compare with the golden files
+        for i, tree in enumerate(trees[1:], 1):
+            if tree != trees[0]:
+                print(f"\nOffline run {i} differs from the online run:")
+                print('\n'.join(diff_trees(trees[0], tree)))
+                sys.exit(1)
+        if args.update_golden:
+            write_golden(trees[0])
+            print(f"Golden files updated: {len(trees[0])} file(s) in {os.path.relpath(GOLDEN_DIR, ROOT_DIR)}")
+            return
+        differences = diff_trees(read_tree(GOLDEN_DIR), trees[0])
+        if differences:
+            print(f"\nOutput differs from {os.path.relpath(GOLDEN_DIR, ROOT_DIR)} "
+                  "(run with --update-golden if the change is intended):")
+            print('\n'.join(differences))
+            sys.exit(1)
+        print(f"Output matches the golden files ({len(trees[0])} file(s)).")
+    finally:
+        server.shutdown()
+        for root in roots + [work_dir]:
+            shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
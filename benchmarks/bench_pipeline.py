@@ -0,0 +1,318 @@
+"""
+Times every stage of the site build on synthetic corpora.
+
+    python benchmarks/bench_pipeline.py [--sizes 1000,10000,100000] [--parser stream] [--jobs 1] [--repeat 3]
+    python benchmarks/bench_pipeline.py --sizes 1000,10000 --save-baseline
+
+For each size, N public articles are generated from articles/template.html (plus
+N/10 project pages from projects/machine_learning.html) in a temp dir, and the
+build stages run against it in a fresh process:
+
+    corpus        writing the synthetic files (fixture setup: reported, never compared)
+    parse         parse_many() over every article
+    catalog_cold  content_catalog.sync() into an empty catalog (hash + parse + insert)
+    catalog_warm  the same sync again, nothing changed (stat only)
+    listings      generate_listings() for all articles
+    projects      parse_projects()
+    search_index  build_inverted_index() + write_search_index()
+
+Every stage runs --repeat times and its best time is kept, so one slow run (a
+busy machine, a cold disk cache) doesn't count as a regression. Seconds, items/s
+and RSS growth per stage, and peak RSS per size, are written to
+benchmarks/pipeline_results.json and compared with benchmarks/pipeline_baseline.json
+(committed: 1000 and 10000 articles, the default parser, jobs and repeat). Every run
+also times a fixed calibration workload, and the baseline's times are scaled by how
+much slower or faster that ran, which absorbs a busy or throttled machine. If the
+parser and jobs match, a stage is flagged when it is both more than --threshold and
+more than --min-delta seconds slower than that, and a peak when it is more than
+--threshold larger; the script then exits 1. Sizes the baseline doesn't have are not
+compared.
+
+Calibration only covers a machine's speed drifting, not a different machine (other
+CPU, Python or disk). The baseline must be re-recorded with --save-baseline, on an
+unchanged tree, on the machine that runs the comparison.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import itertools
+import datetime
+import tempfile
+import subprocess
+from functools import partial
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import content_catalog
+import generate_search_index as gsi
+from build_profile import peak_rss_mb
+from bs4 import BeautifulSoup
+from inverted_index import build_inverted_index, tokenize
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_FILE = os.path.join(BENCH_DIR, 'pipeline_results.json')
+BASELINE_FILE = os.path.join(BENCH_DIR, 'pipeline_baseline.json')
+ARTICLE_TEMPLATE = os.path.join(ROOT_DIR, 'articles', 'template.html')
+PROJECT_TEMPLATE = gsi.PROJECTS_FILE
+
+STAGES = ['corpus', 'parse', 'catalog_cold', 'catalog_warm', 'listings', 'projects', 'search_index']
+# Generating the synthetic corpus is fixture setup, not part of the build
+COMPARED_STAGES = [name for name in STAGES if name != 'corpus']
+REPEAT = 3
+MIN_DELTA = 0.05  # seconds; smaller slowdowns are noise whatever their percentage
+CALIBRATION_PAGES = 100
+
+# --- SYNTHETIC CORPUS ---
+
+SYLLABLES = ['ka', 'to', 'ne', 'ri', 'mo', 'sa', 'lu', 'vi', 'de', 'po', 'an', 'el', 'in', 'or', 'um', 'ex']
+
+def make_vocabulary(rng, size=5000):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+def make_text(rng, vocab, cum_weights, n_words):
+    return ' '.join(rng.choices(vocab, cum_weights=cum_weights, k=n_words))
+
+def make_article(template, rng, vocab, cum_weights):
+    title = make_text(rng, vocab, cum_weights, rng.randint(3, 8)).title()
+    date = datetime.date(2023, 1, 1) + datetime.timedelta(days=rng.randrange(3 * 365))
+    lead = make_text(rng, vocab, cum_weights, 40)
+    paragraphs = ''.join(f"<p>{make_text(rng, vocab, cum_weights, rng.randint(40, 120))}</p>\n" for _ in range(6))
+    html = template
+    html = html.replace('<meta content="unlisted" name="visibility"/>', '')
+    html = html.replace('Article Title | Kishna', f'{title} | Kishna')
+    html = html.replace('Article Title Goes Here', title)
+    html = html.replace('Dec 18, 2025', date.strftime('%b %d, %Y'))
+    html = html.replace('<p>Paragraph text goes here...</p>', paragraphs)
+    html = html.replace('This is the introduction or lead paragraph of the article. It should be engaging and summarize\n                        what the reader will learn.', lead)
+    return html
+
+def make_corpus(root, n, seed=42):
+    """Writes root/articles/*.html (n articles) and root/projects/*.html (n/10 pages)."""
+    rng = random.Random(seed)
+    vocab = make_vocabulary(rng)
+    # Zipf-like term frequencies
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocab))))
+
+    with open(ARTICLE_TEMPLATE, 'r', encoding='utf-8') as f:
+        article_template = f.read()
+    with open(PROJECT_TEMPLATE, 'r', encoding='utf-8') as f:
+        project_template = f.read()
+
+    articles_dir = os.path.join(root, 'articles')
+    projects_dir = os.path.join(root, 'projects')
+    os.makedirs(articles_dir)
+    os.makedirs(projects_dir)
+
+    files = []
+    for i in range(n):
+        path = os.path.join(articles_dir, f'synthetic-{i:06d}.html')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(make_article(article_template, rng, vocab, cum_weights))
+        files.append(path)
+
+    for i in range(max(1, n // 10)):
+        with open(os.path.join(projects_dir, f'projects_{i:05d}.html'), 'w', encoding='utf-8') as f:
+            f.write(project_template.replace('Machine Learning Projects', f'Synthetic Projects {i}'))
+
+    shutil.copy(gsi.TEMPLATE_FILE, os.path.join(root, 'articles.html'))
+    return files
+
+# --- CALIBRATION ---
+# A fixed workload of the same kind as the build (parse and tokenize a page),
+# timed in every run: comparisons scale the baseline by how fast this machine runs
+# it now, so a slower or busier machine isn't taken for a slower build.
+
+def calibrate(runs):
+    with open(ARTICLE_TEMPLATE, 'r', encoding='utf-8') as f:
+        page = f.read()
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _ in range(CALIBRATION_PAGES):
+            tokenize(BeautifulSoup(page, 'html.parser').get_text(' '))
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+# --- ONE SIZE (runs in its own process so peak RSS is per size) ---
+
+def run_size(n, parser, jobs, repeat=REPEAT):
+    root = tempfile.mkdtemp(prefix=f'bench_pipeline_{n}_')
+    stages = {}
+
+    def timed(name, items, fn, runs=repeat):
+        # Best of runs: the other runs only add scheduler and cache noise
+        rss_before = peak_rss_mb()
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - start)
+        seconds = min(times)
+        rss_after = peak_rss_mb()
+        stages[name] = {
+            "seconds": round(seconds, 4),
+            "runs": runs,
+            "items": items,
+            "items_per_s": round(items / seconds, 1) if seconds else None,
+            "rss_growth_mb": round(rss_after[0] - rss_before[0], 1) if rss_after else None,
+        }
+        return result
+
+    calibration = calibrate(repeat)
+    try:
+        files = timed('corpus', n, lambda: make_corpus(root, n), runs=1)
+        parse = partial(gsi.parse_many, jobs=jobs, parser=parser)
+        timed('parse', n, lambda: sum(1 for _ in parse(files)))
+
+        catalogs = []
+
+        def catalog_cold():
+            # A new, empty catalog file every run
+            catalogs.append(os.path.join(root, f'catalog-{len(catalogs)}.sqlite3'))
+            cold = content_catalog.connect(catalogs[-1])
+            content_catalog.sync(cold, 'article', 'public', files, parse)
+            cold.close()
+        timed('catalog_cold', n, catalog_cold)
+        conn = content_catalog.connect(catalogs[-1])
+        timed('catalog_warm', n, lambda: content_catalog.sync(conn, 'article', 'public', files, parse))
+
+        articles = [gsi.record_from_row(row) for row in content_catalog.listed_articles(conn, order='date')]
+        timed('listings', len(articles), lambda: gsi.generate_listings(
+            articles, template_file=os.path.join(root, 'articles.html'), output_dir=root))
+
+        projects_dir = os.path.join(root, 'projects')
+        projects = timed('projects', len(os.listdir(projects_dir)), lambda: gsi.parse_projects(projects_dir))
+
+        entries = [{"title": a['title'], "description": a['description'], "url": a['url']} for a in articles] + projects
+        bodies = content_catalog.body_terms(conn, [a['url'] for a in articles])
+        conn.close()
+
+        def search_index():
+            inverted = build_inverted_index(entries, bodies)
+            gsi.write_search_index(entries, inverted, index_dir=os.path.join(root, 'search-index'), site_dir=root)
+        timed('search_index', len(entries), search_index)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    # Before and after: the best of both is the machine's speed during this run
+    calibration = min(calibration, calibrate(repeat))
+    peak = peak_rss_mb()
+    return {
+        "size": n,
+        "calibration_s": round(calibration, 4),
+        "stages": stages,
+        "peak_rss_mb": {"main": peak[0], "workers": peak[1]} if peak else None,
+    }
+
+def run_size_subprocess(n, parser, jobs, repeat):
+    cmd = [sys.executable, os.path.abspath(__file__), '--run-size', str(n), '--parser', parser, '--jobs', str(jobs),
+           '--repeat', str(repeat)]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    # The last line is the JSON result; everything before it is generator output
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+# --- REPORTING ---
+
+def print_size(result):
+    peak = result['peak_rss_mb']
+    print(f"\n{result['size']} articles" + (f"  (peak RSS {peak['main']} MB)" if peak else ""))
+    print(f"  {'stage':<14} {'seconds':>9} {'items/s':>11} {'RSS +MB':>8}")
+    for name in STAGES:
+        stage = result['stages'][name]
+        print(f"  {name:<14} {stage['seconds']:>9.3f} {stage['items_per_s'] or 0:>11.1f} {stage['rss_growth_mb'] or 0:>8.1f}")
+
+def compare(results, baseline, threshold, min_delta=MIN_DELTA):
+    """
+    Returns a list of regression messages: a stage more than threshold and more than
+    min_delta seconds slower than the baseline (scaled by the calibration times), or a
+    peak RSS more than threshold larger.
+    """
+    if (baseline.get('parser'), baseline.get('jobs')) != (results['parser'], results['jobs']):
+        print(f"\nBaseline was recorded with parser={baseline.get('parser')} jobs={baseline.get('jobs')}; not comparing.")
+        return []
+
+    regressions = []
+    base_sizes = {r['size']: r for r in baseline['sizes']}
+    for result in results['sizes']:
+        base = base_sizes.get(result['size'])
+        if base is None:
+            continue
+        speed = result['calibration_s'] / base['calibration_s'] if base.get('calibration_s') else 1.0
+        print(f"{result['size']}: machine at {1 / speed:.0%} of the baseline's speed (calibration "
+              f"{base.get('calibration_s', 0):.3f}s -> {result['calibration_s']:.3f}s)")
+        for name in COMPARED_STAGES:
+            new, old = result['stages'][name]['seconds'], base['stages'].get(name, {}).get('seconds')
+            if not old:
+                continue
+            expected = old * speed
+            if new > expected * (1 + threshold) and new - expected > min_delta:
+                regressions.append(f"{result['size']}/{name}: {old:.3f}s (x{speed:.2f} = {expected:.3f}s) -> "
+                                   f"{new:.3f}s (+{(new / expected - 1):.0%})")
+        new_peak, old_peak = result['peak_rss_mb'], base.get('peak_rss_mb')
+        if new_peak and old_peak and new_peak['main'] > old_peak['main'] * (1 + threshold):
+            regressions.append(f"{result['size']}/peak RSS: {old_peak['main']} MB -> {new_peak['main']} MB")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,10000,100000', help="Comma-separated corpus sizes")
+    parser.add_argument('--parser', choices=sorted(gsi.PARSERS), default='stream', help="Article extractor to time")
+    parser.add_argument('--jobs', '-j', type=int, default=1, help="Worker processes for parsing")
+    parser.add_argument('--repeat', type=int, default=REPEAT, help="Runs per stage; the best time is kept")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed slowdown/growth vs. the baseline (0.2 = 20%%)")
+    parser.add_argument('--min-delta', type=float, default=MIN_DELTA,
+                        help="Slowdowns of at most this many seconds are never flagged")
+    parser.add_argument('--save-baseline', action='store_true', help=f"Also store the results as {os.path.basename(BASELINE_FILE)}")
+    parser.add_argument('--run-size', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_size:
+        result = run_size(args.run_size, args.parser, args.jobs, args.repeat)
+        print(json.dumps(result))
+        return
+
+    results = {
+        "recorded": datetime.datetime.now().isoformat(timespec='seconds'),
+        "python": sys.version.split()[0],
+        "parser": args.parser,
+        "jobs": args.jobs,
+        "repeat": args.repeat,
+        "sizes": []
+    }
+    for n in (int(s) for s in args.sizes.split(',')):
+        result = run_size_subprocess(n, args.parser, args.jobs, args.repeat)
+        results['sizes'].append(result)
+        print_size(result)
+
+    with open(RESULTS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {os.path.relpath(RESULTS_FILE, ROOT_DIR)}")
+
+    if args.save_baseline:
+        shutil.copy(RESULTS_FILE, BASELINE_FILE)
+        print(f"Baseline saved to {os.path.relpath(BASELINE_FILE, ROOT_DIR)}")
+        return
+
+    if not os.path.exists(BASELINE_FILE):
+        print("No baseline yet; run with --save-baseline to store one.")
+        return
+    with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold, args.min_delta)
+    if regressions:
+        print(f"\nRegressions above {args.threshold:.0%} (and {args.min_delta}s):")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"\nNo regressions above {args.threshold:.0%} against the baseline from {baseline['recorded']}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Local stand-in for the source blog, for running migrate_articles.py offline.
+
+    python benchmarks/fixture_server.py [--pages 60] [--port 8765] [--latency 0.05] [--throttle 0.1]
+
+Serves a deterministic WordPress-like site on 127.0.0.1: article pages under
+/YYYY/MM/DD/<slug>/ with an .entry-content block, CodeMirror code blocks, links to
+other articles (so discovery has something to follow) and images under
+/wp-content/uploads/. /special/ links to a few articles the way the Python
+interview index does. Every response is delayed by --latency seconds. Responses
+carry an ETag and Last-Modified and conditional requests get 304s; the server
+counts the responses it sent by status in server.responses.
+
+With --throttle (or server.throttle), that fraction of requests is refused, as a
+rate-limited host would: alternately a 429 with Retry-After (server.retry_after
+seconds) and a bare 503.
+
+With --corpus DIR it serves a recorded corpus instead (see
+benchmarks/migration_corpus/manifest.json): the files listed for each path, with
+the recorded origin (e.g. https://amanxai.com) in text bodies replaced by the
+server's own address. Like WordPress, a listed path asked for without its
+trailing slash is redirected. server.bytes_sent counts the body bytes sent.
+"""
+import os
+import json
+import time
+import zlib
+import random
+import struct
+import hashlib
+import argparse
+import threading
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+PAGE_COUNT = 60
+LINKS_PER_PAGE = 4
+IMAGES_PER_PAGE = 2
+SPECIAL_PATH = '/special/'
+
+WORDS = ['model', 'data', 'training', 'feature', 'python', 'network', 'layer', 'vector',
+         'regression', 'pipeline', 'cluster', 'token', 'matrix', 'gradient', 'sample', 'metric']
+
+def article_path(i):
+    return f"/2024/{i % 12 + 1:02d}/{i % 28 + 1:02d}/fixture-article-{i}/"
+
+def image_path(i, k):
+    return f"/wp-content/uploads/2024/fixture-{i}-{k}.png"
+
+def article_title(i):
+    rng = random.Random(i)
+    return ' '.join(rng.choice(WORDS) for _ in range(4)).title() + f" {i}"
+
+def article_page(base, i, pages):
+    rng = random.Random(i)
+    paragraphs = ''.join(
+        f"<p>{' '.join(rng.choice(WORDS) for _ in range(rng.randint(30, 80)))}.</p>\n" for _ in range(5))
+    links = ''.join(
+        f'<li><a href="{base}{article_path(rng.randrange(pages))}">related</a></li>' for _ in range(LINKS_PER_PAGE))
+    images = ''.join(
+        f'<figure><img src="{base}{image_path(i, k)}" srcset="{base}{image_path(i, k)} 2x" data-lazy="{base}{image_path(i, k)}"/></figure>'
+        for k in range(IMAGES_PER_PAGE))
+    return f"""<!DOCTYPE html>
+<html><head><title>{article_title(i)}</title></head>
+<body>
+<h1>{article_title(i)}</h1>
+<div class="entry-content">
+{paragraphs}
+<div class="wp-block-codemirror-blocks-code-block"><pre data-setting='{{"mode": "python"}}'>import pandas as pd
+print(pd.__version__)</pre></div>
+{images}
+<ul>{links}</ul>
+<p>follow me on Instagram for more</p>
+<div class="jp-relatedposts">related posts</div>
+<script>console.log('tracking')</script>
+</div>
+</body></html>""".encode('utf-8')
+
+def special_page(base, pages):
+    links = ''.join(f'<a href="{base}{article_path(i)}">part {i}</a>' for i in range(0, pages, 7))
+    return f"""<html><body><h1>Python Problems</h1><div class="entry-content"><p>{links}</p></div></body></html>""".encode('utf-8')
+
+LAST_MODIFIED = 'Mon, 01 Jan 2024 00:00:00 GMT'
+
+def make_png(width, height, seed):
+    """A valid RGB PNG of the given size filled with noise from seed."""
+    rng = random.Random(seed)
+    rows = b''.join(b'\0' + rng.randbytes(width * 3) for _ in range(height))
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(rows)) + chunk(b'IEND', b''))
+
+def image_bytes(name):
+    # fixture-<i>-0.png is a picture of its own; every fixture-<i>-1.png is the same
+    # site logo under another name, for the asset downloader's de-duplication
+    _, i, k = name[:-len('.png')].split('-')
+    if k == '1':
+        return make_png(64, 32, 'logo')
+    return make_png(160 + int(i) % 5 * 40, 90 + int(i) % 3 * 30, name)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    pages = PAGE_COUNT
+    latency = 0.0
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.throttled():
+            return
+        base = f"http://{self.headers.get('Host')}"
+        path = self.path.split('?')[0]
+        paths = {article_path(i): i for i in range(self.pages)}
+
+        if path == SPECIAL_PATH:
+            self.respond(200, 'text/html; charset=utf-8', special_page(base, self.pages))
+        elif path in paths:
+            self.respond(200, 'text/html; charset=utf-8', article_page(base, paths[path], self.pages))
+        elif path.startswith('/wp-content/uploads/'):
+            self.respond(200, 'image/png', image_bytes(path.rsplit('/', 1)[-1]))
+        else:
+            self.respond(404, 'text/html; charset=utf-8',
+                         b"<html><body><h1>Oops! That page can\xe2\x80\x99t be found.</h1><article><p>Not here.</p></article></body></html>")
+
+    def throttled(self):
+        with self.server.lock:
+            if not self.server.throttle or self.server.rng.random() >= self.server.throttle:
+                return False
+            self.server.refused += 1
+            status = 429 if self.server.refused % 2 else 503
+            self.server.responses[status] += 1
+        body = b"<html><body><h1>Too Many Requests</h1></body></html>"
+        self.send_response(status)
+        if status == 429:
+            self.send_header('Retry-After', str(self.server.retry_after))
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        return True
+
+    def respond(self, status, content_type, body):
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        # If-None-Match wins over If-Modified-Since when both are sent
+        if 'If-None-Match' in self.headers:
+            not_modified = self.headers['If-None-Match'] == etag
+        else:
+            not_modified = self.headers.get('If-Modified-Since') == LAST_MODIFIED
+        if status == 200 and not_modified:
+            status, body = 304, b''
+        with self.server.lock:
+            self.server.responses[status] += 1
+            self.server.bytes_sent += len(body)
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CorpusHandler(FixtureHandler):
+    corpus = None  # load_corpus()
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.throttled():
+            return
+        base = f"http://{self.headers.get('Host')}"
+        path = self.path.split('?')[0]
+        response = self.corpus['responses'].get(path)
+        if response is None and path + '/' in self.corpus['responses']:
+            return self.redirect(f"{base}{path}/")
+        if response is None:
+            status, content_type, body = 404, 'text/html; charset=utf-8', self.corpus['not_found']
+        else:
+            status, content_type, body = response.get('status', 200), response['content_type'], response['body']
+        if content_type.startswith('text/'):
+            body = body.replace(self.corpus['origin'].encode('utf-8'), base.encode('utf-8'))
+        self.respond(status, content_type, body)
+
+
+    def redirect(self, location):
+        with self.server.lock:
+            self.server.responses[301] += 1
+        self.send_response(301)
+        self.send_header('Location', location)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+def load_corpus(corpus_dir):
+    """The manifest of a recorded corpus, with every file's bytes loaded."""
+    with open(os.path.join(corpus_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+        corpus = json.load(f)
+
+    def read(name):
+        with open(os.path.join(corpus_dir, name), 'rb') as f:
+            return f.read()
+    corpus['not_found'] = read(corpus['not_found'])
+    for response in corpus['responses'].values():
+        response['body'] = read(response['file'])
+    return corpus
+
+def corpus_config(corpus, base_url):
+    """The corpus' migration config, pointed at base_url instead of the recorded origin."""
+    config = json.loads(json.dumps(corpus['config']).replace(corpus['origin'], base_url))
+    config['source_domain'] = base_url.split('://', 1)[1]
+    return config
+
+def start_server(pages=PAGE_COUNT, latency=0.0, port=0, throttle=0.0, retry_after=1, corpus=None):
+    """
+    Serves the fixture site (or a corpus from load_corpus()) from a background
+    thread. Returns (server, base_url).
+    """
+    if corpus is None:
+        handler = type('Handler', (FixtureHandler,), {'pages': pages, 'latency': latency})
+    else:
+        handler = type('Handler', (CorpusHandler,), {'corpus': corpus, 'latency': latency})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    server.responses = Counter()
+    server.bytes_sent = 0
+    server.lock = threading.Lock()
+    server.throttle = throttle
+    server.retry_after = retry_after
+    server.refused = 0
+    server.rng = random.Random(0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def migration_config(base_url, seeds=3):
+    """A migration_sources.json for migrate_articles.py pointing at the fixture site."""
+    return {
+        "guided_projects": [{"url": f"{base_url}{article_path(0)}", "title": "Fixture Guided Project"}],
+        "discovery_seeds": [{"url": f"{base_url}{article_path(i)}"} for i in range(1, seeds + 1)],
+        "source_domain": base_url.split('://', 1)[1],
+        "assets_path": "/wp-content/uploads/",
+        "special_group_url": f"{base_url}{SPECIAL_PATH}",
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=PAGE_COUNT, help="Number of article pages")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds to delay every response")
+    parser.add_argument('--throttle', type=float, default=0.0, help="Fraction of requests refused with 429/503")
+    parser.add_argument('--retry-after', type=int, default=1, help="Retry-After seconds sent with a 429")
+    parser.add_argument('--corpus', help="Serve this recorded corpus directory instead of generated pages")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else None
+    server, base_url = start_server(args.pages, args.latency, args.port, args.throttle, args.retry_after, corpus)
+    if corpus:
+        print(f"Serving {len(corpus['responses'])} recorded responses from {args.corpus} at {base_url} (Ctrl+C to stop)")
+    else:
+        print(f"Serving {args.pages} fixture articles at {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
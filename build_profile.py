@@ -0,0 +1,123 @@
+import os
+import json
+import time
+import datetime
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Timing report for generate_search_index.py --profile: wall and CPU time per build
+# phase and per parsed file, plus peak memory. Written as JSON so the dashboard (or
+# anything else) can show the last run.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILE_FILE = os.path.join(BASE_DIR, '.build-profile.json')
+
+def peak_rss_mb():
+    """Peak resident memory of this process and of its finished worker processes."""
+    if resource is None:
+        return None
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    scale = 1024 * 1024 if os.uname().sysname == 'Darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return round(own, 1), round(children, 1)
+
+def timed_call(fn, *args):
+    # Runs in worker processes too: process_time() is the CPU time of whoever runs it
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = fn(*args)
+    return result, time.perf_counter() - wall, time.process_time() - cpu
+
+
+class BuildProfiler:
+    """
+    Collects phase and file timings. A disabled profiler (the default outside
+    --profile) keeps the same interface but records nothing.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.started = datetime.datetime.now()
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.phases = []
+        self.files = []
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.phases.append({
+                "name": name,
+                "wall_s": round(time.perf_counter() - wall, 4),
+                "cpu_s": round(time.process_time() - cpu, 4),
+            })
+
+    def record_file(self, path, wall, cpu, error=None):
+        if not self.enabled:
+            return
+        self.files.append({
+            "path": os.path.relpath(path, BASE_DIR),
+            "wall_s": round(wall, 4),
+            "cpu_s": round(cpu, 4),
+            "error": error,
+        })
+
+    def report(self, options=None):
+        peak = peak_rss_mb()
+        return {
+            "started": self.started.isoformat(timespec='seconds'),
+            "options": options or {},
+            "total": {
+                "wall_s": round(time.perf_counter() - self.wall_start, 4),
+                "cpu_s": round(time.process_time() - self.cpu_start, 4),
+            },
+            "peak_rss_mb": {"main": peak[0], "workers": peak[1]} if peak else None,
+            "phases": self.phases,
+            # Slowest first; only files that were (re-)parsed in this run
+            "files": sorted(self.files, key=lambda f: f['wall_s'], reverse=True),
+        }
+
+    def write(self, path=PROFILE_FILE, options=None):
+        report = self.report(options)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        return report
+
+
+def load_report(path=PROFILE_FILE):
+    """The last written report, or None."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def print_report(report, top=10):
+    total = report['total']
+    print(f"\nBuild profile: {total['wall_s']:.3f}s wall, {total['cpu_s']:.3f}s CPU (main process)")
+    if report['peak_rss_mb']:
+        print(f"  peak RSS: {report['peak_rss_mb']['main']} MB main, {report['peak_rss_mb']['workers']} MB largest worker")
+
+    print(f"  {'phase':<24} {'wall s':>9} {'cpu s':>9}")
+    for phase in report['phases']:
+        print(f"  {phase['name']:<24} {phase['wall_s']:>9.3f} {phase['cpu_s']:>9.3f}")
+
+    files = report['files']
+    if not files:
+        print("  no files were parsed (all reused from the catalog; use --force to time every file)")
+        return
+    print(f"  slowest {min(top, len(files))} of {len(files)} parsed file(s):")
+    print(f"  {'wall ms':>9} {'cpu ms':>9}  file")
+    for f in files[:top]:
+        note = "  (error)" if f['error'] else ""
+        print(f"  {f['wall_s'] * 1000:>9.1f} {f['cpu_s'] * 1000:>9.1f}  {f['path']}{note}")
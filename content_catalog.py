@@ -0,0 +1,279 @@
+import os
+import json
+import sqlite3
+import hashlib
+
+# Single source of article/project metadata for generate_search_index.py and the
+# dashboard. Rows are kept in sync with the HTML files incrementally: a file is only
+# re-parsed when its size/mtime and then its content hash change.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CATALOG_FILE = os.path.join(BASE_DIR, '.content_catalog.sqlite3')
+
+# Bump when the schema or the extracted fields change; the catalog is then rebuilt
+CATALOG_VERSION = 5
+
+# (kind, location) -> directory scanned for *.html
+SOURCES = {
+    ('article', 'public'): os.path.join(BASE_DIR, 'articles'),
+    ('article', 'draft'): os.path.join(BASE_DIR, 'backend', 'drafts', 'articles'),
+    ('project', 'public'): os.path.join(BASE_DIR, 'projects'),
+    ('project', 'draft'): os.path.join(BASE_DIR, 'backend', 'drafts', 'projects'),
+}
+
+# Pages that live in articles/ but are not articles
+EXCLUDED_TITLES = ("Articles", "404 Not Found")
+
+RECORD_FIELDS = ['title', 'description', 'url', 'category', 'date_str', 'image', 'color', 'icon', 'link']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    path TEXT PRIMARY KEY,      -- relative to the repo root
+    kind TEXT NOT NULL,         -- 'article' | 'project'
+    location TEXT NOT NULL,     -- 'public' | 'draft'
+    slug TEXT NOT NULL,         -- file name, e.g. 'my-article.html'
+    mtime INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha1 TEXT NOT NULL,
+    visibility TEXT NOT NULL,   -- 'public' | 'unlisted' | 'private'
+    date_sort TEXT NOT NULL,    -- ISO timestamp, '0001-01-01T00:00:00' when undated
+    title TEXT,
+    description TEXT,
+    url TEXT,
+    category TEXT,
+    date_str TEXT,
+    image TEXT,
+    color TEXT,
+    icon TEXT,
+    link TEXT,
+    body_terms TEXT             -- JSON {token: count} of the article body
+);
+CREATE INDEX IF NOT EXISTS idx_documents_date ON documents (date_sort);
+CREATE INDEX IF NOT EXISTS idx_documents_visibility ON documents (kind, location, visibility);
+CREATE INDEX IF NOT EXISTS idx_documents_slug ON documents (slug);
+
+-- Dependency graph of generated files: an output is current while the signature of
+-- the inputs it was rendered from is unchanged and nobody edited the file itself
+CREATE TABLE IF NOT EXISTS outputs (
+    path TEXT PRIMARY KEY,      -- relative to the repo root, e.g. 'articles-3.html'
+    signature TEXT NOT NULL,    -- sha1 of the inputs (template, page number, cards, ...)
+    sha1 TEXT NOT NULL          -- sha1 of the bytes written
+);
+
+-- Images (image_dimensions.py): content hash by size/mtime, pixel size by content hash
+CREATE TABLE IF NOT EXISTS image_files (
+    path TEXT PRIMARY KEY,      -- relative to the repo root
+    mtime INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha1 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS image_sizes (
+    sha1 TEXT PRIMARY KEY,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL
+);
+"""
+
+def connect(db_path=CATALOG_FILE):
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version != CATALOG_VERSION:
+        conn.execute("DROP TABLE IF EXISTS documents")
+        conn.execute("DROP TABLE IF EXISTS outputs")
+        conn.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+    conn.executescript(SCHEMA)
+    return conn
+
+def hash_file(file_path):
+    with open(file_path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def signature(*inputs):
+    """Stable sha1 of any JSON-serializable inputs."""
+    payload = json.dumps(inputs, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+def list_source_files(kind, location):
+    directory = SOURCES[(kind, location)]
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(n for n in os.listdir(directory) if n.endswith('.html') and n != 'template.html')
+    return [os.path.join(directory, n) for n in names]
+
+def sync(conn, kind, location, file_paths, parse_many, force=False):
+    """
+    Brings the rows for (kind, location) in line with file_paths.
+
+    parse_many(paths) must yield (record, error) per path in order, where record is
+    the generator's article dict (None for unlisted pages). Files that fail to parse
+    keep a record-less row and are re-parsed (and reported) on the next run.
+    Returns (parsed, reused, failed).
+    """
+    existing = {
+        row['path']: row for row in conn.execute(
+            "SELECT path, mtime, size, sha1 FROM documents WHERE kind = ? AND location = ?", (kind, location))
+    }
+    pending = []  # (file_path, rel_path, stat, sha1)
+    seen = set()
+
+    for file_path in file_paths:
+        rel_path = os.path.relpath(file_path, BASE_DIR)
+        seen.add(rel_path)
+        st = os.stat(file_path)
+        row = None if force else existing.get(rel_path)
+
+        if row and row['mtime'] == st.st_mtime_ns and row['size'] == st.st_size:
+            continue
+
+        # mtime changed (e.g. touched or checked out again) - compare content before re-parsing
+        sha1 = hash_file(file_path)
+        if row and row['sha1'] == sha1:
+            conn.execute("UPDATE documents SET mtime = ?, size = ? WHERE path = ?",
+                         (st.st_mtime_ns, st.st_size, rel_path))
+            continue
+
+        pending.append((file_path, rel_path, st, sha1))
+
+    failed = 0
+    parsed = parse_many([p[0] for p in pending])
+    for (file_path, rel_path, st, sha1), (record, error) in zip(pending, parsed):
+        if error is not None:
+            print(f"Error parsing {file_path}: {error}")
+            failed += 1
+            # Keep the file visible to the dashboard, but with no record (never listed)
+            # and a fingerprint that can't match, so it is parsed and reported again next run
+            record = None
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                unlisted = 'content="unlisted"' in f.read()
+            st_mtime, sha1 = -1, ''
+        else:
+            unlisted = record is None
+            st_mtime = st.st_mtime_ns
+
+        if location == 'draft':
+            visibility = 'private'
+        else:
+            visibility = 'unlisted' if unlisted else 'public'
+
+        values = {field: (record or {}).get(field) for field in RECORD_FIELDS}
+        date_obj = (record or {}).get('date_obj')
+        values.update({
+            'path': rel_path,
+            'kind': kind,
+            'location': location,
+            'slug': os.path.basename(rel_path),
+            'mtime': st_mtime,
+            'size': st.st_size,
+            'sha1': sha1,
+            'visibility': visibility,
+            'date_sort': date_obj.isoformat() if date_obj else '0001-01-01T00:00:00',
+            'body_terms': json.dumps(record['body_terms']) if record and 'body_terms' in record else None,
+        })
+        columns = ', '.join(values)
+        placeholders = ', '.join('?' for _ in values)
+        conn.execute(f"INSERT OR REPLACE INTO documents ({columns}) VALUES ({placeholders})", list(values.values()))
+
+    # Deleted (or moved) files drop out of this source
+    for rel_path in set(existing) - seen:
+        conn.execute("DELETE FROM documents WHERE path = ?", (rel_path,))
+
+    conn.commit()
+    return len(pending) - failed, len(file_paths) - len(pending), failed
+
+# --- QUERIES ---
+
+def listed_articles(conn, order='date', limit=None, offset=0):
+    """
+    Public, listed articles as dicts of RECORD_FIELDS (+ path).
+    order='date' is newest first (ties by path), order='path' is file name order.
+    """
+    order_sql = "date_sort DESC, path ASC" if order == 'date' else "path ASC"
+    placeholders = ', '.join('?' for _ in EXCLUDED_TITLES)
+    sql = (f"SELECT path, {', '.join(RECORD_FIELDS)} FROM documents "
+           f"WHERE kind = 'article' AND location = 'public' AND visibility = 'public' "
+           f"AND title NOT IN ({placeholders}) ORDER BY {order_sql}")
+    params = list(EXCLUDED_TITLES)
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params += [limit, offset]
+    return [dict(row) for row in conn.execute(sql, params)]
+
+def count_listed_articles(conn):
+    placeholders = ', '.join('?' for _ in EXCLUDED_TITLES)
+    return conn.execute(
+        f"SELECT COUNT(*) FROM documents WHERE kind = 'article' AND location = 'public' "
+        f"AND visibility = 'public' AND title NOT IN ({placeholders})", EXCLUDED_TITLES).fetchone()[0]
+
+def documents(conn, kind, location, visibility=None):
+    """Absolute paths of catalogued files, in file name order."""
+    sql = "SELECT path FROM documents WHERE kind = ? AND location = ?"
+    params = [kind, location]
+    if visibility:
+        sql += " AND visibility = ?"
+        params.append(visibility)
+    sql += " ORDER BY path"
+    return [os.path.join(BASE_DIR, row['path']) for row in conn.execute(sql, params)]
+
+def visibility_of(conn, file_path):
+    """'public' | 'unlisted' | 'private', or None if the file is not catalogued."""
+    rel_path = os.path.relpath(file_path, BASE_DIR)
+    row = conn.execute("SELECT visibility FROM documents WHERE path = ?", (rel_path,)).fetchone()
+    return row['visibility'] if row else None
+
+def body_terms(conn, paths):
+    """{path: {token: count}} for the given catalogued files (missing ones are skipped)."""
+    out = {}
+    for path in paths:
+        row = conn.execute("SELECT body_terms FROM documents WHERE path = ?", (path,)).fetchone()
+        if row and row['body_terms']:
+            out[path] = json.loads(row['body_terms'])
+    return out
+
+def document_hashes(conn, paths):
+    """{path: sha1} for the given catalogued files (missing ones are skipped)."""
+    out = {}
+    for path in paths:
+        row = conn.execute("SELECT sha1 FROM documents WHERE path = ?", (path,)).fetchone()
+        if row:
+            out[path] = row['sha1']
+    return out
+
+# --- OUTPUTS ---
+
+def output_is_current(conn, file_path, sig):
+    """True if file_path was last written from inputs with this signature and is untouched since."""
+    rel_path = os.path.relpath(file_path, BASE_DIR)
+    row = conn.execute("SELECT signature, sha1 FROM outputs WHERE path = ?", (rel_path,)).fetchone()
+    if not row or row['signature'] != sig or not os.path.exists(file_path):
+        return False
+    return hash_file(file_path) == row['sha1']
+
+def record_output(conn, file_path, sig, content):
+    """Remembers that file_path now holds content (str or bytes), rendered from sig."""
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    conn.execute("INSERT OR REPLACE INTO outputs (path, signature, sha1) VALUES (?, ?, ?)",
+                 (os.path.relpath(file_path, BASE_DIR), sig, hashlib.sha1(data).hexdigest()))
+    conn.commit()
+
+# --- IMAGES ---
+
+def file_sha1(conn, file_path):
+    """sha1 of file_path, hashed again only when its size/mtime changed."""
+    rel_path = os.path.relpath(file_path, BASE_DIR)
+    st = os.stat(file_path)
+    row = conn.execute("SELECT mtime, size, sha1 FROM image_files WHERE path = ?", (rel_path,)).fetchone()
+    if row and row['mtime'] == st.st_mtime_ns and row['size'] == st.st_size:
+        return row['sha1']
+    sha1 = hash_file(file_path)
+    conn.execute("INSERT OR REPLACE INTO image_files (path, mtime, size, sha1) VALUES (?, ?, ?, ?)",
+                 (rel_path, st.st_mtime_ns, st.st_size, sha1))
+    return sha1
+
+def image_size(conn, sha1):
+    """(width, height) recorded for this content, or None."""
+    row = conn.execute("SELECT width, height FROM image_sizes WHERE sha1 = ?", (sha1,)).fetchone()
+    return (row['width'], row['height']) if row else None
+
+def record_image_size(conn, sha1, width, height):
+    conn.execute("INSERT OR REPLACE INTO image_sizes (sha1, width, height) VALUES (?, ?, ?)", (sha1, width, height))
@@ -0,0 +1,196 @@
+import asyncio
+import itertools
+import urllib.parse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fetch_scheduler import (TokenBucket, AdaptiveLimit, backoff_delay, retry_after,
+                             RETRY_STATUSES, RETRIES, RATE_LIMIT)
+
+# Concurrent fetcher for migrate_articles.py. The crawl itself stays a plain in-order
+# loop (dates, colors and slugs depend on the order articles are processed); the
+# engine fetches the pages the loop will need next in the background, so the loop
+# mostly waits on the slowest page in flight instead of on every round trip in turn.
+#
+# Requests run on a thread pool with one shared requests.Session, bounded overall
+# and per host (by fetch_scheduler's rate limit and adaptive concurrency cap), and
+# every request has a connect/read timeout. Throttled, failed and 5xx requests are
+# retried with backoff. With a response_archive.ResponseArchive, pages are
+# revalidated or replayed from disk.
+
+DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+PER_HOST_LIMIT = 4
+TOTAL_LIMIT = 16
+TIMEOUT = (5, 20)  # (connect, read) seconds
+
+
+def host_of(url):
+    return urllib.parse.urlsplit(url).netloc.lower()
+
+def canonical_url(url):
+    """
+    The identity of a page, used to dedupe the crawl and to match links against
+    migrated articles: http/https and host case don't matter, nor do a default port,
+    a trailing slash, the query string or the fragment. HTML-escaped '&amp;' is
+    decoded first. Relative URLs are returned unchanged. Not meant to be fetched.
+    """
+    url = url.strip().replace('&amp;', '&')
+    parts = urllib.parse.urlsplit(url)
+    if not parts.netloc:
+        return url
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    return f"https://{host}{parts.path.rstrip('/')}"
+
+
+class CrawlFrontier:
+    """
+    FIFO queue of {'url': ...} items. An item whose canonical URL was queued before
+    (whether or not it has been crawled yet) is dropped, so push and pop are O(1).
+    """
+
+    def __init__(self, items=()):
+        self.queue = deque()
+        self.seen = set()
+        for item in items:
+            self.push(item)
+
+    def push(self, item):
+        key = canonical_url(item['url'])
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        self.queue.append(item)
+        return True
+
+    def pop(self):
+        return self.queue.popleft()
+
+    def tail(self, n):
+        """The last n items queued, oldest first."""
+        return list(itertools.islice(reversed(self.queue), n))[::-1]
+
+    def __iter__(self):
+        return iter(self.queue)
+
+    def __len__(self):
+        return len(self.queue)
+
+
+class CrawlEngine:
+    """
+    fetch(url) returns a dict: {url, status, content, headers, error}. error is None
+    unless the request raised (timeout, connection error, ...) on every attempt;
+    non-200 responses are returned as-is, like requests.get would, once retries
+    are used up.
+    """
+
+    def __init__(self, per_host=PER_HOST_LIMIT, total=TOTAL_LIMIT, timeout=TIMEOUT, headers=None, archive=None,
+                 rate=RATE_LIMIT, retries=RETRIES):
+        self.per_host = per_host
+        self.total = total
+        self.timeout = timeout
+        self.headers = headers or DEFAULT_HEADERS
+        self.archive = archive
+        self.rate = rate
+        self.retries = retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=total, pool_maxsize=per_host)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=total, thread_name_prefix='crawl')
+        self.total_slots = asyncio.Semaphore(total)
+        self.host_limits = {}   # host -> AdaptiveLimit
+        self.host_buckets = {}  # host -> TokenBucket
+        self.pending = {}  # url -> Task, started by prefetch() and not yet taken
+        # throttled: seconds spent waiting on rate limits and backoff, summed over requests
+        self.stats = {'requests': 0, 'retries': 0, 'errors': 0, 'bytes': 0, 'throttled': 0.0}
+
+    @property
+    def window(self):
+        """How many upcoming URLs are worth keeping in flight."""
+        return self.total
+
+    def request(self, url, extra_headers=None):
+        """Plain GET through the shared session: (status, content, headers)."""
+        headers = {**self.headers, **extra_headers} if extra_headers else self.headers
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        return response.status_code, response.content, dict(response.headers)
+
+    def _get(self, url):
+        if self.archive is None:
+            return self.request(url)
+        return self.archive.get(url, self.request)
+
+    async def _attempt(self, url, limit, bucket):
+        """One request within the host's limits: (status, content, headers, error)."""
+        loop = asyncio.get_running_loop()
+        await limit.acquire()
+        ok = False
+        start = loop.time()
+        try:
+            # Replaying from an offline archive doesn't touch the network
+            if not (self.archive and self.archive.offline):
+                self.stats['throttled'] += await bucket.take()
+            async with self.total_slots:
+                self.stats['requests'] += 1
+                start = loop.time()
+                try:
+                    status, content, headers = await loop.run_in_executor(self.executor, self._get, url)
+                except Exception as e:  # timeouts, connection errors, bad URLs
+                    return None, b'', {}, e
+            ok = status not in RETRY_STATUSES
+            return status, content, headers, None
+        finally:
+            await limit.release(ok, loop.time() - start)
+
+    async def _fetch(self, url):
+        host = host_of(url)
+        limit = self.host_limits.setdefault(host, AdaptiveLimit(self.per_host))
+        bucket = self.host_buckets.setdefault(host, TokenBucket(self.rate, self.per_host))
+        for attempt in itertools.count():
+            status, content, headers, error = await self._attempt(url, limit, bucket)
+            if error is not None:
+                retryable = isinstance(error, (requests.ConnectionError, requests.Timeout))
+            else:
+                retryable = status in RETRY_STATUSES
+            if not retryable or attempt >= self.retries:
+                break
+            delay = backoff_delay(attempt, headers)
+            if retry_after(headers) is not None:
+                # The host asked everyone to slow down, not just this request
+                bucket.pause(delay)
+            self.stats['retries'] += 1
+            self.stats['throttled'] += delay
+            await asyncio.sleep(delay)
+
+        if error is not None:  # the page is skipped
+            self.stats['errors'] += 1
+            return {"url": url, "status": None, "content": b'', "headers": {}, "error": str(error)}
+        self.stats['bytes'] += len(content)
+        return {"url": url, "status": status, "content": content, "headers": headers, "error": None}
+
+    def prefetch(self, url):
+        """Starts fetching url in the background (no-op if already started)."""
+        if url not in self.pending:
+            self.pending[url] = asyncio.ensure_future(self._fetch(url))
+
+    async def fetch(self, url):
+        """The response for url, reusing a prefetch if there is one."""
+        task = self.pending.pop(url, None)
+        if task is None:
+            return await self._fetch(url)
+        return await task
+
+    async def close(self):
+        # Prefetched pages nobody asked for (e.g. past the article limit)
+        for task in self.pending.values():
+            task.cancel()
+        await asyncio.gather(*self.pending.values(), return_exceptions=True)
+        self.pending.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
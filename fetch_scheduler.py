@@ -0,0 +1,126 @@
+import time
+import random
+import asyncio
+import threading
+import email.utils
+
+# Politeness and retry policy for the crawl engine (crawl_engine.py) and the asset
+# downloader. Every host gets a token bucket (at most `rate` requests per second,
+# bursts of `burst`) and a concurrency cap that adapts to how the host is doing:
+# it grows by one after a run of fast, successful responses and halves on a
+# throttling response, an error or a latency spike. Retryable responses (429,
+# 5xx gateway errors) and network errors are retried with exponential backoff and
+# full jitter, honouring Retry-After.
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRIES = 4
+BACKOFF_BASE = 0.5  # seconds before the first retry (before jitter)
+BACKOFF_CAP = 30.0
+RATE_LIMIT = 10.0   # requests per second per host; 0 for no limit
+LATENCY_FACTOR = 4  # a response this many times slower than the host's best...
+LATENCY_FLOOR = 1.0  # ...and slower than this many seconds is a spike
+
+def retry_after(headers):
+    """Seconds the server asked us to wait (Retry-After: seconds or an HTTP date), or None."""
+    value = {k.lower(): v for k, v in (headers or {}).items()}.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt, headers=None, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """Full-jitter exponential backoff for retry number attempt (0-based), at least Retry-After."""
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    asked = retry_after(headers)
+    return min(cap, max(delay, asked)) if asked is not None else delay
+
+
+class TokenBucket:
+    """
+    take() waits until a request may be sent and returns the seconds it waited.
+    rate=0 never waits, except after pause(). Thread-safe; the waiting itself is
+    left to the caller (asyncio.sleep or time.sleep).
+    """
+
+    def __init__(self, rate=RATE_LIMIT, burst=1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Claims the next slot; returns how long to wait before using it."""
+        with self.lock:
+            now = time.monotonic()
+            wait = max(0.0, self.paused_until - now)
+            if not self.rate:
+                return wait
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens < 0:
+                wait = max(wait, -self.tokens / self.rate)
+            return wait
+
+    def pause(self, seconds):
+        """Holds every request to this host for seconds (e.g. a Retry-After)."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def take(self):
+        wait = self.reserve()
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+    def take_blocking(self):
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class AdaptiveLimit:
+    """
+    Concurrency cap for one host, between 1 and maximum (AIMD): acquire() waits for
+    a free slot, release(ok, latency) frees it and adapts the cap to the outcome.
+    """
+
+    def __init__(self, maximum):
+        self.maximum = maximum
+        self.limit = maximum
+        self.active = 0
+        self.successes = 0
+        self.best_latency = None
+        self.changed = asyncio.Condition()
+
+    async def acquire(self):
+        async with self.changed:
+            await self.changed.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+
+    async def release(self, ok, latency):
+        async with self.changed:
+            self.active -= 1
+            if ok:
+                self.best_latency = latency if self.best_latency is None else min(self.best_latency, latency)
+                ok = latency <= max(self.best_latency * LATENCY_FACTOR, LATENCY_FLOOR)
+            if not ok:
+                # Throttled, failing or slowing down: back off hard
+                self.limit = max(1, self.limit // 2)
+                self.successes = 0
+            else:
+                # A full window of good responses earns one more slot
+                self.successes += 1
+                if self.successes >= self.limit and self.limit < self.maximum:
+                    self.limit += 1
+                    self.successes = 0
+            self.changed.notify_all()
@@ -1,15 +1,33 @@
 import os
+import re
 import json
 import glob
 import datetime
 import math
-from bs4 import BeautifulSoup
+import argparse
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from collections import Counter
+from bs4 import BeautifulSoup, Comment
+from bs4.formatter import HTMLFormatter
+from article_meta import extract_article_meta
+import content_catalog
+import precompress
+import article_images
+from build_profile import BuildProfiler, PROFILE_FILE, timed_call, print_report
+from output_writer import write_if_changed, new_report, format_report
+from inverted_index import (build_inverted_index, shard_index, tokenize, FIELD_BOOSTS, INDEX_VERSION,
+                            SHARD_TARGET_BYTES)
 
 # Constants
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ARTICLES_DIR = os.path.join(BASE_DIR, 'articles')
-PROJECTS_FILE = os.path.join(BASE_DIR, 'projects', 'machine_learning.html')
+PROJECTS_DIR = os.path.join(BASE_DIR, 'projects')
+PROJECTS_FILE = os.path.join(PROJECTS_DIR, 'machine_learning.html')
 OUTPUT_FILE = os.path.join(BASE_DIR, 'search.json')
+INDEX_DIR = os.path.join(BASE_DIR, 'search-index')
+INDEX_MANIFEST = os.path.join(INDEX_DIR, 'manifest.json')
 TEMPLATE_FILE = os.path.join(BASE_DIR, 'articles.html')
 
 COLORS = [
@@ -23,6 +41,12 @@ COLORS = [
 ]
 ICONS = ["fa-robot", "fa-brain", "fa-database", "fa-microchip", "fa-code", "fa-server", "fa-chart-network"]
 
+# Entity substitution used by prettify() when no formatter is given
+MINIMAL_FORMATTER = HTMLFormatter.REGISTRY['minimal']
+
+# Stand-in for callers that don't profile
+NULL_PROFILER = BuildProfiler(enabled=False)
+
 def parse_date(date_str):
     try:
         # Expected format: "Oct 19, 2025" or similar
@@ -90,6 +114,20 @@ def parse_article(file_path):
     if date_span:
         date_str = date_span.get_text().strip().split('•')[0].strip()
     
+    body_text = article_body.get_text(' ') if article_body else ""
+
+    return make_article_record(file_path, title, description, date_str, image_url, body_text)
+
+def parse_article_fast(file_path):
+    # Same result as parse_article, using the streaming extractor in article_meta.py
+    with open(file_path, 'r', encoding='utf-8') as f:
+        meta = extract_article_meta(f.read())
+    if meta is None:
+        return None
+    return make_article_record(file_path, meta['title'], meta['description'], meta['date_str'],
+                               meta['image'], meta['body_text'])
+
+def make_article_record(file_path, title, description, date_str, image_url, body_text=""):
     date_obj = parse_date(date_str)
     rel_path = os.path.relpath(file_path, BASE_DIR)
     
@@ -108,30 +146,106 @@ def parse_article(file_path):
         "image": image_url,
         "color": color,
         "icon": icon,
-        "link": f"articles/{os.path.basename(file_path)}"
+        "link": f"articles/{os.path.basename(file_path)}",
+        # Term counts of the article body for full-text search (see inverted_index.py)
+        "body_terms": dict(Counter(tokenize(body_text)))
     }
 
-def generate_listings(articles):
-    ARTICLES_PER_PAGE = 9
-    
-    # Use existing articles.html as template or backup
-    if os.path.exists(TEMPLATE_FILE):
-        with open(TEMPLATE_FILE, 'r', encoding='utf-8') as f:
-            template_html = f.read()
-    else:
-        print("Error: articles.html not found to use as template.")
+# Article extractors selectable with --parser; both return identical records
+PARSERS = {
+    'bs4': parse_article,
+    'stream': parse_article_fast
+}
+
+def record_from_row(row):
+    # Catalog rows carry date_str; date_obj is rebuilt with the same parse_date rules
+    data = dict(row)
+    data['date_obj'] = parse_date(data['date_str'])
+    return data
+
+def parse_article_safe(file_path, parse_fn=parse_article):
+    # Runs in worker processes: exceptions are returned as text so one bad file
+    # doesn't abort the pool, and the parent reports them in input order.
+    try:
+        return parse_fn(file_path), None
+    except Exception as e:
+        return None, str(e)
+
+def parse_many(file_paths, jobs=1, parser='bs4', profiler=None):
+    """
+    Yields (data, error) for each path, in the same order as file_paths.
+    jobs > 1 fans the parsing out over a process pool. With an enabled profiler,
+    every file's wall and CPU time (measured where it was parsed) is recorded.
+    """
+    parse_one = partial(parse_article_safe, parse_fn=PARSERS[parser])
+    if profiler is None or not profiler.enabled:
+        yield from _map_files(parse_one, file_paths, jobs)
         return
 
+    timed = _map_files(partial(timed_call, parse_one), file_paths, jobs)
+    for file_path, (result, wall, cpu) in zip(file_paths, timed):
+        profiler.record_file(file_path, wall, cpu, error=result[1])
+        yield result
+
+def _map_files(fn, file_paths, jobs):
+    if jobs <= 1 or len(file_paths) <= 1:
+        for file_path in file_paths:
+            yield fn(file_path)
+        return
+
+    # Larger chunks keep IPC overhead down; map() returns results in submission order
+    chunksize = max(1, len(file_paths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(fn, file_paths, chunksize=chunksize)
+
+# --- CONTENT CATALOG ---
+# Extracted records live in the SQLite catalog (content_catalog.py); only new or
+# changed files are parsed again. The dashboard reads the same catalog.
+
+def sync_source(conn, kind, location, force=False, jobs=1, parser='bs4'):
+    files = content_catalog.list_source_files(kind, location)
+    if kind == 'project':
+        # Project pages have their own extractor (the records parse_projects() builds)
+        parse = partial(_map_files, partial(parse_article_safe, parse_fn=parse_project), jobs=jobs)
+    else:
+        parse = partial(parse_many, jobs=jobs, parser=parser)
+    return content_catalog.sync(conn, kind, location, files, parse, force=force)
+
+def refresh_catalog(conn, force=False, jobs=1, parser='bs4'):
+    """Syncs every catalogued directory (public and draft articles and projects)."""
+    for kind, location in content_catalog.SOURCES:
+        sync_source(conn, kind, location, force=force, jobs=jobs, parser=parser)
+
+# --- LISTING PAGES ---
+# articles.html, articles-2.html, ... are the template page with its grid replaced by
+# one page of cards plus a pagination bar, written through BeautifulSoup's prettify().
+
+ARTICLES_PER_PAGE = 9
+PAGINATION_STYLE = "display:flex; justify-content:center; gap:1rem; margin-top:3rem;"
+CARD_SLOT = 'listing-slot:cards'
+PAGINATION_SLOT = 'listing-slot:pagination'
+
+def listing_filename(page_num):
+    return "articles.html" if page_num == 1 else f"articles-{page_num}.html"
+
+def paginate(articles):
+    chunks = [articles[i:i + ARTICLES_PER_PAGE] for i in range(0, len(articles), ARTICLES_PER_PAGE)]
+    return chunks or [[]]  # Handle empty case
+
+def is_pagination(style):
+    return style and 'justify-content:center' in style
+
+def render_listings_soup(template_html, articles):
+    """Reference renderer: one soup per page and per card. Returns [(filename, html)]."""
     soup_clean = BeautifulSoup(template_html, 'html.parser')
     
     # Remove existing pagination from template
-    existing_pag = soup_clean.find('div', style=lambda s: s and 'justify-content:center' in s)
+    existing_pag = soup_clean.find('div', style=is_pagination)
     if existing_pag: existing_pag.decompose()
     
     base_listing_html = str(soup_clean)
-    
-    chunks = [articles[i:i + ARTICLES_PER_PAGE] for i in range(0, len(articles), ARTICLES_PER_PAGE)]
-    if not chunks: chunks = [[]] # Handle empty case
+    chunks = paginate(articles)
+    pages = []
 
     for page_num, chunk in enumerate(chunks, 1):
         soup = BeautifulSoup(base_listing_html, 'html.parser')
@@ -157,12 +271,11 @@ def generate_listings(articles):
                 grid.append(BeautifulSoup(card_html, 'html.parser'))
             
             # Add Pagination
-            pagination_div = soup.new_tag('div', style="display:flex; justify-content:center; gap:1rem; margin-top:3rem;")
+            pagination_div = soup.new_tag('div', style=PAGINATION_STYLE)
             
             # Previous Link
             if page_num > 1:
-                prev_link_files = "articles.html" if page_num == 2 else f"articles-{page_num-1}.html"
-                a_prev = soup.new_tag('a', href=prev_link_files, **{'class': 'btn btn-secondary'})
+                a_prev = soup.new_tag('a', href=listing_filename(page_num - 1), **{'class': 'btn btn-secondary'})
                 a_prev.string = "Previous"
                 pagination_div.append(a_prev)
             
@@ -173,113 +286,385 @@ def generate_listings(articles):
             
             # Next Link
             if page_num < len(chunks):
-                next_link_files = f"articles-{page_num+1}.html"
-                a_next = soup.new_tag('a', href=next_link_files, **{'class': 'btn btn-primary'})
+                a_next = soup.new_tag('a', href=listing_filename(page_num + 1), **{'class': 'btn btn-primary'})
                 a_next.string = "Next"
                 pagination_div.append(a_next)
 
             if grid.parent:
                 # Remove any stray pagination
-                for old_pag in grid.parent.find_all('div', style=lambda s: s and 'justify-content:center' in s):
+                for old_pag in grid.parent.find_all('div', style=is_pagination):
                     old_pag.decompose()
                 grid.parent.append(pagination_div)
 
-        filename = "articles.html" if page_num == 1 else f"articles-{page_num}.html"
-        output_path = os.path.join(BASE_DIR, filename)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(str(soup.prettify()))
-        
-        print(f"Generated {filename}")
+        pages.append((listing_filename(page_num), str(soup.prettify())))
+    return pages
+
+def compile_listing_template(template_html):
+    """
+    Parses the template once and splits its prettified form around the card grid and
+    the pagination slot. Returns None if the template has no grid (or no grid parent).
+    """
+    soup = BeautifulSoup(template_html, 'html.parser')
+    existing_pag = soup.find('div', style=is_pagination)
+    if existing_pag: existing_pag.decompose()
+
+    grid = soup.find('div', class_='articles-grid')
+    if not grid or not grid.parent:
+        return None
+    grid.clear()
+    for old_pag in grid.parent.find_all('div', style=is_pagination):
+        old_pag.decompose()
+
+    # Comments mark the slots; prettify() puts each on its own indented line
+    grid.append(Comment(CARD_SLOT))
+    grid.parent.append(Comment(PAGINATION_SLOT))
+    page = soup.prettify()
+
+    segments = []
+    depths = []
+    for slot in (CARD_SLOT, PAGINATION_SLOT):
+        marker = f"<!--{slot}-->\n"
+        before, page = page.split(marker, 1)
+        line_start = before.rfind('\n') + 1
+        segments.append(before[:line_start])
+        depths.append(len(before) - line_start)
+    segments.append(page)
+
+    return {"segments": segments, "card_depth": depths[0], "pagination_depth": depths[1]}
+
+def _render(lines, depth, node):
+    # node = (tag, attrs, text, children), laid out the way prettify() does it: tags and
+    # text on their own lines, one space of indent per level, sorted attributes
+    tag, attrs, text, children = node
+    attr_str = ''.join(f' {k}={MINIMAL_FORMATTER.quoted_attribute_value(MINIMAL_FORMATTER.attribute_value(v))}'
+                       for k, v in sorted(attrs.items()))
+    lines.append(f"{' ' * depth}<{tag}{attr_str}>\n")
+    if text and text.strip():
+        lines.append(f"{' ' * (depth + 1)}{MINIMAL_FORMATTER.substitute(text.strip())}\n")
+    for child in children:
+        _render(lines, depth + 1, child)
+    lines.append(f"{' ' * depth}</{tag}>\n")
+
+# Article fields that end up on a listing card
+CARD_FIELDS = ['color', 'icon', 'date_str', 'title', 'link']
+
+def card_node(article):
+    return ('article', {'class': 'article-card'}, None, [
+        ('div', {'class': 'article-card-image'}, None, [
+            ('div', {'class': 'placeholder-img', 'style': f"background: {article['color']};"}, None, []),
+            ('div', {'class': 'blog-overlay'}, None, [
+                ('i', {'class': f"fas {article['icon']}"}, None, []),
+            ]),
+        ]),
+        ('div', {'class': 'article-card-content'}, None, [
+            ('span', {'class': 'article-meta-small'}, article['date_str'], []),
+            ('h3', {}, article['title'], []),
+            ('a', {'class': 'article-read-btn', 'href': article['link']}, "Read Article", []),
+        ]),
+    ])
+
+def pagination_node(page_num, page_count):
+    children = []
+    if page_num > 1:
+        children.append(('a', {'class': 'btn btn-secondary', 'href': listing_filename(page_num - 1)}, "Previous", []))
+    children.append(('span', {'style': "align-self:center; font-weight:600;"}, f"Page {page_num} of {page_count}", []))
+    if page_num < page_count:
+        children.append(('a', {'class': 'btn btn-primary', 'href': listing_filename(page_num + 1)}, "Next", []))
+    return ('div', {'style': PAGINATION_STYLE}, None, children)
+
+# Card fields are pasted into HTML source by the reference renderer, so markup, entity
+# references or quotes in them are re-interpreted by the parser; leave those to it
+MARKUP_RE = re.compile(r'[<"]|&[#a-zA-Z]')
+
+def _needs_soup(article):
+    return any(MARKUP_RE.search(str(article[field])) for field in CARD_FIELDS)
+
+def render_listings(template_html, articles, page_nums=None, compiled=None):
+    """
+    Same output as render_listings_soup, built by joining pre-rendered segments.
+    page_nums limits the result to those pages (default: all).
+    """
+    compiled = compiled or compile_listing_template(template_html)
+    if compiled is None or any(_needs_soup(a) for a in articles):
+        pages = render_listings_soup(template_html, articles)
+        return [page for i, page in enumerate(pages, 1) if page_nums is None or i in page_nums]
+
+    head, middle, tail = compiled['segments']
+    chunks = paginate(articles)
+    pages = []
+    for page_num, chunk in enumerate(chunks, 1):
+        if page_nums is not None and page_num not in page_nums:
+            continue
+        lines = [head]
+        for article in chunk:
+            _render(lines, compiled['card_depth'], card_node(article))
+        lines.append(middle)
+        _render(lines, compiled['pagination_depth'], pagination_node(page_num, len(chunks)))
+        lines.append(tail)
+        pages.append((listing_filename(page_num), ''.join(lines)))
+    return pages
+
+def page_signatures(compiled, articles):
+    """
+    {page_num: signature} of what each listing page is rendered from: the template
+    around the slots, the page count and the cards on that page, in order.
+    """
+    template_sig = content_catalog.signature(compiled)
+    chunks = paginate(articles)
+    return {
+        page_num: content_catalog.signature(template_sig, page_num, len(chunks),
+                                            [[a[k] for k in CARD_FIELDS] for a in chunk])
+        for page_num, chunk in enumerate(chunks, 1)
+    }
 
-def parse_projects():
+def generate_listings(articles, report=None, profiler=NULL_PROFILER, template_file=TEMPLATE_FILE, output_dir=BASE_DIR,
+                      conn=None, force=False):
+    """
+    Writes the listing pages. With a catalog connection, only pages whose signature
+    changed (or whose file was edited or removed) are rendered again.
+    """
+    # Use existing articles.html as template or backup
+    if os.path.exists(template_file):
+        with open(template_file, 'r', encoding='utf-8') as f:
+            template_html = f.read()
+    else:
+        print("Error: articles.html not found to use as template.")
+        return
+
+    with profiler.phase('listings: render'):
+        # articles.html is also page 1, so the template is keyed by its compiled form
+        # (grid and pagination removed), which rewriting page 1 leaves unchanged
+        compiled = compile_listing_template(template_html)
+        signatures = page_signatures(compiled, articles) if compiled else {}
+        stale = None
+        if conn is not None and compiled is not None and not force:
+            stale = {n for n, sig in signatures.items()
+                     if not content_catalog.output_is_current(conn, os.path.join(output_dir, listing_filename(n)), sig)}
+        pages = render_listings(template_html, articles, page_nums=stale, compiled=compiled)
+    print(f"Rendered {len(pages)} of {len(paginate(articles))} listing page(s)")
+    page_sigs = {listing_filename(n): sig for n, sig in signatures.items()}
+
+    with profiler.phase('listings: write'):
+        for filename, page_html in pages:
+            output_path = os.path.join(output_dir, filename)
+            if write_if_changed(output_path, page_html, report):
+                print(f"Generated {filename}")
+            if conn is not None and filename in page_sigs:
+                content_catalog.record_output(conn, output_path, page_sigs[filename], page_html)
+
+def parse_project(file_path):
+    """Search entry for one project page, or None if it is unlisted."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        soup = BeautifulSoup(f, 'html.parser')
+
+    # Check Visibility
+    meta_vis = soup.find('meta', attrs={'name': 'visibility'})
+    if meta_vis and meta_vis.get('content') == 'unlisted':
+        return None
+
+    title_tag = soup.find('h1', class_='section-title')
+    title = title_tag.get_text(strip=True) if title_tag else os.path.basename(file_path).replace('.html', '').replace('_', ' ').title()
+
+    desc_tag = soup.find('p', class_='section-subtitle')
+    desc = desc_tag.get_text(strip=True) if desc_tag else "A collection of projects."
+
+    return {
+        "title": title,
+        "description": desc,
+        "url": os.path.relpath(file_path, BASE_DIR),
+        "category": "Project",
+        "date": ""
+    }
+
+def parse_projects(projects_dir=PROJECTS_DIR):
     projects = []
-    projects_dir = os.path.join(BASE_DIR, 'projects')
     if not os.path.exists(projects_dir):
         return projects
         
-    for file_path in glob.glob(os.path.join(projects_dir, '*.html')):
+    for file_path in sorted(glob.glob(os.path.join(projects_dir, '*.html'))):
         if file_path.endswith('template.html'): continue
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                soup = BeautifulSoup(f, 'html.parser')
-                
-            # Check Visibility
-            meta_vis = soup.find('meta', attrs={'name': 'visibility'})
-            if meta_vis and meta_vis.get('content') == 'unlisted':
-                continue
-
-            title_tag = soup.find('h1', class_='section-title')
-            title = title_tag.get_text(strip=True) if title_tag else os.path.basename(file_path).replace('.html', '').replace('_', ' ').title()
-            
-            desc_tag = soup.find('p', class_='section-subtitle')
-            desc = desc_tag.get_text(strip=True) if desc_tag else "A collection of projects."
-
-            rel_path = os.path.relpath(file_path, BASE_DIR)
-            
-            projects.append({
-                "title": title,
-                "description": desc,
-                "url": rel_path,
-                "category": "Project",
-                "date": ""
-            })
+            project = parse_project(file_path)
         except Exception as e:
             print(f"Error parsing project {file_path}: {e}")
+            continue
+        if project:
+            projects.append(project)
             
     return projects
 
-def main():
-    print(f"Scanning articles in {ARTICLES_DIR}...")
-    article_files = glob.glob(os.path.join(ARTICLES_DIR, '*.html'))
-    
-    valid_articles = []
-    search_index = []
+def write_hashed_json(directory, stem, data, report=None):
+    # Content-hashed name (stem.<hash>.json) so the file can be cached forever
+    payload = json.dumps(data, separators=(',', ':'))
+    digest = hashlib.sha1(payload.encode('utf-8')).hexdigest()[:10]
+    filename = f"{stem}.{digest}.json"
+    write_if_changed(os.path.join(directory, filename), payload, report)
+    return filename
 
-    for file_path in article_files:
-        if file_path.endswith('template.html'):
-            continue
-            
-        try:
-            data = parse_article(file_path)
-            if data and data['title'] not in ["Articles", "404 Not Found"]:
-                valid_articles.append(data)
-                
-                # Prepare for search index (subset of data)
-                search_index.append({
-                    "title": data['title'],
-                    "description": data['description'],
-                    "url": data['url'],
-                    "category": data['category'],
-                    "date": data['date_str'],
-                    "image": data['image']
-                })
-        except Exception as e:
-            print(f"Error parsing {file_path}: {e}")
+def write_search_index(search_index, inverted, report=None, index_dir=INDEX_DIR, site_dir=BASE_DIR):
+    """
+    Writes search-index/: manifest.json (the only file fetched on page load), a docs
+    file with the search.json entries, and one shard per run of term prefixes.
+    Files the new manifest no longer references are removed.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    manifest_file = os.path.join(index_dir, os.path.basename(INDEX_MANIFEST))
+    rel_dir = os.path.relpath(index_dir, site_dir).replace(os.sep, '/')
+
+    docs_file = write_hashed_json(index_dir, 'docs', search_index, report)
+    shards = []
+    for first, last, shard in shard_index(inverted):
+        shard_file = write_hashed_json(index_dir, 'shard', shard, report)
+        shards.append({"from": first, "to": last, "file": f"{rel_dir}/{shard_file}"})
+
+    manifest = {
+        "version": inverted['version'],
+        "doc_count": inverted['doc_count'],
+        "prefix_length": inverted['prefix_length'],
+        "score_levels": inverted['score_levels'],
+        "docs": f"{rel_dir}/{docs_file}",
+        "shards": shards
+    }
+    write_if_changed(manifest_file, json.dumps(manifest, separators=(',', ':')), report)
+
+    keep = {os.path.basename(manifest_file), docs_file} | {s['file'].rsplit('/', 1)[-1] for s in shards}
+    for name in os.listdir(index_dir):
+        # .gz/.br siblings of kept files belong to the precompress stage
+        if name not in keep and os.path.splitext(name)[0] not in keep:
+            os.remove(os.path.join(index_dir, name))
+
+    print(f"Generated {len(inverted['terms'])} terms in {len(shards)} search index shard(s)")
+
+# --- BUILD ---
 
-    # Sort Articles by Date Descending
-    valid_articles.sort(key=lambda x: x['date_obj'], reverse=True)
+ABOUT_PAGE = {
+    "title": "About Kishna Kushwaha",
+    "description": "Learn more about Kishna Kushwaha, an AI Engineer.",
+    "url": "about.html",
+    "category": "Page",
+    "date": ""
+}
+
+def article_search_entries(conn):
+    # Search entries keep file name order
+    return [{
+        "title": data['title'],
+        "description": data['description'],
+        "url": data['url'],
+        "category": data['category'],
+        "date": data['date_str'],
+        "image": data['image']
+    } for data in content_catalog.listed_articles(conn, order='path')]
+
+def listing_articles(conn):
+    # Listings are newest first
+    return [record_from_row(row) for row in content_catalog.listed_articles(conn, order='date')]
+
+def write_search_outputs(conn, search_index, boosts=FIELD_BOOSTS, report=None, profiler=NULL_PROFILER, force=False):
+    """
+    Writes search.json and the sharded inverted index (doc id = position in search.json).
+    The index is only rebuilt when an entry, a document's content or the scoring changed.
+    """
+    with profiler.phase('write search.json'):
+        write_if_changed(OUTPUT_FILE, json.dumps(search_index, separators=(',', ':')), report)
+    print(f"Generated {len(search_index)} items in search.json")
+
+    # BM25 statistics are corpus-wide, so any change re-scores in memory; only shards
+    # whose bytes change are written (their names are content hashes)
+    index_sig = content_catalog.signature(
+        INDEX_VERSION, SHARD_TARGET_BYTES, boosts, search_index,
+        content_catalog.document_hashes(conn, [entry['url'] for entry in search_index]))
+    if not force and content_catalog.output_is_current(conn, INDEX_MANIFEST, index_sig):
+        print("Search index is up to date")
+        return
+
+    with profiler.phase('build inverted index'):
+        bodies = content_catalog.body_terms(conn, [entry['url'] for entry in search_index])
+        inverted = build_inverted_index(search_index, bodies, boosts=boosts)
+    with profiler.phase('write search index'):
+        write_search_index(search_index, inverted, report)
+    with open(INDEX_MANIFEST, 'rb') as f:
+        content_catalog.record_output(conn, INDEX_MANIFEST, index_sig, f.read())
+
+def main(force=False, jobs=1, parser='bs4', boosts=FIELD_BOOSTS, compress=False, profile=False, profile_top=10,
+         images=False, avif=False, image_dims=False):
+    profiler = BuildProfiler(enabled=profile)
+    # 0. Optional: responsive image variants, image sizes and lazy loading. These rewrite articles,
+    #    so they run before the articles are scanned
+    if images or image_dims:
+        with profiler.phase('article images'):
+            article_images.main(jobs=jobs, variants=images, avif=avif, dimensions=image_dims, force=force)
+
+    print(f"Scanning articles in {ARTICLES_DIR}...")
+    conn = content_catalog.connect()
+    writes = new_report()
+    with profiler.phase('scan articles'):
+        files = content_catalog.list_source_files('article', 'public')
+    with profiler.phase('parse + catalog'):
+        parsed, reused, failed = content_catalog.sync(
+            conn, 'article', 'public', files,
+            partial(parse_many, jobs=jobs, parser=parser, profiler=profiler), force=force)
+    print(f"Parsed {parsed + failed} changed file(s), reused {reused} from catalog")
+
+    with profiler.phase('catalog queries'):
+        search_index = article_search_entries(conn)
+        valid_articles = listing_articles(conn)
 
     # Generate Listings
-    generate_listings(valid_articles)
+    generate_listings(valid_articles, writes, profiler, conn=conn, force=force)
 
     # 2. Add Projects to Search Index
-    search_index.extend(parse_projects())
+    with profiler.phase('projects'):
+        search_index.extend(parse_projects())
 
     # 3. Add About Page
-    search_index.append({
-        "title": "About Kishna Kushwaha",
-        "description": "Learn more about Kishna Kushwaha, an AI Engineer.",
-        "url": "about.html",
-        "category": "Page",
-        "date": ""
-    })
+    search_index.append(ABOUT_PAGE)
 
     # Save Search Index
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(search_index, f, indent=2)
-    
-    print(f"Generated {len(search_index)} items in search.json")
+    write_search_outputs(conn, search_index, boosts, writes, profiler, force=force)
+    conn.close()
+    print(format_report(writes))
+
+    # 4. Optional: .gz/.br siblings for static servers that serve precompressed files
+    if compress:
+        with profiler.phase('precompress'):
+            precompress.main(force=force)
+
+    if profile:
+        report = profiler.write(options={"force": force, "jobs": jobs, "parser": parser, "precompress": compress,
+                                         "images": images, "avif": avif, "image_dims": image_dims})
+        print_report(report, top=profile_top)
+        print(f"Profile written to {os.path.relpath(PROFILE_FILE, BASE_DIR)}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Rebuild search.json and the article listing pages.")
+    parser.add_argument('--force', action='store_true', help="Ignore the content catalog and re-parse every article")
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help="Parse articles in N worker processes (0 = one per CPU core)")
+    parser.add_argument('--parser', choices=sorted(PARSERS), default='bs4',
+                        help="bs4: full BeautifulSoup parse, stream: metadata-only streaming extractor")
+    parser.add_argument('--title-boost', type=float, default=FIELD_BOOSTS['title'],
+                        help="BM25 weight of a title occurrence relative to the body")
+    parser.add_argument('--description-boost', type=float, default=FIELD_BOOSTS['description'],
+                        help="BM25 weight of a description occurrence relative to the body")
+    parser.add_argument('--precompress', action='store_true',
+                        help="Also write .gz/.br siblings of the site's HTML/JSON/CSS/JS (see precompress.py)")
+    parser.add_argument('--images', action='store_true',
+                        help="Also write WebP variants of the article images and use them via <picture> (see image_variants.py)")
+    parser.add_argument('--avif', action='store_true', help="With --images, also write AVIF variants")
+    parser.add_argument('--image-dims', action='store_true',
+                        help="Set width/height of the article images from their headers and lazy-load all but the first (see article_images.py)")
+    parser.add_argument('--profile', action='store_true',
+                        help=f"Time every build phase and parsed file and write {os.path.basename(PROFILE_FILE)}")
+    parser.add_argument('--profile-top', type=int, default=10, help="Slowest files to list with --profile")
+    parser.add_argument('--watch', action='store_true',
+                        help="After building, keep watching articles/, projects/ and articles.html and rebuild on change")
+    args = parser.parse_args()
+    boosts = dict(FIELD_BOOSTS, title=args.title_boost, description=args.description_boost)
+    main(force=args.force, jobs=args.jobs or os.cpu_count() or 1, parser=args.parser, boosts=boosts,
+         compress=args.precompress, profile=args.profile, profile_top=args.profile_top,
+         images=args.images, avif=args.avif, image_dims=args.image_dims)
+    if args.watch:
+        import site_watcher
+        site_watcher.watch(jobs=args.jobs or os.cpu_count() or 1, parser=args.parser, boosts=boosts)
@@ -0,0 +1,80 @@
+import struct
+
+import content_catalog
+
+# Pixel size of an image read from its header only (PNG IHDR, GIF screen
+# descriptor, JPEG SOFn, WebP VP8/VP8L/VP8X): a few dozen bytes, or for JPEG a
+# walk over the segment headers, never a decode. Sizes are cached in the content
+# catalog by content hash, so an image is only probed again when its bytes change.
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# Start-of-frame markers (baseline, progressive, lossless, arithmetic...); C4, C8 and CC are not frames
+JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# Markers without a length field
+JPEG_STANDALONE = {0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8}
+
+def _jpeg_dimensions(f):
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        if not byte:
+            return None
+        if byte != b'\xff':
+            continue
+        marker = f.read(1)
+        while marker == b'\xff':  # fill bytes
+            marker = f.read(1)
+        if not marker:
+            return None
+        code = marker[0]
+        if code in JPEG_STANDALONE:
+            continue
+        if code in (0xD9, 0xDA):  # end of image / start of scan: no frame header before the data
+            return None
+        header = f.read(2)
+        if len(header) < 2:
+            return None
+        length = struct.unpack('>H', header)[0]
+        if code in JPEG_SOF:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack('>HH', frame[1:5])
+            return width, height
+        f.seek(length - 2, 1)
+
+def _webp_dimensions(head):
+    chunk = head[12:16]
+    if chunk == b'VP8 ' and head[23:26] == b'\x9d\x01\x2a':
+        width, height = struct.unpack('<HH', head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and head[20] == 0x2F:
+        bits = int.from_bytes(head[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X':
+        return int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1
+    return None
+
+def probe_dimensions(path):
+    """(width, height) from the image's header, or None if it isn't a PNG/GIF/JPEG/WebP it can read."""
+    with open(path, 'rb') as f:
+        head = f.read(32)
+        if head[:8] == PNG_SIGNATURE and head[12:16] == b'IHDR':
+            return struct.unpack('>II', head[16:24])
+        if head[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack('<HH', head[6:10])
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP' and len(head) >= 30:
+            return _webp_dimensions(head)
+        if head[:2] == b'\xff\xd8':
+            return _jpeg_dimensions(f)
+    return None
+
+def image_dimensions(conn, path):
+    """probe_dimensions through the catalog: files are re-hashed on size/mtime change, re-probed on content change."""
+    sha1 = content_catalog.file_sha1(conn, path)
+    size = content_catalog.image_size(conn, sha1)
+    if size is None:
+        size = probe_dimensions(path)
+        if size and all(size):
+            content_catalog.record_image_size(conn, sha1, *size)
+    return size
@@ -0,0 +1,173 @@
+import os
+import re
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import content_catalog
+from output_writer import write_if_changed
+
+# Responsive variants of the article images in assets/datasets. Every image gets
+# WebP (and with --avif, AVIF) copies at a few widths in assets/variants, named by
+# the source's content hash, so an image is only encoded again when its bytes
+# change. Articles then reference them through <picture>/srcset, with the original
+# file left as the <img> fallback (article_images.py does the rewriting). Encoding
+# runs on a process pool.
+#
+# Whenever --images (or article_images.py --variants) has run, commit assets/variants
+# together with the articles it rewrote: a <picture> whose sources are missing shows
+# a broken image. Until then the tree has no assets/variants and plain <img> tags.
+#
+# Pillow is an optional dependency (see requirements.txt); without it the variants
+# are skipped and the articles keep their plain <img> tags.
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+IMAGES_DIR = os.path.join(BASE_DIR, 'assets', 'datasets')
+VARIANTS_DIR = os.path.join(BASE_DIR, 'assets', 'variants')
+MANIFEST_FILE = os.path.join(VARIANTS_DIR, 'manifest.json')
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+# Phones, the article column (css/style.css: 1200px container - sidebar - gaps) and 2x that
+VARIANT_WIDTHS = (480, 784, 1568)
+COLUMN_WIDTH = 784
+# Best first: the browser takes the first <source> it supports
+FORMATS = {
+    'avif': {'mime': 'image/avif', 'save': {'quality': 50}},
+    'webp': {'mime': 'image/webp', 'save': {'quality': 80, 'method': 6}},
+}
+VARIANT_NAME = re.compile(r'^[0-9a-f]{16}-\d+\.(avif|webp)(\.part)?$')
+# How articles reference a migrated image
+LOCAL_SRC = re.compile(r'src="\.\./assets/datasets/([^"?#]+)"')
+LOCAL_PREFIX = '../assets/datasets/'
+VARIANTS_URL = '../assets/variants/'
+
+def available_formats(avif=False):
+    """The variant formats this Pillow can write, best first ([] without Pillow)."""
+    if Image is None:
+        return []
+    Image.init()
+    wanted = ['avif', 'webp'] if avif else ['webp']
+    return [fmt for fmt in wanted if fmt.upper() in Image.SAVE]
+
+def variant_widths(width):
+    # Every standard width below the original, plus the original itself unless it is wider than them all
+    widths = [w for w in VARIANT_WIDTHS if w < width]
+    if width <= VARIANT_WIDTHS[-1]:
+        widths.append(width)
+    return widths
+
+def variant_name(digest, width, fmt):
+    return f"{digest[:16]}-{width}.{fmt}"
+
+def image_sizes(width):
+    # One column below the 992px breakpoint (1.5rem padding each side), COLUMN_WIDTH above
+    shown = min(width, COLUMN_WIDTH)
+    return f"(max-width: 992px) min({width}px, calc(100vw - 3rem)), {shown}px"
+
+def encode_variants(job):
+    """
+    Runs in worker processes: writes the missing variants of one image.
+    Returns ({width, height}, None), or (None, error text).
+    """
+    src, digest, formats, out_dir = job
+    try:
+        with Image.open(src) as im:
+            im.load()
+            width, height = im.size
+            has_alpha = im.mode in ('RGBA', 'LA', 'PA') or 'transparency' in im.info
+            im = im.convert('RGBA' if has_alpha else 'RGB')
+            for w in variant_widths(width):
+                resized = im if w == width else im.resize((w, max(1, round(height * w / width))), Image.LANCZOS)
+                for fmt in formats:
+                    path = os.path.join(out_dir, variant_name(digest, w, fmt))
+                    if os.path.exists(path):
+                        continue
+                    resized.save(path + '.part', fmt.upper(), **FORMATS[fmt]['save'])
+                    os.replace(path + '.part', path)
+        return {'width': width, 'height': height}, None
+    except Exception as e:
+        return None, str(e)
+
+def load_manifest(path=MANIFEST_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def is_complete(entry, formats, out_dir):
+    return all(os.path.exists(os.path.join(out_dir, variant_name(entry['sha1'], w, fmt)))
+               for w in variant_widths(entry['width']) for fmt in formats)
+
+def build_variants(formats, jobs=1, images_dir=IMAGES_DIR, out_dir=VARIANTS_DIR, force=False):
+    """
+    Brings assets/variants up to date with assets/datasets.
+    Returns ({image name: {sha1, width, height}}, report).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    previous = {} if force else load_manifest(os.path.join(out_dir, 'manifest.json'))
+    names = sorted(n for n in os.listdir(images_dir) if n.lower().endswith(IMAGE_EXTENSIONS))
+
+    # 1. Only images whose bytes changed (or whose variants are missing) are encoded
+    images, todo = {}, []
+    for name in names:
+        digest = content_catalog.hash_file(os.path.join(images_dir, name))
+        entry = previous.get(name)
+        if entry and entry['sha1'] == digest and is_complete(entry, formats, out_dir):
+            images[name] = entry
+        else:
+            todo.append((name, digest))
+
+    report = {'images': len(names), 'encoded': len(todo), 'failed': []}
+    work = [(os.path.join(images_dir, name), digest, formats, out_dir) for name, digest in todo]
+    if jobs > 1 and len(work) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(encode_variants, work))
+    else:
+        results = [encode_variants(job) for job in work]
+    for (name, digest), (size, error) in zip(todo, results):
+        if error:
+            report['failed'].append((name, error))
+        else:
+            images[name] = {'sha1': digest, **size}
+
+    # 2. Drop variants no image needs any more (and leftovers of interrupted writes)
+    wanted = {variant_name(e['sha1'], w, fmt) for e in images.values() for w in variant_widths(e['width']) for fmt in formats}
+    removed = 0
+    for name in os.listdir(out_dir):
+        if VARIANT_NAME.match(name) and name not in wanted:
+            os.remove(os.path.join(out_dir, name))
+            removed += 1
+    report['removed'] = removed
+    report['variant_bytes'] = sum(os.path.getsize(os.path.join(out_dir, n)) for n in wanted)
+    report['source_bytes'] = sum(os.path.getsize(os.path.join(images_dir, n)) for n in images)
+
+    write_if_changed(os.path.join(out_dir, 'manifest.json'), json.dumps(images, indent=1, sort_keys=True) + '\n')
+    return images, report
+
+def set_picture_sources(soup, img, entry, formats):
+    """
+    Wraps img in a <picture> (or reuses the one it is in) with one <source> per
+    format. entry=None takes it out of its <picture> again (no variants).
+    """
+    picture = img.parent if img.parent is not None and img.parent.name == 'picture' else None
+    if picture is not None:
+        for source in picture.find_all('source', recursive=False):
+            source.decompose()
+    if entry is None:
+        if picture is not None:
+            picture.unwrap()
+        return
+    if picture is None:
+        picture = img.wrap(soup.new_tag('picture'))
+    for fmt in formats:
+        srcset = ', '.join(f"{VARIANTS_URL}{variant_name(entry['sha1'], w, fmt)} {w}w" for w in variant_widths(entry['width']))
+        img.insert_before(soup.new_tag('source', attrs={
+            'type': FORMATS[fmt]['mime'], 'srcset': srcset, 'sizes': image_sizes(entry['width'])}))
+
+def format_size(n):
+    return f"{n / (1024 * 1024):.1f} MB" if n >= 1024 * 1024 else f"{n / 1024:.0f} KB"
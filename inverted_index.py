@@ -0,0 +1,177 @@
+import re
+import unicodedata
+from collections import Counter
+
+import numpy as np
+
+# Inverted index over the search.json entries, queried by js/search.js. shard_index()
+# splits it by term prefix; generate_search_index.py writes the shards under
+# search-index/ as content-hashed shard.<hash>.json files, next to docs.<hash>.json
+# and the manifest.json that maps prefix ranges to shards (the only file fetched on
+# page load). Tokenization here and in search.js must stay identical:
+# NFKD, strip marks (\p{M}), lowercase, split on anything that isn't [a-z0-9].
+#
+# Every posting carries a precomputed BM25 score quantized to 1..SCORE_LEVELS, so the
+# client ranks results by adding up the scores of the postings it reads.
+
+INDEX_VERSION = 3
+
+# A term in the title counts as FIELD_BOOSTS['title'] occurrences, and so on (BM25F-style)
+FIELD_BOOSTS = {'title': 3.0, 'description': 1.5, 'body': 1.0}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+SCORE_LEVELS = 255
+
+# Terms are grouped by their first PREFIX_LENGTH characters so the client can jump
+# straight to the slice of the (sorted) term list a prefix can match
+PREFIX_LENGTH = 2
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+def normalize(text):
+    decomposed = unicodedata.normalize('NFKD', text)
+    # Every mark (category M), the same set as \p{M} in search.js
+    return ''.join(c for c in decomposed if not unicodedata.category(c).startswith('M')).lower()
+
+def tokenize(text):
+    return TOKEN_RE.findall(normalize(text or ''))
+
+def weighted_term_frequencies(entry, body_terms, boosts):
+    tf = Counter()
+    for field in ('title', 'description'):
+        for token in tokenize(entry.get(field)):
+            tf[token] += boosts[field]
+    for token, count in body_terms.items():
+        tf[token] += boosts['body'] * count
+    return tf
+
+def bm25_scores(doc_ids, term_ids, tf, n_docs, n_terms, k1=BM25_K1, b=BM25_B):
+    """
+    BM25 over a sparse document-term matrix given as COO arrays
+    (doc_ids[i], term_ids[i]) -> tf[i]. Returns one score per non-zero cell.
+    """
+    df = np.bincount(term_ids, minlength=n_terms)
+    idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+    doc_len = np.bincount(doc_ids, weights=tf, minlength=n_docs)
+    avg_len = doc_len.mean() if n_docs else 1.0
+    norm = k1 * (1 - b + b * doc_len[doc_ids] / (avg_len or 1.0))
+    return idf[term_ids] * tf * (k1 + 1) / (tf + norm)
+
+def quantize(scores, levels=SCORE_LEVELS):
+    # Linear scale against the best posting; every posting keeps at least 1
+    if scores.size == 0:
+        return scores.astype(np.int64)
+    top = scores.max() or 1.0
+    return np.maximum(1, np.rint(scores / top * levels)).astype(np.int64)
+
+def build_inverted_index(entries, body_terms=None, boosts=FIELD_BOOSTS):
+    """
+    entries: the search.json list; a document id is the entry's position in it.
+    body_terms: {entry url: {token: count}} for entries with full-text bodies.
+
+    Returns a JSON-ready dict:
+      terms     - sorted normalized tokens
+      postings  - per term, flat [doc gap, score, doc gap, score, ...] with ascending
+                  doc ids stored as gaps and scores quantized to 1..SCORE_LEVELS
+      prefixes  - first PREFIX_LENGTH chars -> [start, end) slice of terms
+    """
+    body_terms = body_terms or {}
+
+    vocab = {}
+    doc_ids, term_ids, tf = [], [], []
+    for doc_id, entry in enumerate(entries):
+        weighted = weighted_term_frequencies(entry, body_terms.get(entry.get('url'), {}), boosts)
+        for token, weight in weighted.items():
+            doc_ids.append(doc_id)
+            term_ids.append(vocab.setdefault(token, len(vocab)))
+            tf.append(weight)
+
+    doc_ids = np.array(doc_ids, dtype=np.int64)
+    term_ids = np.array(term_ids, dtype=np.int64)
+    tf = np.array(tf, dtype=np.float64)
+    scores = quantize(bm25_scores(doc_ids, term_ids, tf, len(entries), len(vocab)))
+
+    # Renumber terms alphabetically and order cells by (term, doc)
+    terms = sorted(vocab)
+    rank = np.empty(len(terms), dtype=np.int64)
+    rank[[vocab[t] for t in terms]] = np.arange(len(terms))
+    term_rank = rank[term_ids] if len(terms) else term_ids
+    order = np.lexsort((doc_ids, term_rank))
+    bounds = np.searchsorted(term_rank[order], np.arange(len(terms) + 1))
+
+    postings = []
+    for i in range(len(terms)):
+        cells = order[bounds[i]:bounds[i + 1]]
+        docs = doc_ids[cells]
+        gaps = np.diff(docs, prepend=0)
+        flat = np.empty(2 * len(cells), dtype=np.int64)
+        flat[0::2] = gaps
+        flat[1::2] = scores[cells]
+        postings.append(flat.tolist())
+
+    prefixes = {}
+    for i, term in enumerate(terms):
+        key = term[:PREFIX_LENGTH]
+        if key in prefixes:
+            prefixes[key][1] = i + 1
+        else:
+            prefixes[key] = [i, i + 1]
+
+    return {
+        "version": INDEX_VERSION,
+        "doc_count": len(entries),
+        "prefix_length": PREFIX_LENGTH,
+        "score_levels": SCORE_LEVELS,
+        "boosts": boosts,
+        "terms": terms,
+        "postings": postings,
+        "prefixes": prefixes
+    }
+
+# --- SHARDING ---
+# The index is cut into contiguous runs of prefix groups, so any token of at least
+# PREFIX_LENGTH characters lives in exactly one shard and the client only fetches
+# the shards its query touches. Shard sizes aim for SHARD_TARGET_BYTES of JSON.
+
+SHARD_TARGET_BYTES = 16 * 1024
+
+def _group_size(index, start, end):
+    # Rough JSON size of terms[start:end] and their postings
+    size = 0
+    for i in range(start, end):
+        size += len(index['terms'][i]) + 4
+        size += sum(len(str(n)) + 1 for n in index['postings'][i]) + 2
+    return size
+
+def shard_index(index, target_bytes=SHARD_TARGET_BYTES):
+    """
+    Splits a build_inverted_index() result into shards.
+    Returns [(first_prefix, last_prefix, shard_dict)], where shard_dict has the same
+    terms/postings/prefixes layout as the full index (slices are shard-local).
+    """
+    groups = sorted(index['prefixes'].items(), key=lambda kv: kv[1][0])
+    shards = []
+    current = []
+    current_size = 0
+
+    def flush():
+        start = current[0][1][0]
+        end = current[-1][1][1]
+        shards.append((current[0][0], current[-1][0], {
+            "terms": index['terms'][start:end],
+            "postings": index['postings'][start:end],
+            "prefixes": {key: [a - start, b - start] for key, (a, b) in current}
+        }))
+
+    for key, (start, end) in groups:
+        size = _group_size(index, start, end)
+        if current and current_size + size > target_bytes:
+            flush()
+            current, current_size = [], 0
+        current.append((key, (start, end)))
+        current_size += size
+
+    if current:
+        flush()
+    return shards
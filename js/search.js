@@ -5,7 +5,8 @@ document.addEventListener('DOMContentLoaded', () => {
     const searchInput = document.getElementById('search-input');
     const searchResults = document.getElementById('search-results');
 
-    let searchIndex = [];
+    let searchIndex = null; // search.json entries, loaded on first use
+    let manifest = null;
 
     // Determine base path based on current location (root vs subpages)
     // Checks if we are in 'articles' or 'projects' directories
@@ -13,19 +14,150 @@ document.addEventListener('DOMContentLoaded', () => {
         window.location.pathname.includes('/projects/');
     const basePath = isSubPage ? '../' : '';
 
-    // Fetch Search Index
-    fetch(`${basePath}search.json`)
-        .then(response => response.json())
+    const fetchJson = (path) => fetch(`${basePath}${path}`).then(response => {
+        if (!response.ok) throw new Error(`${path}: HTTP ${response.status}`);
+        return response.json();
+    });
+
+    // Only the small manifest is fetched on page load. The docs file and the index
+    // shards (content-hashed, built by generate_search_index.py) load on demand.
+    const manifestReady = fetchJson('search-index/manifest.json')
         .then(data => {
-            searchIndex = data;
+            manifest = data;
         })
-        .catch(error => console.error('Error loading search index:', error));
+        .catch(error => console.error('Error loading search manifest:', error));
+
+    let docsPromise = null;
+    const loadDocs = () => {
+        if (!docsPromise) {
+            docsPromise = manifestReady
+                .then(() => fetchJson(manifest ? manifest.docs : 'search.json'))
+                .then(data => {
+                    searchIndex = data;
+                    return data;
+                })
+                .catch(error => {
+                    console.error('Error loading search index:', error);
+                    docsPromise = null;
+                    return [];
+                });
+        }
+        return docsPromise;
+    };
+
+    const shardCache = new Map();
+    const loadShard = (file) => {
+        if (!shardCache.has(file)) {
+            shardCache.set(file, fetchJson(file).catch(error => {
+                shardCache.delete(file);
+                throw error;
+            }));
+        }
+        return shardCache.get(file);
+    };
+
+    // Shards whose prefix range overlaps the terms that can start with token
+    const shardsFor = (token) => {
+        const key = token.slice(0, manifest.prefix_length);
+        return manifest.shards.filter(shard => shard.from <= key + '\uffff' && shard.to >= key);
+    };
+
+    // Must match inverted_index.tokenize(): NFKD, drop marks, lowercase, [a-z0-9]+
+    const tokenize = (text) => text
+        .normalize('NFKD')
+        .replace(/\p{M}/gu, '')
+        .toLowerCase()
+        .match(/[a-z0-9]+/g) || [];
+
+    // First index in terms[start, end) whose term is >= prefix
+    const lowerBound = (terms, prefix, start, end) => {
+        while (start < end) {
+            const mid = (start + end) >> 1;
+            if (terms[mid] < prefix) start = mid + 1;
+            else end = mid;
+        }
+        return start;
+    };
+
+    // Adds docId -> score to docs for every term of the shard equal to (or, if isPrefix,
+    // starting with) token. A doc matched through several expansions keeps its best score.
+    const lookupToken = (shard, token, isPrefix, docs) => {
+        const { terms, postings, prefixes } = shard;
+        const prefixLength = manifest.prefix_length;
+        let start = 0;
+        let end = terms.length;
+        if (token.length >= prefixLength) {
+            const bucket = prefixes[token.slice(0, prefixLength)];
+            if (!bucket) return;
+            [start, end] = bucket;
+        }
+
+        for (let i = lowerBound(terms, token, start, end); i < end; i++) {
+            const term = terms[i];
+            if (isPrefix ? !term.startsWith(token) : term !== token) break;
+            // Postings are flat [docGap, score, docGap, score, ...]
+            const list = postings[i];
+            let docId = 0;
+            for (let j = 0; j < list.length; j += 2) {
+                docId += list[j];
+                docs.set(docId, Math.max(docs.get(docId) || 0, list[j + 1]));
+            }
+        }
+    };
+
+    // All query tokens must match (the last one as a prefix while typing);
+    // results are ranked by the sum of their precomputed BM25 scores
+    const indexedSearch = async (query) => {
+        const tokens = tokenize(query);
+        if (tokens.length === 0) return [];
+
+        const perToken = await Promise.all(tokens.map(async (token, i) => {
+            const shards = await Promise.all(shardsFor(token).map(shard => loadShard(shard.file)));
+            const docs = new Map();
+            shards.forEach(shard => lookupToken(shard, token, i === tokens.length - 1, docs));
+            return docs;
+        }));
+
+        let scores = perToken[0];
+        perToken.slice(1).forEach(docs => {
+            const merged = new Map();
+            scores.forEach((score, docId) => {
+                if (docs.has(docId)) merged.set(docId, score + docs.get(docId));
+            });
+            scores = merged;
+        });
+
+        const entries = await loadDocs();
+        return [...scores.entries()]
+            .sort((a, b) => b[1] - a[1] || a[0] - b[0])
+            .map(([docId]) => entries[docId])
+            .filter(Boolean);
+    };
+
+    const linearSearch = (query, entries) => entries.filter(item => {
+        const titleMatch = item.title.toLowerCase().includes(query);
+        const descMatch = item.description.toLowerCase().includes(query);
+        return titleMatch || descMatch;
+    });
+
+    const runSearch = async (query) => {
+        await manifestReady;
+        if (manifest) {
+            try {
+                return await indexedSearch(query);
+            } catch (error) {
+                console.error('Indexed search failed, falling back to a full scan:', error);
+            }
+        }
+        return linearSearch(query, await loadDocs());
+    };
 
     // Open Search Overlay
     if (searchTrigger) {
         searchTrigger.addEventListener('click', () => {
             searchOverlay.classList.add('active');
             searchInput.focus();
+            loadDocs(); // warm up while the user types
         });
     }
 
@@ -47,17 +179,18 @@ document.addEventListener('DOMContentLoaded', () => {
 
     // Search Logic
     if (searchInput) {
-        searchInput.addEventListener('input', (e) => {
+        let latestSearch = 0;
+        searchInput.addEventListener('input', async (e) => {
             const query = e.target.value.toLowerCase();
+            const ticket = ++latestSearch;
             searchResults.innerHTML = '';
 
             if (query.length < 2) return;
 
-            const results = searchIndex.filter(item => {
-                const titleMatch = item.title.toLowerCase().includes(query);
-                const descMatch = item.description.toLowerCase().includes(query);
-                return titleMatch || descMatch;
-            });
+            const results = await runSearch(query);
+            // Shards load asynchronously; a newer keystroke owns the results box
+            if (ticket !== latestSearch) return;
+            searchResults.innerHTML = '';
 
             if (results.length > 0) {
                 results.forEach(item => {
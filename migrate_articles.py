@@ -1,32 +1,48 @@
-import requests
 from bs4 import BeautifulSoup
 import datetime
 import os
 import re
+import time
+import asyncio
+import argparse
+import itertools
+from collections import deque
 
 import json
 
+from crawl_engine import CrawlEngine, CrawlFrontier, canonical_url, PER_HOST_LIMIT, TOTAL_LIMIT, TIMEOUT
+from response_archive import ResponseArchive, ARCHIVE_FILE
+from migration_journal import MigrationJournal, load_journal, JOURNAL_FILE
+from fetch_scheduler import RATE_LIMIT, RETRIES
+from staging_store import StagingStore, STAGING_DIR
+from asset_downloader import AssetDownloader, is_asset, ASSETS_SUBDIR
+from article_pipeline import (run_stages, format_stage_timings, clone_document, fill_article_template,
+                              convert_code_blocks, remove_unwanted)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_FILE = os.path.join(BASE_DIR, 'migration_sources.json')
+
+# Articles linked from this page form the "Python interview" group with its own dates
+DEFAULT_SPECIAL_GROUP_URL = "https://amanxai.com/2024/08/23/python-problems-for-coding-interviews/"
+
+MAX_ARTICLES = 150 # Safety limit
+PAGE_WINDOW = 16 # Pages kept in memory in pass 2 while their assets download
+
 # Load Configuration
-try:
-    with open('migration_sources.json', 'r') as f:
-        config = json.load(f)
-    GUIDED_PROJECTS = config.get('guided_projects', [])
-    DISCOVERY_SEEDS = config.get('discovery_seeds', [])
-    SOURCE_DOMAIN = config.get('source_domain', 'amanxai.com')
-    ASSETS_PATH_SIG = config.get('assets_path', '/wp-content/uploads/')
-except FileNotFoundError:
-    print("Error: migration_sources.json not found. Please create it to define source URLs.")
-    GUIDED_PROJECTS = []
-    DISCOVERY_SEEDS = []
-    SOURCE_DOMAIN = "amanxai.com"
-    ASSETS_PATH_SIG = "/wp-content/uploads/"
-
-# Combined Source for Crawling
-SOURCE_ARTICLES = GUIDED_PROJECTS + DISCOVERY_SEEDS
-
-# Read Template
-with open('articles/template.html', 'r') as f:
-    TEMPLATE_HTML = f.read()
+def load_config(path=CONFIG_FILE):
+    try:
+        with open(path, 'r') as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        print("Error: migration_sources.json not found. Please create it to define source URLs.")
+        config = {}
+    return {
+        'guided_projects': config.get('guided_projects', []),
+        'discovery_seeds': config.get('discovery_seeds', []),
+        'source_domain': config.get('source_domain', 'amanxai.com'),
+        'assets_path': config.get('assets_path', '/wp-content/uploads/'),
+        'special_group_url': config.get('special_group_url', DEFAULT_SPECIAL_GROUP_URL),
+    }
 
 # Helper to Generate Color Gradient for Card (Cycling)
 COLORS = [
@@ -40,544 +56,589 @@ COLORS = [
 ]
 ICONS = ["fa-robot", "fa-brain", "fa-database", "fa-microchip", "fa-code", "fa-server", "fa-chart-network"]
 
+BAD_TITLES = ["Untitled AI Article", "Oops! That page can’t be found.", "Page not found", "404 Not Found"]
+
 def slugify(title):
     return re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-') + ".html"
 
-import json
-
 # Build URL Map for Internal Linking
-URL_MAP = {}
-for art in GUIDED_PROJECTS:
-    # Key: plain URL, value: local relative path
-    # Normalize URL end (strip slash) just in case
-    clean_url = art['url'].rstrip('/')
-    URL_MAP[clean_url] = slugify(art['title'])
-    # Also Map original with slash
-    URL_MAP[art['url']] = slugify(art['title'])
-
-# Note: We don't map DISCOVERY_SEEDS to slugs because we don't necessarily want "home.html"
-
-def fetch_and_clean_content(url):
-    try:
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # AmanXAI uses .ct-entry-content or article body
-        content_div = soup.find('div', class_='entry-content') or soup.find('article')
-        
-        if not content_div:
-            return "<p>Content could not be fetched.</p>"
-            
-        # Clean up CodeMirror Blocks
-        code_blocks = content_div.find_all(class_='wp-block-codemirror-blocks-code-block')
-        for block in code_blocks:
-            pre_tag = block.find('pre')
-            if pre_tag:
-                # Extract code content
-                code_text = pre_tag.get_text()
-                
-                # Default language
-                lang = 'python'
-                
-                # Try to find language in data-setting
-                if pre_tag.get('data-setting'):
-                    try:
-                        settings = json.loads(pre_tag['data-setting'])
-                        mode = settings.get('mode', 'python')
-                        # Map mode to simple language name
-                        if 'python' in mode: lang = 'python'
-                        elif 'javascript' in mode or 'js' in mode: lang = 'javascript'
-                        elif 'html' in mode: lang = 'html'
-                        elif 'css' in mode: lang = 'css'
-                        elif 'sql' in mode: lang = 'sql'
-                        elif 'bash' in mode or 'shell' in mode: lang = 'bash'
-                        else: lang = 'python' # Fallback
-                    except:
-                        pass
-                
-                # Create new structure: <pre><code class="language-python">...</code></pre>
-                new_pre = soup.new_tag("pre")
-                new_code = soup.new_tag("code", **{'class': f'language-{lang}'})
-                new_code.string = code_text
-                new_pre.append(new_code)
-                
-                # Replace the entire WP block with new pre
-                block.replace_with(new_pre)
-
-        # Remove unwanted elements
-        for unwanted in content_div.select('.st-post-share, .jp-relatedposts, .widget-area, script, iframe'):
-            unwanted.decompose()
-            
-        # Remove specific promotional text
-        for p in content_div.find_all('p'):
-            if "follow me on Instagram" in p.get_text() or "Hands-On GenAI" in p.get_text():
-                p.decompose()
-
-        # Fix Internal Links
-        for a in content_div.find_all('a', href=True):
-            original_href = a['href'].rstrip('/')
-            match_slug = URL_MAP.get(original_href) or URL_MAP.get(a['href'])
-            
-            if match_slug:
-                # Replace with local path
-                a['href'] = match_slug
-
-        return content_div.decode_contents()
-    except Exception as e:
-        print(f"Error fetching content: {e}")
-        return "<p>Error loading content.</p>"
-
-# PROCESSING QUEUE
-# Convert initial list to a list of dicts we can process
-processing_queue = [art for art in SOURCE_ARTICLES]
-processed_urls = set() # To track unique URLs we have seen
-migrated_content = {}  # Store title, content, date, etc. key=url
+def build_url_map(migrated_content):
+    # Key: canonical source URL, value: local relative path
+    return {url: entry['slug'] for url, entry in migrated_content.items()}
+
+# --- CONTENT CLEANING ---
+# Stages run over the parsed source page (see article_pipeline.py)
+
+def find_content_div(soup):
+    # AmanXAI uses .entry-content or article body
+    return soup.find('div', class_='entry-content') or soup.find('article')
+
+def find_content(soup, ctx):
+    ctx['content'] = find_content_div(soup)
+    if not ctx['content']:
+        print("Skipping empty content...")
+        return False
+
+def read_title(soup, ctx):
+    art = ctx['article']
+    if 'title' not in art:
+        h1 = soup.find('h1')
+        art['title'] = h1.get_text().strip() if h1 else "Untitled AI Article"
+
+def discover_links(soup, ctx):
+    # Queue every dated post on the source site we haven't seen yet
+    for a in ctx['content'].find_all('a', href=True):
+        href = a['href']
+        if ctx['source_domain'] in href and ('/2021/' in href or '/2022/' in href or '/2023/' in href or '/2024/' in href or '/2025/' in href):
+            ctx['frontier'].push({'url': href})
+
+def read_description(soup, ctx):
+    art = ctx['article']
+    if 'description' not in art:
+        first_p = ctx['content'].find('p')
+        if first_p:
+           text = first_p.get_text().strip().replace('"', "'")
+           art['description'] = text[:160] + "..." if len(text) > 160 else text
+        else:
+           art['description'] = f"Learn more about {art['title']}."
+
+def keep_content(soup, ctx):
+    ctx['article']['content_html'] = ctx['content'].decode_contents()
+
+PAGE_STAGES = [
+    ('find_content', find_content),
+    ('title', read_title),
+    ('discover', discover_links),
+    ('code_blocks', convert_code_blocks),
+    ('cleanup', remove_unwanted),
+    ('description', read_description),
+    ('serialize', keep_content),
+]
 
-# Helper to fetch title if missing
-def get_article_details(url):
-    try:
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
-        if response.status_code != 200: return None, None
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        title = soup.find('h1').get_text().strip() if soup.find('h1') else "Untitled Article"
-        # Extract content block for cleaning
-        content_div = soup.find('div', class_='entry-content') or soup.find('article')
-        if not content_div: return title, None
-        
-        return title, content_div
-    except:
-        return None, None
-
-print("Starting recursive migration...")
-
-# Special Group Logic
-PYTHON_PARENT_URL = "https://amanxai.com/2024/08/23/python-problems-for-coding-interviews/"
-special_urls = set()
-special_urls.add(PYTHON_PARENT_URL)
-special_urls.add(PYTHON_PARENT_URL.rstrip('/'))
-
-# Pre-fetch special group to identify children
-print("identifying Python Interview sub-articles...")
-try:
-    resp = requests.get(PYTHON_PARENT_URL, headers={'User-Agent': 'Mozilla/5.0'})
-    if resp.status_code == 200:
-        p_soup = BeautifulSoup(resp.content, 'html.parser')
-        p_div = p_soup.find('div', class_='entry-content') or p_soup.find('article')
+def extract_article(current_art, content, config, frontier, timings=None):
+    """
+    Fills title, description and content_html of current_art from a fetched page.
+    Returns False if the page has no content block.
+    """
+    start = time.perf_counter()
+    soup = BeautifulSoup(content, 'html.parser')
+    if timings is not None:
+        timings['parse'] = timings.get('parse', 0.0) + time.perf_counter() - start
+
+    ctx = {'article': current_art, 'source_domain': config['source_domain'], 'frontier': frontier}
+    return run_stages(soup, PAGE_STAGES, ctx, timings)
+
+# --- PASS 1: CRAWL ---
+
+async def find_special_group(engine, config):
+    # Pre-fetch special group to identify children
+    parent_url = config['special_group_url']
+    special_urls = {canonical_url(parent_url)}
+    print("identifying Python Interview sub-articles...")
+    result = await engine.fetch(parent_url)
+    if result['error']:
+        print(f"Warning: Could not pre-fetch special group: {result['error']}")
+    elif result['status'] == 200:
+        p_soup = BeautifulSoup(result['content'], 'html.parser')
+        p_div = find_content_div(p_soup)
         if p_div:
             for a in p_div.find_all('a', href=True):
-                if 'amanxai.com' in a['href']:
-                     special_urls.add(a['href'])
-                     special_urls.add(a['href'].rstrip('/'))
-except Exception as e:
-    print(f"Warning: Could not pre-fetch special group: {e}")
-
-max_articles = 150 # Safety limit
-count = 0
-count_special = 0
-
-# Normal Date Cursor (From previous setting)
-date_normal = datetime.date(2025, 10, 30)
-# Special Date Cursor (Requested Oct 25, 2025)
-date_special = datetime.date(2025, 10, 25)
-
-while processing_queue and count < max_articles:
-    current_art = processing_queue.pop(0)
-    url = current_art['url']
-    
-    # Normalize URL
-    clean_url = url.rstrip('/')
-    if clean_url in processed_urls:
-        continue
-        
-    print(f"Processing ({count+1}): {current_art.get('title', 'Unknown Article')}")
-    
-    # --- FETCH LOGIC OMITTED FOR BREVITY, ASSUMED UNCHANGED UNTIL DATE ASSIGNMENT ---
-    
-    # Fetch Content
-    if 'content_html' not in current_art:
-        try:
-            response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            content_div = soup.find('div', class_='entry-content') or soup.find('article')
-            if not content_div:
-                print("Skipping empty content...")
-                continue
-
-            if 'title' not in current_art:
-                h1 = soup.find('h1')
-                current_art['title'] = h1.get_text().strip() if h1 else "Untitled AI Article"
-
-            for a in content_div.find_all('a', href=True):
-                href = a['href']
-                if SOURCE_DOMAIN in href and ('/2021/' in href or '/2022/' in href or '/2023/' in href or '/2024/' in href or '/2025/' in href):
-                    check_url = href.rstrip('/')
-                    if check_url not in processed_urls:
-                         is_in_queue = any(q['url'].rstrip('/') == check_url for q in processing_queue)
-                         if not is_in_queue:
-                             processing_queue.append({'url': href})
-
-            code_blocks = content_div.find_all(class_='wp-block-codemirror-blocks-code-block')
-            for block in code_blocks:
-                pre_tag = block.find('pre')
-                if pre_tag:
-                    code_text = pre_tag.get_text()
-                    lang = 'python'
-                    if pre_tag.get('data-setting'):
-                        try:
-                            settings = json.loads(pre_tag['data-setting'])
-                            mode = settings.get('mode', 'python')
-                            if 'python' in mode: lang = 'python'
-                            elif 'javascript' in mode or 'js' in mode: lang = 'javascript'
-                            elif 'html' in mode: lang = 'html'
-                            elif 'css' in mode: lang = 'css'
-                            elif 'sql' in mode: lang = 'sql'
-                            else: lang = 'python'
-                        except: pass
-                    new_pre = soup.new_tag("pre")
-                    new_code = soup.new_tag("code", **{'class': f'language-{lang}'})
-                    new_code.string = code_text
-                    new_pre.append(new_code)
-                    block.replace_with(new_pre)
-
-            for unwanted in content_div.select('.st-post-share, .jp-relatedposts, .widget-area, script, iframe'):
-                unwanted.decompose()
-            for p in content_div.find_all('p'):
-                if "follow me on Instagram" in p.get_text() or "Hands-On GenAI" in p.get_text():
-                    p.decompose()
-
-            if 'description' not in current_art:
-                first_p = content_div.find('p')
-                if first_p:
-                   text = first_p.get_text().strip().replace('"', "'")
-                   current_art['description'] = text[:160] + "..." if len(text) > 160 else text
-                else:
-                   current_art['description'] = f"Learn more about {current_art['title']}."
-
-            current_art['content_html'] = content_div.decode_contents()
-            
-        except Exception as e:
-            print(f"Error processing article: {e}")
-            continue
-
-    processed_urls.add(clean_url)
-    
-    bad_titles = ["Untitled AI Article", "Oops! That page can’t be found.", "Page not found", "404 Not Found"]
-    if current_art['title'] in bad_titles or "Oops!" in current_art['title']:
-        print(f"Skipping invalid article: {current_art['title']}")
-        continue
-
-    slug = slugify(current_art['title'])
-    
+                if config['source_domain'] in a['href']:
+                     special_urls.add(canonical_url(a['href']))
+    return special_urls
+
+def new_cursor():
+    return {
+        'count': 0,
+        'count_special': 0,
+        # Normal Date Cursor (From previous setting)
+        'date_normal': datetime.date(2025, 10, 30),
+        # Special Date Cursor (Requested Oct 25, 2025)
+        'date_special': datetime.date(2025, 10, 25),
+    }
+
+def cursor_to_json(cursor):
+    return {**cursor, 'date_normal': cursor['date_normal'].isoformat(), 'date_special': cursor['date_special'].isoformat()}
+
+def cursor_from_json(data):
+    return {**data, 'date_normal': datetime.date.fromisoformat(data['date_normal']),
+            'date_special': datetime.date.fromisoformat(data['date_special'])}
+
+def assign_date(cursor, special):
     # --- DATE ASSIGNMENT LOGIC ---
-    if url in special_urls or clean_url in special_urls:
+    if special:
         # Special Group: Oct 25, 2025 start, 2 per day
-        clean_date = date_special.strftime("%b %d, %Y")
-        count_special += 1
-        if count_special % 2 == 0:
-            date_special -= datetime.timedelta(days=1)
+        clean_date = cursor['date_special'].strftime("%b %d, %Y")
+        cursor['count_special'] += 1
+        if cursor['count_special'] % 2 == 0:
+            cursor['date_special'] -= datetime.timedelta(days=1)
     else:
         # Normal Group: Today start, 1 per day (or 2 per day if preferred, keeping original logic)
-        clean_date = date_normal.strftime("%b %d, %Y")
+        clean_date = cursor['date_normal'].strftime("%b %d, %Y")
         # Decrement distinct from special
-        if count % 2 == 0: # Keeping user's general '2 per day' preference if that was the case
-             date_normal -= datetime.timedelta(days=1)
-
-    migrated_content[clean_url] = {
-        'title': current_art['title'],
-        'slug': slug,
-        'date': clean_date,
-        'content': current_art['content_html'],
-        'color': COLORS[count % len(COLORS)],
-        'icon': ICONS[count % len(ICONS)],
-        'link': f"articles/{slug}"
-    }
-    
-    migrated_content[url] = migrated_content[clean_url]
-    
-    count += 1
-
-print(f"Total articles fetched: {len(migrated_content) // 2}") # Div 2 because double mapping
-
-# PASS 2: REWRITE LINKS AND SAVE FILES
-print("Rewriting links, adding navigation, and saving files...")
+        if cursor['count'] % 2 == 0: # Keeping user's general '2 per day' preference if that was the case
+             cursor['date_normal'] -= datetime.timedelta(days=1)
+    return clean_date
+
+async def fetch_article(engine, current_art, config, frontier, timings=None):
+    """Fetches and cleans current_art in place. Returns False if it should be skipped."""
+    if 'content_html' in current_art:
+        return True
+    result = await engine.fetch(current_art['url'])
+    if result['error']:
+        print(f"Error processing article: {result['error']}")
+        return False
+    try:
+        return extract_article(current_art, result['content'], config, frontier, timings)
+    except Exception as e:
+        print(f"Error processing article: {e}")
+        return False
 
-generated_articles = [] # List for pagination
+def initial_frontier(config):
+    # Copies, so the config's items don't end up holding crawl state
+    return CrawlFrontier(dict(art) for art in config['guided_projects'] + config['discovery_seeds'])
 
-# Get unique entries (values)
-unique_entries = list({v['slug']: v for k, v in migrated_content.items()}.values())
+def replay_journal(steps, frontier, migrated_content, store):
+    """
+    Re-applies the steps of an interrupted run. Returns the cursor they ended with,
+    or None if the journal doesn't match this frontier or its staged bodies are gone.
+    """
+    cursor = new_cursor()
+    for step in steps:
+        if not frontier or canonical_url(frontier.pop()['url']) != canonical_url(step['url']):
+            return None
+        for item in step['queued']:
+            frontier.push(item)
+        if step['entry']:
+            if not store.exists(step['entry']['body']):
+                return None
+            migrated_content[canonical_url(step['url'])] = step['entry']
+        cursor = cursor_from_json(step['cursor'])
+    return cursor
+
+async def crawl(config, engine, store, max_articles=MAX_ARTICLES, journal=None, resume=False, timings=None):
+    """
+    Breadth-first crawl from the guided projects and discovery seeds. Article bodies
+    go to store as soon as they are cleaned; seconds per cleaning stage are added to
+    timings when given.
+    Returns migrated_content: {canonical url: entry}, entry['body'] naming the staged body.
+    """
+    # PROCESSING QUEUE (each canonical URL is queued at most once)
+    frontier = initial_frontier(config)
+    migrated_content = {}  # Store title, date, body file etc. key=canonical url
+    cursor = None
+    if timings is None:
+        timings = {}  # seconds per cleaning stage
+
+    if resume and journal:
+        header, steps = load_journal(journal.path, config)
+        if header is None:
+            print("Nothing to resume (no journal for this configuration); starting from scratch.")
+        else:
+            cursor = replay_journal(steps, frontier, migrated_content, store)
+            if cursor is None:
+                print("Journal does not match the crawl; starting from scratch.")
+                frontier = initial_frontier(config)
+                migrated_content = {}
+            else:
+                special_urls = set(header['special_urls'])
+                journal.resume()
+                store.open()
+                print(f"Resuming: {len(migrated_content)} article(s) from {len(steps)} journaled step(s), {len(frontier)} queued")
+
+    if cursor is None:
+        print("Starting recursive migration...")
+        cursor = new_cursor()
+        store.reset()
+        # Special Group Logic
+        special_urls = await find_special_group(engine, config)
+        if journal:
+            journal.start({'config': config, 'special_urls': sorted(special_urls)})
+
+    while frontier and cursor['count'] < max_articles:
+        # Keep the pages the loop will reach next downloading in the background
+        for art in itertools.islice(frontier, engine.window):
+            engine.prefetch(art['url'])
+
+        current_art = frontier.pop()
+        url = current_art['url']
+        queued_before = len(frontier)
+
+        # Normalize URL
+        clean_url = canonical_url(url)
+
+        print(f"Processing ({cursor['count']+1}): {current_art.get('title', 'Unknown Article')}")
+
+        entry = None
+        if await fetch_article(engine, current_art, config, frontier, timings):
+            if current_art['title'] in BAD_TITLES or "Oops!" in current_art['title']:
+                print(f"Skipping invalid article: {current_art['title']}")
+            else:
+                slug = slugify(current_art['title'])
+                entry = migrated_content[clean_url] = {
+                    'title': current_art['title'],
+                    'slug': slug,
+                    'date': assign_date(cursor, clean_url in special_urls),
+                    'body': store.put(clean_url, current_art.pop('content_html')),
+                    'color': COLORS[cursor['count'] % len(COLORS)],
+                    'icon': ICONS[cursor['count'] % len(ICONS)],
+                    'link': f"articles/{slug}"
+                }
+                cursor['count'] += 1
+
+        if journal:
+            journal.record({
+                'url': url,
+                'queued': frontier.tail(len(frontier) - queued_before),
+                'entry': entry,
+                'cursor': cursor_to_json(cursor),
+            })
+
+    print(f"Total articles fetched: {len(migrated_content)}")
+    if timings:
+        print(f"Page stages: {format_stage_timings(timings, len(migrated_content))}")
+    return migrated_content
+
+# --- PASS 2: REWRITE LINKS AND SAVE FILES ---
+# Stages run over one copy of articles/template.html per article
+
+# We want to inject Top Navigation right after the meta data
+NAV_TOP_HTML = """
+    <!-- Navigation Top -->
+    <div style="margin-bottom: 2rem; padding-bottom: 1rem; border-bottom: 1px solid #E5E7EB; display: flex; justify-content: space-between;">
+        <a href="#" class="nav-prev" style="text-decoration: none; color: var(--primary-color); font-weight: 600;">&larr; Previous Article</a>
+        <a href="../articles.html" style="text-decoration: none; color: var(--text-muted); font-weight: 500;">All Articles</a>
+        <a href="#" class="nav-next" style="text-decoration: none; color: var(--primary-color); font-weight: 600;">Next Article &rarr;</a>
+    </div>
+    """
 
-for i, entry in enumerate(unique_entries):
-    # Parse content again to rewrite links
-    soup = BeautifulSoup(entry['content'], 'html.parser')
-    
+def rewrite_article_links(soup, ctx):
     # 1. First, Robust Link Rewriting (Articles)
     for a in soup.find_all('a', href=True):
-        href = a['href'].rstrip('/')
-        
-        # Robust Match: Try exact, then normalized
-        match = None
-        if href in migrated_content:
-            match = migrated_content[href]
-        else:
-            # Try swapping scheme
-            if 'https://' in href: alt = href.replace('https://', 'http://')
-            else: alt = href.replace('http://', 'https://')
-            if alt in migrated_content: match = migrated_content[alt]
-        
-        if match:
+        href = a['href']
+        local_slug = ctx['url_map'].get(canonical_url(href))
+
+        if local_slug:
              # Found a link to an article we migrated!
-             local_slug = match['slug']
-             a['href'] = local_slug 
-             a['target'] = "" 
-        elif 'amanxai.com' in href:
-            # It's an amanxai link but NOT a migrated article (e.g. category, tag, or 404)
+             a['href'] = local_slug
+             a['target'] = ""
+        elif ctx['source_domain'] in href:
+            # It's a source link but NOT a migrated article (e.g. category, tag, or 404)
             # Disable it to prevent leaking to original site
             a['href'] = "#"
             a['style'] = "pointer-events: none; cursor: default; text-decoration: none; color: inherit;"
             a.attrs.pop('target', None)
 
-    # 2. Scrub All Tags for Amanxai References (Images, Data Attributes)
+def scrub_source_references(soup, ctx):
+    # 2. Scrub All Tags for Source References (Images, Data Attributes)
     # Remove srcset to simplify image handling (browsers will use src)
     for tag in soup.find_all(attrs={'srcset': True}):
         del tag['srcset']
-        
+
     for tag in soup.find_all(True): # All tags
         # Check all attributes
         attrs_to_remove = []
         for attr, val in tag.attrs.items():
-            if isinstance(val, str) and 'amanxai.com' in val:
+            if isinstance(val, str) and ctx['source_domain'] in val:
                 # If it's src, we need to handle it (download)
                 if attr == 'src':
                     continue # Handled in asset download loop below
-                
+
                 # If it's href, we handled it above (or will handle in asset loop)
                 if attr == 'href':
                     continue
-                    
+
                 # For data-*, typically lightbox stuff, just remove
                 attrs_to_remove.append(attr)
-                
+
         for attr in attrs_to_remove:
             del tag[attr]
 
-    final_content = soup.decode_contents()
-    
-    # Inject into Template
-    new_html = TEMPLATE_HTML.replace('Article Title Goes Here', entry['title'])
-    new_html = new_html.replace('Article Title | Kishna Kushwaha', f"{entry['title']} | Kishna Kushwaha")
-    # Replace Meta Description
-    desc = entry.get('description', 'Article Description')
-    new_html = new_html.replace('content="Article Description"', f'content="{desc}"')
-    # Replace default date
-    new_html = re.sub(r'Dec \d+, 2025 • \d+ min read', f"{entry['date']} • 5 min read", new_html)
-    
-    # Inject body
-    # We want to inject Top Navigation right after the meta data
-    nav_html = """
-    <!-- Navigation Top -->
-    <div style="margin-bottom: 2rem; padding-bottom: 1rem; border-bottom: 1px solid #E5E7EB; display: flex; justify-content: space-between;">
-        <a href="#" class="nav-prev" style="text-decoration: none; color: var(--primary-color); font-weight: 600;">&larr; Previous Article</a>
-        <a href="../articles.html" style="text-decoration: none; color: var(--text-muted); font-weight: 500;">All Articles</a>
-        <a href="#" class="nav-next" style="text-decoration: none; color: var(--primary-color); font-weight: 600;">Next Article &rarr;</a>
-    </div>
-    """
-    
-    meta_end_idx = new_html.find('min read</div>') + 14
-    article_end_idx = new_html.find('</article>')
-    
-    # Insert Nav Top + Content
-    final_html_str = new_html[:meta_end_idx] + f"\n\n{nav_html}\n\n{final_content}\n\n" + new_html[article_end_idx:]
-    
-    # Parse full page to update footer navigation robustly AND download assets
-    full_soup = BeautifulSoup(final_html_str, 'html.parser')
-    
+def find_assets(soup, ctx):
     # ASSET DOWNLOAD LOGIC (Images AND Files)
     # Check both <a> (files) and <img> (images)
     targets = []
-    for a in full_soup.find_all('a', href=True):
+    for a in soup.find_all('a', href=True):
         targets.append((a, 'href'))
-    for img in full_soup.find_all('img', src=True):
+    for img in soup.find_all('img', src=True):
         targets.append((img, 'src'))
-        
-    for tag, attr in targets:
-        url = tag[attr]
-        
-        # Check if it is an asset we want to host locally
-        # 1. Files (.csv, .zip, etc)
-        # 2. Images (amanxai.com/wp-content/uploads/...)
-        
-        is_source_asset = SOURCE_DOMAIN in url and ASSETS_PATH_SIG in url
-        is_ext_file = any(url.lower().endswith(ext) for ext in ['.csv', '.zip', '.json']) and 'http' in url
-        
-        if is_source_asset or is_ext_file:
-             # Skip some specific bad links
-             if 'food-delivery-dataset' in url: continue
-             
-             # Extract filename
-             # Remove query params
-             clean_url_for_name = url.split('?')[0]
-             filename = clean_url_for_name.split('/')[-1]
-             
-             # Decode if necessary (e.g. %20)
-             import urllib.parse
-             filename = urllib.parse.unquote(filename)
-             
-             local_dir = 'assets/datasets' # Keeping simple, can be assets/images if preferred but user path structure is flexible
-             local_path = os.path.join(local_dir, filename)
-             
-             # Ensure dir exists (it should, but just in case)
-             os.makedirs(local_dir, exist_ok=True)
-             
-             # Download if not exists
-             if not os.path.exists(local_path):
-                 try:
-                     print(f"Downloading asset: {filename}")
-                     headers = {
-                         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                         'Referer': 'https://amanxai.com/',
-                         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8'
-                     }
-                     # Clean URL for request (handle existing query params in original)
-                     fetch_url = url.replace('&amp;', '&')
-                     
-                     r = requests.get(fetch_url, headers=headers, allow_redirects=True, timeout=10)
-                     if r.status_code == 200:
-                         with open(local_path, 'wb') as f:
-                             f.write(r.content)
-                     else:
-                         print(f"Failed to download asset: Status {r.status_code}")
-                 except Exception as e:
-                     print(f"Error downloading asset: {e}")
-             
-             # FORCE rewrite link to local path
-             tag[attr] = f"../{local_dir}/{filename}"
-             
-             # Remove 'rel' or 'target' for these local assets
-             if 'target' in tag.attrs: del tag['target']
-             if 'rel' in tag.attrs: del tag['rel']
-             if 'srcset' in tag.attrs: del tag['srcset'] # Ensure srcset doesn't override new local src
-
-    # Find navigation container (flex with space-between)
-    # Update Navigation Links (Find ALL prev/next links)
-    # Previous Link
-    prev_slug = unique_entries[i+1]['slug'] if i + 1 < len(unique_entries) else "#"
-    # Next Link
-    next_slug = unique_entries[i-1]['slug'] if i > 0 else "#"
-    
+    ctx['assets'] = [(tag, attr) for tag, attr in targets if is_asset(tag[attr], ctx['config'])]
+
+def localize_assets(soup, ctx):
+    for tag, attr in ctx['assets']:
+        # FORCE rewrite link to local path
+        tag[attr] = f"../{ASSETS_SUBDIR}/{ctx['local_names'][tag[attr]]}"
+
+        # Remove 'rel' or 'target' for these local assets
+        if 'target' in tag.attrs: del tag['target']
+        if 'rel' in tag.attrs: del tag['rel']
+        if 'srcset' in tag.attrs: del tag['srcset'] # Ensure srcset doesn't override new local src
+
+def set_article_navigation(soup, ctx):
     # Bottom Nav is in template, Top Nav is injected.
     # Target by text content since we reuse the same text in both.
-    for a in full_soup.find_all('a'):
+    prev_slug, next_slug = ctx['prev_slug'], ctx['next_slug']
+    for a in soup.find_all('a'):
         # Normalize whitespace (replace newlines and multiple spaces with single space)
         text = ' '.join(a.get_text().split())
-        
+
         if "Previous Article" in text:
             a['href'] = prev_slug
-            if prev_slug == "#": 
+            if prev_slug == "#":
                 a['style'] = (a.get('style', '') + '; color: #ccc; pointer-events: none;').strip(';')
-            
+
         if "Next Article" in text:
             a['href'] = next_slug
-            if next_slug == "#": 
+            if next_slug == "#":
                 a['style'] = (a.get('style', '') + '; color: #ccc; pointer-events: none;').strip(';')
 
-    # Save
-    with open(f"articles/{entry['slug']}", 'w') as f:
-        f.write(str(full_soup))
-        
-    generated_articles.append(entry)
-
-print("Articles saved. Generating listing...")
-
-# Pagination Logic
-# Exclude Guided Projects from the main Articles list
-# We use Slugs for robust filtering
-project_slugs = set()
-for p in GUIDED_PROJECTS:
-    project_slugs.add(slugify(p['title']))
-
-# Configure all generated_articles but filter out projects for the Listing Pages
-listing_articles = [art for art in generated_articles if art['slug'] not in project_slugs]
-
-ARTICLES_PER_PAGE = 9
-chunks = [listing_articles[i:i + ARTICLES_PER_PAGE] for i in range(0, len(listing_articles), ARTICLES_PER_PAGE)]
-
-# Read Listing Template - CLEAN IT FIRST
-with open('articles.html', 'r') as f:
-    LISTING_HTML = f.read()
-    
-# Clean any existing pagination from the template string itself to avoid accumulation
-# parse once to find and remove default pagination if exists
-soup_clean = BeautifulSoup(LISTING_HTML, 'html.parser')
-existing_pag = soup_clean.find('div', style=lambda s: s and 'justify-content:center' in s)
-if existing_pag: existing_pag.decompose()
-base_listing_html = str(soup_clean)
-
-
-for page_num, chunk in enumerate(chunks, 1):
-    soup = BeautifulSoup(base_listing_html, 'html.parser')
-    grid = soup.find('div', class_='articles-grid')
-    if grid:
-        grid.clear()
-        
-        for article in chunk:
-            # Create card
-            card_html = f"""
-            <article class="article-card">
-                <div class="article-card-image">
-                    <div class="placeholder-img" style="background: {article.get('color', COLORS[0])};"></div>
-                    <div class="blog-overlay"><i class="fas {article.get('icon', ICONS[0])}"></i></div>
-                </div>
-                <div class="article-card-content">
-                    <span class="article-meta-small">{article['date']}</span>
-                    <h3>{article['title']}</h3>
-                    <a href="{article['link']}" class="article-read-btn">Read Article</a>
-                </div>
-            </article>
-            """
-            # Append as BS4 object
-            grid.append(BeautifulSoup(card_html, 'html.parser'))
-            
-        # Add Pagination
-        prev_link = f"articles-{page_num-1}.html" if page_num > 1 else "#"
-        if page_num == 2: prev_link = "articles.html"
-        next_link = f"articles-{page_num+1}.html" if page_num < len(chunks) else "#"
-        
-        pagination_div = soup.new_tag('div', style="display:flex; justify-content:center; gap:1rem; margin-top:3rem;")
-        
-        if prev_link != "#":
-            a_prev = soup.new_tag('a', href=prev_link, **{'class': 'btn btn-secondary'})
-            a_prev.string = "Previous"
-            pagination_div.append(a_prev)
-            
-        span = soup.new_tag('span', style="align-self:center; font-weight:600;")
-        span.string = f"Page {page_num} of {len(chunks)}"
-        pagination_div.append(span)
-        
-        if next_link != "#":
-            a_next = soup.new_tag('a', href=next_link, **{'class': 'btn btn-primary'})
-            a_next.string = "Next"
-            pagination_div.append(a_next)
-               
-        # Append pagination after grid
-        # grid.parent is the section container
-        if grid.parent:
-            # Remove any existing pagination first (double safety)
-            for old_pag in grid.parent.find_all('div', style=lambda s: s and 'justify-content:center' in s):
-                old_pag.decompose()
-            grid.parent.append(pagination_div)
-            
-    filename = "articles.html" if page_num == 1 else f"articles-{page_num}.html"
-    with open(filename, 'w') as f:
-        f.write(str(soup.prettify())) # Prettify for clean output
-        
-    print(f"Created listing page: {filename}")
-            
-    filename = "articles.html" if page_num == 1 else f"articles-{page_num}.html"
-    with open(filename, 'w') as f:
-        f.write(str(soup.prettify())) # Prettify for clean output
-        
-    print(f"Created listing page: {filename}")
-
-print("Migration Complete.")
+def serialize_page(soup, ctx):
+    ctx['html'] = str(soup)
+
+# Before the assets are downloaded...
+PAGE_RENDER_STAGES = [
+    ('template', fill_article_template),
+    ('links', rewrite_article_links),
+    ('scrub', scrub_source_references),
+    ('find_assets', find_assets),
+]
+# ...and after
+PAGE_FINISH_STAGES = [
+    ('assets', localize_assets),
+    ('navigation', set_article_navigation),
+    ('serialize', serialize_page),
+]
+
+def write_articles(migrated_content, config, store, site_dir=BASE_DIR, archive=None, rate=RATE_LIMIT, retries=RETRIES,
+                   report=None):
+    print("Rewriting links, adding navigation, and saving files...")
+
+    with open(os.path.join(site_dir, 'articles', 'template.html'), 'r') as f:
+        template_soup = BeautifulSoup(f.read(), 'html.parser')
+
+    generated_articles = [] # List for pagination
+
+    url_map = build_url_map(migrated_content)
+
+    # Get unique entries (values)
+    unique_entries = list({v['slug']: v for k, v in migrated_content.items()}.values())
+
+    timings = {}  # seconds per stage
+    downloader = AssetDownloader(os.path.join(site_dir, ASSETS_SUBDIR), config['source_domain'], archive=archive,
+                                 rate=rate, retries=retries)
+
+    def finish(i, page, ctx):
+        entry = unique_entries[i]
+        ctx['local_names'] = downloader.resolve([tag[attr] for tag, attr in ctx['assets']])
+        # Previous Link
+        ctx['prev_slug'] = unique_entries[i+1]['slug'] if i + 1 < len(unique_entries) else "#"
+        # Next Link
+        ctx['next_slug'] = unique_entries[i-1]['slug'] if i > 0 else "#"
+        run_stages(page, PAGE_FINISH_STAGES, ctx, timings)
+
+        # Save
+        with open(os.path.join(site_dir, 'articles', entry['slug']), 'w') as f:
+            f.write(ctx['html'])
+
+        generated_articles.append(entry)
+
+    # Bodies are read back one at a time; at most PAGE_WINDOW pages are held while
+    # their assets download, so memory doesn't grow with the number of articles
+    window = deque()
+    try:
+        for i, entry in enumerate(unique_entries):
+            start = time.perf_counter()
+            page = clone_document(template_soup)
+            timings['clone'] = timings.get('clone', 0.0) + time.perf_counter() - start
+
+            ctx = {
+                'title': entry['title'],
+                'description': entry.get('description', 'Article Description'),
+                'date': entry['date'],
+                # Insert Nav Top + Content
+                'body_html': f"\n\n{NAV_TOP_HTML}\n\n{store.get(entry['body'])}\n\n",
+                'url_map': url_map,
+                'source_domain': config['source_domain'],
+                'config': config,
+            }
+            run_stages(page, PAGE_RENDER_STAGES, ctx, timings)
+            downloader.submit([tag[attr] for tag, attr in ctx['assets']])
+            window.append((i, page, ctx))
+            if len(window) > PAGE_WINDOW:
+                finish(*window.popleft())
+        while window:
+            finish(*window.popleft())
+    finally:
+        downloader.close()
+
+    stats = downloader.stats
+    print(f"Assets: {stats['downloaded']} downloaded ({stats['bytes'] / 1024:.0f} KB), {stats['existing']} already present, "
+          f"{stats['duplicates']} duplicate(s) linked to an identical file, {stats['failed']} failed, "
+          f"{stats['retries']} retries, {stats['throttled']:.1f} s throttled")
+    if timings:
+        print(f"Article stages: {format_stage_timings(timings, len(unique_entries))}")
+    if report is not None:
+        report.update({'articles': len(generated_articles), 'assets': dict(stats), 'article_stages': timings})
+    return generated_articles
+
+# --- LISTING PAGES ---
+
+def write_listings(generated_articles, config, site_dir=BASE_DIR):
+    print("Articles saved. Generating listing...")
+
+    # Pagination Logic
+    # Exclude Guided Projects from the main Articles list
+    # We use Slugs for robust filtering
+    project_slugs = set()
+    for p in config['guided_projects']:
+        project_slugs.add(slugify(p['title']))
+
+    # Configure all generated_articles but filter out projects for the Listing Pages
+    listing_articles = [art for art in generated_articles if art['slug'] not in project_slugs]
+
+    ARTICLES_PER_PAGE = 9
+    chunks = [listing_articles[i:i + ARTICLES_PER_PAGE] for i in range(0, len(listing_articles), ARTICLES_PER_PAGE)]
+
+    # Read Listing Template - CLEAN IT FIRST
+    with open(os.path.join(site_dir, 'articles.html'), 'r') as f:
+        LISTING_HTML = f.read()
+
+    # Clean any existing pagination from the template string itself to avoid accumulation
+    # parse once to find and remove default pagination if exists
+    soup_clean = BeautifulSoup(LISTING_HTML, 'html.parser')
+    existing_pag = soup_clean.find('div', style=lambda s: s and 'justify-content:center' in s)
+    if existing_pag: existing_pag.decompose()
+    base_listing_html = str(soup_clean)
+
+    for page_num, chunk in enumerate(chunks, 1):
+        soup = BeautifulSoup(base_listing_html, 'html.parser')
+        grid = soup.find('div', class_='articles-grid')
+        if grid:
+            grid.clear()
+
+            for article in chunk:
+                # Create card
+                card_html = f"""
+                <article class="article-card">
+                    <div class="article-card-image">
+                        <div class="placeholder-img" style="background: {article.get('color', COLORS[0])};"></div>
+                        <div class="blog-overlay"><i class="fas {article.get('icon', ICONS[0])}"></i></div>
+                    </div>
+                    <div class="article-card-content">
+                        <span class="article-meta-small">{article['date']}</span>
+                        <h3>{article['title']}</h3>
+                        <a href="{article['link']}" class="article-read-btn">Read Article</a>
+                    </div>
+                </article>
+                """
+                # Append as BS4 object
+                grid.append(BeautifulSoup(card_html, 'html.parser'))
+
+            # Add Pagination
+            prev_link = f"articles-{page_num-1}.html" if page_num > 1 else "#"
+            if page_num == 2: prev_link = "articles.html"
+            next_link = f"articles-{page_num+1}.html" if page_num < len(chunks) else "#"
+
+            pagination_div = soup.new_tag('div', style="display:flex; justify-content:center; gap:1rem; margin-top:3rem;")
+
+            if prev_link != "#":
+                a_prev = soup.new_tag('a', href=prev_link, **{'class': 'btn btn-secondary'})
+                a_prev.string = "Previous"
+                pagination_div.append(a_prev)
+
+            span = soup.new_tag('span', style="align-self:center; font-weight:600;")
+            span.string = f"Page {page_num} of {len(chunks)}"
+            pagination_div.append(span)
+
+            if next_link != "#":
+                a_next = soup.new_tag('a', href=next_link, **{'class': 'btn btn-primary'})
+                a_next.string = "Next"
+                pagination_div.append(a_next)
+
+            # Append pagination after grid
+            # grid.parent is the section container
+            if grid.parent:
+                # Remove any existing pagination first (double safety)
+                for old_pag in grid.parent.find_all('div', style=lambda s: s and 'justify-content:center' in s):
+                    old_pag.decompose()
+                grid.parent.append(pagination_div)
+
+        filename = "articles.html" if page_num == 1 else f"articles-{page_num}.html"
+        with open(os.path.join(site_dir, filename), 'w') as f:
+            f.write(str(soup.prettify())) # Prettify for clean output
+
+        print(f"Created listing page: {filename}")
+
+# --- MAIN ---
+
+async def run_crawl(config, store, max_articles, per_host, total, timeout, archive=None, journal=None, resume=False,
+                    rate=RATE_LIMIT, retries=RETRIES, report=None):
+    engine = CrawlEngine(per_host=per_host, total=total, timeout=timeout, archive=archive, rate=rate, retries=retries)
+    timings = {}
+    try:
+        migrated_content = await crawl(config, engine, store, max_articles, journal, resume, timings)
+    finally:
+        await engine.close()
+    stats = engine.stats
+    print(f"Fetched {stats['requests']} page(s), {stats['bytes'] / 1024:.0f} KB, {stats['errors']} error(s), "
+          f"{stats['retries']} retries, {stats['throttled']:.1f} s throttled")
+    if report is not None:
+        report.update({'fetch': dict(stats), 'page_stages': timings})
+    return migrated_content
+
+def main(config_path=CONFIG_FILE, site_dir=BASE_DIR, max_articles=MAX_ARTICLES,
+         per_host=PER_HOST_LIMIT, total=TOTAL_LIMIT, timeout=TIMEOUT,
+         archive_path=ARCHIVE_FILE, offline=False, journal_path=JOURNAL_FILE, resume=False, staging_dir=STAGING_DIR,
+         rate=RATE_LIMIT, retries=RETRIES, report=None):
+    """
+    Runs the whole migration. With a report dict, fills in what it did: articles
+    written, fetch and asset counters, and seconds per page/article stage.
+    """
+    config = load_config(config_path)
+    # archive_path=None fetches everything from the network and keeps nothing
+    archive = ResponseArchive(archive_path, offline=offline) if archive_path else None
+    journal = MigrationJournal(journal_path) if journal_path else None
+    store = StagingStore(staging_dir)
+    try:
+        migrated_content = asyncio.run(run_crawl(config, store, max_articles, per_host, total, timeout, archive,
+                                                 journal, resume, rate, retries, report))
+        generated_articles = write_articles(migrated_content, config, store, site_dir, archive, rate, retries, report)
+        write_listings(generated_articles, config, site_dir)
+        if archive:
+            stats = archive.stats
+            print(f"Response archive: {stats['downloaded']} downloaded, {stats['revalidated']} revalidated, {stats['replayed']} replayed")
+    finally:
+        if archive:
+            archive.close()
+        if journal:
+            journal.close()
+    # Only a finished migration drops its journal and staged bodies; anything else can be resumed
+    if journal:
+        journal.remove()
+    store.remove()
+    print("Migration Complete.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate articles from the source blog into articles/.")
+    parser.add_argument('--config', default=CONFIG_FILE, help="Source definition (guided_projects, discovery_seeds, ...)")
+    parser.add_argument('--site-dir', default=BASE_DIR, help="Site root to write articles/, assets/ and listings into")
+    parser.add_argument('--max-articles', type=int, default=MAX_ARTICLES, help="Stop after this many articles")
+    parser.add_argument('--per-host', type=int, default=PER_HOST_LIMIT, help="Concurrent requests per host")
+    parser.add_argument('--concurrency', type=int, default=TOTAL_LIMIT, help="Concurrent requests overall")
+    parser.add_argument('--timeout', type=float, default=TIMEOUT[1], help="Read timeout per request, in seconds")
+    parser.add_argument('--rate', type=float, default=RATE_LIMIT, help="Requests per second per host (0 for no limit)")
+    parser.add_argument('--retries', type=int, default=RETRIES, help="Retries of a throttled (429/5xx) or failed request")
+    parser.add_argument('--archive', default=ARCHIVE_FILE, help="Response archive to revalidate against and update")
+    parser.add_argument('--no-archive', action='store_true', help="Download everything and archive nothing")
+    parser.add_argument('--offline', action='store_true', help="Replay the migration from the archive, without network access")
+    parser.add_argument('--resume', action='store_true', help="Continue an interrupted migration from its journal")
+    parser.add_argument('--journal', default=JOURNAL_FILE, help="Checkpoint journal to write (and read with --resume)")
+    parser.add_argument('--staging-dir', default=STAGING_DIR, help="Where cleaned article bodies wait for pass 2")
+    args = parser.parse_args()
+    if args.offline and args.no_archive:
+        parser.error("--offline needs the response archive")
+    main(config_path=args.config, site_dir=args.site_dir, max_articles=args.max_articles,
+         per_host=args.per_host, total=args.concurrency, timeout=(TIMEOUT[0], args.timeout),
+         archive_path=None if args.no_archive else args.archive, offline=args.offline,
+         journal_path=args.journal, resume=args.resume, staging_dir=args.staging_dir,
+         rate=args.rate, retries=args.retries)
@@ -0,0 +1,76 @@
+import os
+import json
+
+# Append-only checkpoint journal for migrate_articles.py. The first line records
+# what the crawl was started with; every later line is one step of the crawl loop
+# (the URL taken off the frontier, the URLs it queued, the article it produced and
+# the date/color cursors afterwards). --resume replays the steps instead of
+# fetching them again, so a resumed run ends up in exactly the state an
+# uninterrupted one would have reached.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+JOURNAL_FILE = os.path.join(BASE_DIR, '.migration-journal.jsonl')
+
+# Bump when the step format changes; older journals are then not resumed
+JOURNAL_VERSION = 2
+
+def load_journal(path, config):
+    """
+    (header, steps) from an earlier run with the same config, or (None, []) when
+    there is nothing to resume. A torn last line (crash mid-write) is ignored.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().split('\n')
+    except FileNotFoundError:
+        return None, []
+
+    records = []
+    for line in lines:
+        if not line:
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            break
+    if not records or records[0].get('version') != JOURNAL_VERSION or records[0].get('config') != config:
+        return None, []
+    return records[0], records[1:]
+
+
+class MigrationJournal:
+
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self.file = None
+
+    def start(self, header):
+        """Begins a new journal (an existing one is replaced)."""
+        self.file = open(self.path, 'w', encoding='utf-8')
+        self._append({'version': JOURNAL_VERSION, **header})
+
+    def resume(self):
+        """Continues the existing journal."""
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def record(self, step):
+        self._append(step)
+
+    def _append(self, record):
+        # One line per record, on disk before the crawl moves on
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def remove(self):
+        """Drops the journal once the migration has finished."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
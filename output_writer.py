@@ -0,0 +1,52 @@
+import os
+import tempfile
+from collections import Counter
+
+# Shared writer for generated files. A file is only replaced when its bytes change,
+# so unchanged outputs keep their mtime (and stay out of caches' and git's way), and
+# a replacement goes through a temp file + rename, so readers never see half a file.
+
+def _default_mode():
+    # Permissions a plain open(path, 'w') would give a new file
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+def write_if_changed(path, content, report=None, encoding='utf-8'):
+    """
+    Writes content (str or bytes) to path unless the file already holds exactly that.
+    Counts 'written' / 'skipped' in report (a Counter) if given. Returns True if written.
+    """
+    data = content.encode(encoding) if isinstance(content, str) else content
+
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, 'rb') as f:
+                if f.read() == data:
+                    if report is not None:
+                        report['skipped'] += 1
+                    return False
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = _default_mode()
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    if report is not None:
+        report['written'] += 1
+    return True
+
+def new_report():
+    return Counter(written=0, skipped=0)
+
+def format_report(report):
+    return f"Wrote {report['written']} file(s), {report['skipped']} unchanged"
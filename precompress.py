@@ -0,0 +1,148 @@
+import os
+import glob
+import gzip
+import argparse
+from output_writer import write_if_changed
+
+# Writes .gz (and, if the brotli package is installed, .br) siblings next to the site's
+# text files so a static server can send them as-is (nginx gzip_static/brotli_static,
+# Caddy precompressed, ...). A sibling is rewritten only when its source changed: after
+# writing, the sibling gets the source's mtime, so matching mtimes mean up to date.
+# A stale sibling whose encoder isn't available here (a .br written on a machine with
+# brotli) is deleted rather than left for the server to send instead of the new file.
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Generated outputs plus the static text assets served next to them
+PRECOMPRESS_GLOBS = [
+    '*.html',
+    'articles/*.html',
+    'projects/*.html',
+    'search.json',
+    'search-index/*.json',
+    'css/*.css',
+    'js/*.js',
+]
+
+ENCODINGS = {
+    '.gz': lambda data: gzip.compress(data, compresslevel=9, mtime=0),
+}
+if brotli is not None:
+    ENCODINGS['.br'] = lambda data: brotli.compress(data, quality=11)
+# Every sibling this script can write, whether or not its encoder is installed
+SIBLING_EXTENSIONS = ('.gz', '.br')
+
+def source_files(base_dir=BASE_DIR, patterns=PRECOMPRESS_GLOBS):
+    files = set()
+    for pattern in patterns:
+        files.update(glob.glob(os.path.join(base_dir, pattern)))
+    return sorted(files)
+
+def is_up_to_date(src_stat, sibling):
+    try:
+        return os.stat(sibling).st_mtime_ns == src_stat.st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+def remove_orphans(base_dir=BASE_DIR, patterns=PRECOMPRESS_GLOBS):
+    # Siblings whose source file is gone (e.g. a replaced search index shard)
+    removed = 0
+    for pattern in patterns:
+        for ext in SIBLING_EXTENSIONS:
+            for sibling in glob.glob(os.path.join(base_dir, pattern + ext)):
+                if not os.path.exists(sibling[:-len(ext)]):
+                    os.remove(sibling)
+                    removed += 1
+    return removed
+
+def precompress(base_dir=BASE_DIR, patterns=PRECOMPRESS_GLOBS, force=False):
+    """
+    Compresses every matching file whose siblings are missing or stale, and deletes
+    stale siblings it has no encoder for.
+    Returns report rows: {path, size, written, skipped, deleted, <ext>: compressed size}.
+    """
+    report = []
+    for src in source_files(base_dir, patterns):
+        src_stat = os.stat(src)
+        row = {"path": os.path.relpath(src, base_dir), "size": src_stat.st_size, "written": 0, "skipped": 0, "deleted": 0}
+        data = None
+
+        for ext in SIBLING_EXTENSIONS:
+            sibling = src + ext
+            if ext not in ENCODINGS and os.path.exists(sibling) and not is_up_to_date(src_stat, sibling):
+                os.remove(sibling)
+                row['deleted'] += 1
+
+        for ext, compress in ENCODINGS.items():
+            sibling = src + ext
+            if not force and is_up_to_date(src_stat, sibling):
+                row['skipped'] += 1
+                row[ext] = os.path.getsize(sibling)
+                continue
+
+            if data is None:
+                with open(src, 'rb') as f:
+                    data = f.read()
+            compressed = compress(data)
+            write_if_changed(sibling, compressed)
+            os.utime(sibling, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+            row['written'] += 1
+            row[ext] = len(compressed)
+
+        report.append(row)
+    return report
+
+def format_size(n):
+    if n >= 1024 * 1024:
+        return f"{n / (1024 * 1024):.1f} MB"
+    if n >= 1024:
+        return f"{n / 1024:.1f} KB"
+    return f"{n} B"
+
+def print_report(report):
+    written = sum(r['written'] for r in report)
+    skipped = sum(r['skipped'] for r in report)
+    deleted = sum(r['deleted'] for r in report)
+    print(f"Precompressed {len(report)} files: {written} sibling(s) written, {skipped} up to date")
+    if deleted:
+        print(f"  deleted {deleted} stale sibling(s) this machine can't rewrite")
+    if brotli is None:
+        print("  (brotli not installed - only .gz siblings were written; pip install brotli)")
+
+    # Totals per file type
+    groups = {}
+    for r in report:
+        ext = os.path.splitext(r['path'])[1] or r['path']
+        g = groups.setdefault(ext, {"files": 0, "size": 0, **{e: 0 for e in ENCODINGS}})
+        g['files'] += 1
+        g['size'] += r['size']
+        for e in ENCODINGS:
+            g[e] += r.get(e, 0)
+
+    header = f"  {'type':<6} {'files':>6} {'original':>10}" + ''.join(f" {e:>10} {'ratio':>6}" for e in ENCODINGS)
+    print(header)
+    for ext in sorted(groups):
+        g = groups[ext]
+        line = f"  {ext:<6} {g['files']:>6} {format_size(g['size']):>10}"
+        for e in ENCODINGS:
+            ratio = g[e] / g['size'] if g['size'] else 0
+            line += f" {format_size(g[e]):>10} {ratio:>6.0%}"
+        print(line)
+
+def main(force=False):
+    report = precompress(force=force)
+    removed = remove_orphans()
+    print_report(report)
+    if removed:
+        print(f"  removed {removed} orphaned sibling(s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write .gz/.br siblings for the site's HTML/JSON/CSS/JS files.")
+    parser.add_argument('--force', action='store_true', help="Recompress even if siblings are up to date")
+    args = parser.parse_args()
+    main(force=args.force)
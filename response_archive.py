@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+from crawl_engine import canonical_url
+
+# On-disk store of source-site responses for migrate_articles.py. Pages and assets
+# are kept with their headers; later runs revalidate them with If-None-Match /
+# If-Modified-Since instead of downloading them again, and --offline replays a
+# migration from the archive alone.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ARCHIVE_FILE = os.path.join(BASE_DIR, '.migration-archive.sqlite3')
+
+# Bump when the schema changes; the archive is then emptied
+ARCHIVE_VERSION = 1
+
+# Large bodies (assets) are streamed into and out of the archive in chunks
+CHUNK_SIZE = 64 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,       -- canonical URL (crawl_engine.canonical_url)
+    fetch_url TEXT NOT NULL,    -- the URL as it was requested
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,      -- JSON {lower-case name: value}
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,   -- time of the last download or successful revalidation
+    body BLOB NOT NULL
+);
+"""
+
+
+def archivable(status):
+    # Throttling and server errors say nothing about the page; they are retried, not kept
+    return status < 500 and status != 429
+
+
+class ArchiveMiss(Exception):
+    """Raised in offline mode for a URL that was never archived."""
+
+
+class ResponseArchive:
+    """
+    get(url, request) returns (status, content, headers) for url, where
+    request(url, extra_headers) does the actual HTTP GET and returns the same
+    triple. Safe to call from the crawl engine's worker threads.
+    """
+
+    def __init__(self, path=ARCHIVE_FILE, offline=False):
+        self.path = path
+        self.offline = offline
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != ARCHIVE_VERSION:
+            self.conn.execute("DROP TABLE IF EXISTS responses")
+            self.conn.execute(f"PRAGMA user_version = {ARCHIVE_VERSION}")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        # Canonical URLs already downloaded or revalidated in this run
+        self.fresh = set()
+        self.stats = {'downloaded': 0, 'revalidated': 0, 'replayed': 0}
+
+    def lookup(self, url):
+        with self.lock:
+            return self.conn.execute("SELECT * FROM responses WHERE url = ?", (canonical_url(url),)).fetchone()
+
+    def store(self, url, status, content, headers):
+        headers = {k.lower(): v for k, v in headers.items()}
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (url, fetch_url, status, headers, etag, last_modified, fetched_at, body) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (canonical_url(url), url, status, json.dumps(headers), headers.get('etag'),
+                 headers.get('last-modified'), time.time(), content))
+            self.conn.commit()
+
+    def touch(self, url):
+        with self.lock:
+            self.conn.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), canonical_url(url)))
+            self.conn.commit()
+
+    def store_file(self, url, status, path, headers):
+        """store() for a body that is on disk, without reading it into memory."""
+        headers = {k.lower(): v for k, v in headers.items()}
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT OR REPLACE INTO responses (url, fetch_url, status, headers, etag, last_modified, fetched_at, body) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, zeroblob(?))",
+                (canonical_url(url), url, status, json.dumps(headers), headers.get('etag'),
+                 headers.get('last-modified'), time.time(), os.path.getsize(path)))
+            with self.conn.blobopen('responses', 'body', cursor.lastrowid) as blob, open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    blob.write(chunk)
+            self.conn.commit()
+
+    def copy_body(self, record, out):
+        """Writes the archived body of record to the binary file out, in chunks."""
+        with self.lock:
+            rowid = self.conn.execute("SELECT rowid FROM responses WHERE url = ?", (record['url'],)).fetchone()[0]
+            with self.conn.blobopen('responses', 'body', rowid, readonly=True) as blob:
+                for chunk in iter(lambda: blob.read(CHUNK_SIZE), b''):
+                    out.write(chunk)
+
+    def _lookup_or_revalidate(self, url):
+        """(record, conditional headers); record is set and headers None if it can be used as is."""
+        record = self.lookup(url)
+
+        # 1. Offline, or already checked in this run: answer from the archive
+        if record is not None and (self.offline or canonical_url(url) in self.fresh):
+            self.stats['replayed'] += 1
+            return record, None
+        if self.offline:
+            raise ArchiveMiss(f"{url} is not in the response archive (offline)")
+
+        # 2. Conditional request when the archived copy has validators
+        conditional = {}
+        if record is not None and record['etag']:
+            conditional['If-None-Match'] = record['etag']
+        if record is not None and record['last_modified']:
+            conditional['If-Modified-Since'] = record['last_modified']
+        return record, conditional
+
+    def _revalidated(self, url, record, status):
+        if not archivable(status):
+            return False
+        self.fresh.add(canonical_url(url))
+        if status == 304 and record is not None:
+            self.stats['revalidated'] += 1
+            self.touch(url)
+            return True
+        self.stats['downloaded'] += 1
+        return False
+
+    def get(self, url, request):
+        record, conditional = self._lookup_or_revalidate(url)
+        if conditional is None:
+            return record['status'], record['body'], json.loads(record['headers'])
+
+        status, content, headers = request(url, conditional)
+        if self._revalidated(url, record, status):
+            return record['status'], record['body'], json.loads(record['headers'])
+        # Throttling and server errors are passed on but never replace an archived copy
+        if archivable(status):
+            self.store(url, status, content, headers)
+        return status, content, headers
+
+    def get_to_file(self, url, request, path):
+        """
+        get() for large bodies: request(url, extra_headers, path) streams the body
+        into path and returns (status, headers). Whether it was downloaded or taken
+        from the archive, the body ends up in path; returns (status, headers).
+        """
+        record, conditional = self._lookup_or_revalidate(url)
+        if conditional is None:
+            with open(path, 'wb') as out:
+                self.copy_body(record, out)
+            return record['status'], json.loads(record['headers'])
+
+        status, headers = request(url, conditional, path)
+        if self._revalidated(url, record, status):
+            with open(path, 'wb') as out:
+                self.copy_body(record, out)
+            return record['status'], json.loads(record['headers'])
+        if archivable(status):
+            self.store_file(url, status, path, headers)
+        return status, headers
+
+    def close(self):
+        self.conn.close()
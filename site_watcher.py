@@ -0,0 +1,247 @@
+import os
+import time
+import ctypes
+import ctypes.util
+import select
+import struct
+import hashlib
+import datetime
+
+import content_catalog
+import generate_search_index as gsi
+from output_writer import new_report, format_report
+
+# generate_search_index.py --watch: rebuilds the site whenever an article, a project
+# page or the articles.html template changes. Uses Linux inotify through libc when
+# it can, and falls back to polling file mtimes elsewhere.
+
+WATCHED_DIRS = [gsi.ARTICLES_DIR, gsi.PROJECTS_DIR]
+WATCHED_FILES = [gsi.TEMPLATE_FILE]
+
+# A burst of events (editor save, git checkout, bulk publish in the dashboard) is
+# merged into one rebuild once nothing happened for DEBOUNCE_S, or after MAX_WAIT_S
+DEBOUNCE_S = 0.3
+MAX_WAIT_S = 2.0
+POLL_INTERVAL_S = 1.0
+
+def is_source(path):
+    name = os.path.basename(path)
+    if path in WATCHED_FILES:
+        return True
+    return (os.path.dirname(path) in WATCHED_DIRS and name.endswith('.html')
+            and name != 'template.html' and not name.startswith('.'))
+
+# --- INOTIFY ---
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+class InotifyWatcher:
+
+    def __init__(self, dirs):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_MODIFY
+        self.dirs = {}
+        for directory in dirs:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), mask)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+            self.dirs[wd] = directory
+
+    def poll(self, timeout):
+        """Paths with events within timeout seconds (None waits), empty set if none."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        paths = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name and wd in self.dirs:
+                paths.add(os.path.join(self.dirs[wd], os.fsdecode(name)))
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+
+    def __init__(self, dirs):
+        self.dirs = dirs
+        self.state = self._scan()
+
+    def _scan(self):
+        state = {}
+        for directory in self.dirs:
+            try:
+                entries = os.scandir(directory)
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_file():
+                        st = entry.stat()
+                        state[entry.path] = (st.st_mtime_ns, st.st_size)
+        return state
+
+    def poll(self, timeout):
+        time.sleep(POLL_INTERVAL_S if timeout is None else min(timeout, POLL_INTERVAL_S))
+        state = self._scan()
+        changed = {p for p in state.keys() | self.state.keys() if state.get(p) != self.state.get(p)}
+        self.state = state
+        return changed
+
+    def close(self):
+        pass
+
+
+def make_watcher(dirs):
+    try:
+        return InotifyWatcher(dirs), 'inotify'
+    except (OSError, AttributeError):
+        # No inotify (macOS, Windows, exhausted watch limit): poll instead
+        return PollingWatcher(dirs), 'polling'
+
+# --- REBUILDS ---
+
+def file_digest(path):
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+class SiteState:
+    """What the outputs were last built from, to tell which of them a change affects."""
+
+    def __init__(self, jobs, parser, boosts):
+        self.jobs = jobs
+        self.parser = parser
+        self.boosts = boosts
+        self.inputs = None
+        # articles.html is both the listing template and page 1 of the listings
+        self.template_digest = None
+
+    def _read_inputs(self, conn, changed):
+        if any(os.path.dirname(p) == gsi.ARTICLES_DIR for p in changed):
+            gsi.sync_source(conn, 'article', 'public', jobs=self.jobs, parser=self.parser)
+        articles = gsi.article_search_entries(conn)
+        projects = self.inputs['projects'] if self.inputs else None
+        if projects is None or any(os.path.dirname(p) == gsi.PROJECTS_DIR for p in changed):
+            projects = gsi.parse_projects()
+        return {
+            "listings": gsi.listing_articles(conn),
+            "articles": articles,
+            "bodies": content_catalog.body_terms(conn, [a['url'] for a in articles]),
+            "projects": projects,
+        }
+
+    def snapshot(self):
+        """Records the inputs of the build that just ran, without writing anything."""
+        conn = content_catalog.connect()
+        try:
+            self.inputs = self._read_inputs(conn, set())
+        finally:
+            conn.close()
+        self.template_digest = file_digest(gsi.TEMPLATE_FILE)
+
+    def rebuild(self, changed):
+        """Brings the outputs in line with the changed paths. Returns the outputs rebuilt."""
+        conn = content_catalog.connect()
+        writes = new_report()
+        rebuilt = []
+        try:
+            old, new = self.inputs, self._read_inputs(conn, changed)
+
+            if file_digest(gsi.TEMPLATE_FILE) != self.template_digest or new['listings'] != old['listings']:
+                gsi.generate_listings(new['listings'], writes, conn=conn)
+                rebuilt.append('listings')
+
+            if any(new[k] != old[k] for k in ('articles', 'bodies', 'projects')):
+                gsi.write_search_outputs(conn, new['articles'] + new['projects'] + [gsi.ABOUT_PAGE], self.boosts, writes)
+                rebuilt.append('search')
+        finally:
+            conn.close()
+
+        self.inputs = new
+        # Our own write of articles.html must not count as a template edit
+        self.template_digest = file_digest(gsi.TEMPLATE_FILE)
+        return rebuilt, writes
+
+    def is_own_write(self, path):
+        return path == gsi.TEMPLATE_FILE and file_digest(path) == self.template_digest
+
+
+def edit_time(paths, fallback):
+    # Latency is measured from the earliest mtime of the changed files that still exist,
+    # i.e. from the moment the edit hit the disk rather than when we noticed it
+    mtimes = []
+    for path in paths:
+        try:
+            mtimes.append(os.stat(path).st_mtime)
+        except FileNotFoundError:
+            pass
+    return min(mtimes) if mtimes else fallback
+
+def status_line(changed, rebuilt, writes, latency):
+    names = sorted(os.path.relpath(p, gsi.BASE_DIR) for p in changed)
+    what = names[0] if len(names) == 1 else f"{len(names)} files"
+    outputs = ', '.join(rebuilt) if rebuilt else 'nothing to rebuild'
+    stamp = datetime.datetime.now().strftime('%H:%M:%S')
+    return f"[{stamp}] {what} changed -> {outputs}; {format_report(writes)}; edit to output {latency * 1000:.0f} ms"
+
+def watch(jobs=1, parser='bs4', boosts=gsi.FIELD_BOOSTS):
+    # Expects an up-to-date build (generate_search_index.main runs first)
+    state = SiteState(jobs, parser, boosts)
+    state.snapshot()
+
+    dirs = WATCHED_DIRS + sorted({os.path.dirname(p) for p in WATCHED_FILES})
+    watcher, kind = make_watcher(dirs)
+    print(f"Watching articles/, projects/ and articles.html ({kind}). Press Ctrl+C to stop.")
+
+    try:
+        while True:
+            changed = {p for p in watcher.poll(None) if is_source(p)}
+            if not changed:
+                continue
+
+            # Debounce: keep collecting until things are quiet
+            first_event = time.time()
+            while time.time() - first_event < MAX_WAIT_S:
+                more = {p for p in watcher.poll(DEBOUNCE_S) if is_source(p)}
+                if not more:
+                    break
+                changed |= more
+
+            changed = {p for p in changed if not state.is_own_write(p)}
+            if not changed:
+                continue
+
+            started = edit_time(changed, first_event)
+            rebuilt, writes = state.rebuild(changed)
+            print(status_line(changed, rebuilt, writes, time.time() - started))
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        watcher.close()
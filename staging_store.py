@@ -0,0 +1,45 @@
+import os
+import shutil
+import hashlib
+
+from output_writer import write_if_changed
+
+# Where migrate_articles.py keeps cleaned article bodies between the crawl and
+# pass 2: one file per article, so only a small metadata index stays in memory
+# however many articles are migrated. The directory survives an interrupted run
+# (the checkpoint journal refers to its files) and is removed once the migration
+# has finished.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STAGING_DIR = os.path.join(BASE_DIR, '.migration-staging')
+
+
+class StagingStore:
+
+    def __init__(self, directory=STAGING_DIR):
+        self.directory = directory
+
+    def reset(self):
+        """Starts empty (a fresh migration)."""
+        self.remove()
+        os.makedirs(self.directory)
+
+    def open(self):
+        """Keeps what is there (a resumed migration)."""
+        os.makedirs(self.directory, exist_ok=True)
+
+    def put(self, key, text):
+        """Stores text under key (e.g. the article's canonical URL). Returns the name to get() it by."""
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16] + '.html'
+        write_if_changed(os.path.join(self.directory, name), text)
+        return name
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(self.directory, name))
+
+    def get(self, name):
+        with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def remove(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,33 @@
+import os
+import sys
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from article_images import set_dimensions
+
+def image(attrs=''):
+    return BeautifulSoup(f'<img src="../assets/datasets/a.png" {attrs}/>', 'html.parser').img
+
+def test_sets_width_and_height_when_missing():
+    img = image()
+    set_dimensions(img, (1430, 444), eager=False)
+    assert (img['width'], img['height']) == ('1430', '444')
+    assert (img['loading'], img['decoding']) == ('lazy', 'async')
+
+def test_pixel_width_is_kept_and_height_follows_aspect_ratio():
+    img = image('width="1024" height="300"')
+    set_dimensions(img, (1430, 444), eager=False)
+    assert (img['width'], img['height']) == ('1024', '318')
+
+def test_non_numeric_width_is_left_alone():
+    img = image('width="100%"')
+    set_dimensions(img, (1430, 444), eager=False)
+    assert img['width'] == '100%'
+    assert 'height' not in img.attrs
+
+def test_first_image_stays_eager():
+    img = image('loading="lazy"')
+    set_dimensions(img, (1430, 444), eager=True)
+    assert 'loading' not in img.attrs
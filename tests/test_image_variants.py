@@ -0,0 +1,66 @@
+import os
+import sys
+import json
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import content_catalog
+from image_variants import build_variants, variant_widths, variant_name
+
+def make_png(path, size, mode='RGB'):
+    Image.new(mode, size, (200, 80, 40, 255)[:len(mode)]).save(path)
+
+@pytest.fixture
+def dirs(tmp_path):
+    images_dir, out_dir = tmp_path / 'datasets', tmp_path / 'variants'
+    images_dir.mkdir()
+    out_dir.mkdir()
+    make_png(images_dir / 'wide.png', (1000, 500))
+    make_png(images_dir / 'small.png', (300, 200), mode='RGBA')
+    return str(images_dir), str(out_dir)
+
+def expected_names(images):
+    return {variant_name(e['sha1'], w, 'webp') for e in images.values() for w in variant_widths(e['width'])}
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_build_variants(dirs, jobs):
+    images_dir, out_dir = dirs
+    stale = ['ffffffffffffffff-480.webp', 'ffffffffffffffff-784.webp.part']
+    for name in stale:
+        open(os.path.join(out_dir, name), 'wb').close()
+
+    images, report = build_variants(['webp'], jobs=jobs, images_dir=images_dir, out_dir=out_dir)
+
+    wide_sha1 = content_catalog.hash_file(os.path.join(images_dir, 'wide.png'))
+    assert images['wide.png'] == {'sha1': wide_sha1, 'width': 1000, 'height': 500}
+    assert (images['small.png']['width'], images['small.png']['height']) == (300, 200)
+    assert variant_widths(1000) == [480, 784, 1000]
+    assert (report['images'], report['encoded'], report['removed'], report['failed']) == (2, 2, 2, [])
+
+    names = expected_names(images)
+    assert set(os.listdir(out_dir)) == names | {'manifest.json'}
+    with Image.open(os.path.join(out_dir, variant_name(wide_sha1, 480, 'webp'))) as im:
+        assert (im.format, im.size) == ('WEBP', (480, 240))
+    with open(os.path.join(out_dir, 'manifest.json'), encoding='utf-8') as f:
+        assert json.load(f) == images
+
+    # Nothing changed: nothing is encoded again
+    again, report = build_variants(['webp'], jobs=jobs, images_dir=images_dir, out_dir=out_dir)
+    assert again == images
+    assert (report['encoded'], report['removed']) == (0, 0)
+
+def test_changed_image_replaces_its_variants(dirs):
+    images_dir, out_dir = dirs
+    before, _ = build_variants(['webp'], images_dir=images_dir, out_dir=out_dir)
+    make_png(os.path.join(images_dir, 'wide.png'), (600, 300))
+
+    after, report = build_variants(['webp'], images_dir=images_dir, out_dir=out_dir)
+
+    assert report['encoded'] == 1
+    assert report['removed'] == len(variant_widths(1000))
+    assert after['small.png'] == before['small.png']
+    assert set(os.listdir(out_dir)) == expected_names(after) | {'manifest.json'}
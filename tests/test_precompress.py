@@ -0,0 +1,47 @@
+import os
+import sys
+import gzip
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import precompress
+
+@pytest.fixture
+def no_brotli(monkeypatch):
+    monkeypatch.setattr(precompress, 'ENCODINGS', {'.gz': precompress.ENCODINGS['.gz']})
+
+def write(path, data, mtime_ns=None):
+    with open(path, 'wb') as f:
+        f.write(data)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+def test_stale_sibling_without_encoder_is_deleted(tmp_path, no_brotli):
+    page = tmp_path / 'index.html'
+    write(page, b'<p>new</p>')
+    write(str(page) + '.br', b'old brotli', mtime_ns=os.stat(page).st_mtime_ns - 10**9)
+
+    report = precompress.precompress(base_dir=str(tmp_path), patterns=['*.html'])
+
+    assert not os.path.exists(str(page) + '.br')
+    assert gzip.decompress((tmp_path / 'index.html.gz').read_bytes()) == b'<p>new</p>'
+    assert (report[0]['written'], report[0]['deleted']) == (1, 1)
+
+def test_up_to_date_sibling_without_encoder_is_kept(tmp_path, no_brotli):
+    page = tmp_path / 'index.html'
+    write(page, b'<p>same</p>')
+    write(str(page) + '.br', b'current brotli', mtime_ns=os.stat(page).st_mtime_ns)
+
+    report = precompress.precompress(base_dir=str(tmp_path), patterns=['*.html'])
+
+    assert (tmp_path / 'index.html.br').read_bytes() == b'current brotli'
+    assert report[0]['deleted'] == 0
+
+def test_orphans_are_removed_for_every_encoding(tmp_path, no_brotli):
+    write(tmp_path / 'gone.html.gz', b'x')
+    write(tmp_path / 'gone.html.br', b'x')
+
+    assert precompress.remove_orphans(base_dir=str(tmp_path), patterns=['*.html']) == 2
+    assert os.listdir(tmp_path) == []